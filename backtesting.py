@@ -1,11 +1,33 @@
+import numpy as np
 import pandas as pd
-import yfinance as yf
 from datetime import datetime, timedelta
+from bar_cache import BarStore
+from intrabar import load_intrabar
+from metrics import MetricsAccumulator
+from trade_store import EOD, GREEN, NOT_TRIGGERED, RED, SL_HIT, TP_HIT, TradeBuffer
+from vectorized import simulate, to_day_bars
 
 class BreakoutStrategy:
-    def __init__(self):
-        """Initialize the strategy with an empty list to store trade results."""
-        self.trades = []
+    def __init__(self, sl_offset=8, tp_ratio=0.8, entry_buffer=0, intrabar=None, debug_date=None):
+        """
+        Initialize the strategy with an empty TradeBuffer to store trade results.
+        
+        Args:
+            sl_offset (float): Stop loss distance (points) beyond the opposite side of the opening candle.
+            tp_ratio (float): Take profit distance as a fraction of the opening candle range.
+            entry_buffer (float): Points beyond the opening high/low needed to trigger an entry
+                (the live app uses 5).
+            intrabar (dict): Optional lower-timeframe bars or ticks for ambiguous candles, as returned
+                by intrabar.load_intrabar. A candle found here is replayed through its finer bars
+                instead of assuming the stop loss was hit first.
+            debug_date (date): Print the levels and every candle of this day (e.g., date(2025, 3, 5)).
+        """
+        self.trades = TradeBuffer()
+        self.sl_offset = sl_offset
+        self.tp_ratio = tp_ratio
+        self.entry_buffer = entry_buffer
+        self.intrabar = intrabar or {}
+        self.debug_date = debug_date
         
     def analyze_day(self, day_data, opening_time):
         """
@@ -31,13 +53,13 @@ class BreakoutStrategy:
         
         # Determine candle color and set stop loss levels
         if opening_close > opening_open:
-            candle_color = 'green'
-            long_sl = opening_low - 8    # Long SL 8 points below low
-            short_sl = opening_high + 8  # Short SL 8 points above high
+            candle_color = GREEN
+            long_sl = opening_low - self.sl_offset    # Long SL 8 points below low
+            short_sl = opening_high + self.sl_offset  # Short SL 8 points above high
         elif opening_close < opening_open:
-            candle_color = 'red'
-            long_sl = opening_low - 8    # Long SL 8 points below low
-            short_sl = opening_high + 8  # Short SL 8 points above high
+            candle_color = RED
+            long_sl = opening_low - self.sl_offset    # Long SL 8 points below low
+            short_sl = opening_high + self.sl_offset  # Short SL 8 points above high
         else:
             return
         
@@ -52,115 +74,116 @@ class BreakoutStrategy:
         
         # Calculate risk and take profit levels
         risk = opening_high - opening_low
-        long_tp = opening_high + (risk * 0.8)
-        short_tp = opening_low - (risk * 0.8)
-        
-        # Initialize trade result dictionary
-        trade_result = {
-            'Date': opening_candle.index[0].date(),
-            'Candle_Color': candle_color,
-            'Opening_High': opening_high,
-            'Opening_Low': opening_low,
-            'Long_SL': long_sl,
-            'Long_TP': long_tp,
-            'Short_SL': short_sl,
-            'Short_TP': short_tp,
-            'Long_Result': 'Not Triggered',
-            'Long_Points': 0,
-            'Short_Result': 'Not Triggered',
-            'Short_Points': 0
-        }
+        long_tp = opening_high + (risk * self.tp_ratio)
+        short_tp = opening_low - (risk * self.tp_ratio)
+        long_entry = opening_high + self.entry_buffer
+        short_entry = opening_low - self.entry_buffer
+        
+        trade_date = opening_candle.index[0].date()
         
         # Trade variables
         trade_type = None
         entry_price = None
         sl_price = None
         tp_price = None
+        result = NOT_TRIGGERED
+        points = 0.0
         
-        # Debug for March 5, 2025
-        if trade_result['Date'] == datetime(2025, 3, 5).date():
-            print(f"Debugging March 5, 2025:")
+        debug = trade_date == self.debug_date
+        if debug:
+            print(f"Debugging {trade_date}:")
             print(f"Open: {opening_open}, High: {opening_high}, Low: {opening_low}, Close: {opening_close}")
             print(f"Long SL: {long_sl}, Long TP: {long_tp}, Short SL: {short_sl}, Short TP: {short_tp}")
         
-        # Iterate through subsequent candles
-        for timestamp, candle in later_data.iterrows():
-            high = float(candle['High'])
-            low = float(candle['Low'])
-            
-            if trade_result['Date'] == datetime(2025, 3, 5).date():
+        # Iterate through subsequent candles (or their finer bars where the candle is ambiguous)
+        for timestamp, high, low in self.price_path(later_data):
+            if debug:
                 print(f"Candle at {timestamp}: High={high}, Low={low}")
             
             # Check for trade trigger
             if trade_type is None:
-                if high > opening_high:
+                if high > long_entry:
                     trade_type = 'long'
-                    entry_price = opening_high
+                    entry_price = long_entry
                     sl_price = long_sl
                     tp_price = long_tp
-                elif low < opening_low:
+                elif low < short_entry:
                     trade_type = 'short'
-                    entry_price = opening_low
+                    entry_price = short_entry
                     sl_price = short_sl
                     tp_price = short_tp
             
             # Monitor active trade
             if trade_type == 'long':
                 if low <= sl_price:
-                    trade_result['Long_Result'] = 'SL Hit'
-                    trade_result['Long_Points'] = sl_price - entry_price
-                    if trade_result['Date'] == datetime(2025, 3, 5).date():
+                    result = SL_HIT
+                    points = sl_price - entry_price
+                    if debug:
                         print(f"Long SL Hit at {low}, below {sl_price}")
                     break
                 elif high >= tp_price:
-                    trade_result['Long_Result'] = 'TP Hit'
-                    trade_result['Long_Points'] = tp_price - entry_price
+                    result = TP_HIT
+                    points = tp_price - entry_price
                     break
             elif trade_type == 'short':
                 if high >= sl_price:
-                    trade_result['Short_Result'] = 'SL Hit'
-                    trade_result['Short_Points'] = entry_price - sl_price
+                    result = SL_HIT
+                    points = entry_price - sl_price
                     break
                 elif low <= tp_price:
-                    trade_result['Short_Result'] = 'TP Hit'
-                    trade_result['Short_Points'] = entry_price - tp_price
+                    result = TP_HIT
+                    points = entry_price - tp_price
                     break
         
         # If trade triggered but unresolved, close at EOD
         else:
             if trade_type == 'long':
-                trade_result['Long_Result'] = 'EOD'
-                trade_result['Long_Points'] = day_close - entry_price
+                result = EOD
+                points = day_close - entry_price
             elif trade_type == 'short':
-                trade_result['Short_Result'] = 'EOD'
-                trade_result['Short_Points'] = entry_price - day_close
+                result = EOD
+                points = entry_price - day_close
         
-        self.trades.append(trade_result)
+        long_result, long_points = (result, points) if trade_type == 'long' else (NOT_TRIGGERED, 0.0)
+        short_result, short_points = (result, points) if trade_type == 'short' else (NOT_TRIGGERED, 0.0)
+        self.trades.append(trade_date, candle_color, opening_high, opening_low, long_sl, long_tp, short_sl, short_tp,
+                           long_result, long_points, short_result, short_points)
+
+    def price_path(self, later_data):
+        """
+        Yield (timestamp, high, low) for every candle, expanding candles found in self.intrabar
+        into their lower-timeframe bars or ticks.
+        """
+        for timestamp, high, low in zip(later_data.index, later_data['High'].to_numpy(dtype=float),
+                                        later_data['Low'].to_numpy(dtype=float)):
+            finer = self.intrabar.get(timestamp)
+            if finer is None:
+                yield timestamp, high, low
+            else:
+                for fine_high, fine_low in finer:
+                    yield timestamp, fine_high, fine_low
 
-def run_backtest(index_symbol='^IXIC', opening_time='14:45'):
+def fetch_data(index_symbol, start_date, end_date, interval='15m', store=None):
     """
-    Run the backtest for a given index and opening time.
+    Load OHLC bars for a symbol through the local bar cache (timezone removed from the index).
     
     Args:
         index_symbol (str): The ticker symbol for the index (e.g., '^IXIC' for NASDAQ).
-        opening_time (str): Time of the opening candle in 'HH:MM' format (e.g., '14:45').
-    """
-    # Set date range to include recent data
-    start_date = (datetime.now() - timedelta(days=55)).strftime('%Y-%m-%d')
-    end_date = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+        start_date (str): First date to load in 'YYYY-MM-DD' format.
+        end_date (str): Date to stop loading at (exclusive) in 'YYYY-MM-DD' format.
+        interval (str): Bar size understood by the source (e.g., '15m').
+        store (BarStore): Cache to load from; defaults to BarStore() in front of Yahoo Finance.
     
+    Returns:
+        pd.DataFrame or None: The bars, or None if nothing could be loaded.
+    """
+    store = store if store is not None else BarStore()
     print(f"Fetching data for {index_symbol} from {start_date} to {end_date}...")
     try:
-        index_data = yf.download(
-            index_symbol,
-            start=start_date,
-            end=end_date,
-            interval='15m',
-            progress=False
-        )
+        index_data = store.load(index_symbol, interval, start_date, end_date)
     except Exception as e:
         print(f"Error downloading data: {e}")
-        return
+        return None
     
     if index_data.empty:
         print("No data downloaded. Possible reasons:")
@@ -168,84 +191,149 @@ def run_backtest(index_symbol='^IXIC', opening_time='14:45'):
         print("- Data not yet available for today")
         print("- Internet connection issue")
         print(f"Last index timestamp: {index_data.index[-1] if not index_data.empty else 'N/A'}")
-        return
+        return None
     
-    # Remove timezone for consistency
-    index_data.index = index_data.index.tz_localize(None)
     print(f"Data retrieved. Last timestamp: {index_data.index[-1]}")
+    return index_data
+
+def compute_metrics(results):
+    """
+    Compute the backtest statistics printed by run_backtest.
     
-    print("Running strategy analysis...")
-    strategy = BreakoutStrategy()
+    Args:
+        results (TradeBuffer, pd.DataFrame or dict): Trade results with the BreakoutStrategy.trades
+            columns; results may be names ('SL Hit') or trade_store codes.
     
-    for date, day_data in index_data.groupby(index_data.index.date):
-        strategy.analyze_day(day_data, opening_time)
+    Returns:
+        dict: Result counts and points per side plus total_trades, win_rate (%),
+            profit_factor, expectancy (points per trade), equity, max_drawdown and
+            rolling_sharpe (see metrics.MetricsAccumulator).
+    """
+    accumulator = MetricsAccumulator(keep_equity=False)
+    accumulator.extend(results)
+    return accumulator.summary()
+
+def backtest(index_data, opening_time, engine='loop', entry_buffer=0, intrabar=None):
+    """
+    Run the strategy over every day of `index_data` and return the per-day results.
     
-    results_df = pd.DataFrame(strategy.trades)
+    Args:
+        index_data (pd.DataFrame): OHLC bars indexed by naive timestamps (see fetch_data).
+        opening_time (str): Time of the opening candle in 'HH:MM' format (e.g., '14:45').
+        engine (str): 'loop' or 'vectorized' (see run_backtest).
+        entry_buffer (float): Points beyond the opening high/low needed to trigger an entry.
+        intrabar (dict): Optional finer bars for ambiguous candles (see intrabar.load_intrabar).
     
-    if not results_df.empty:
+    Returns:
+        TradeBuffer: One row per day with an opening candle.
+    """
+    if engine == 'vectorized':
+        columns = simulate(to_day_bars(index_data), opening_time, entry_buffer=entry_buffer)
+        trades = TradeBuffer(capacity=len(columns['Date']))
+        if intrabar:
+            # Only the days holding an ambiguous candle need the candle-by-candle walk
+            strategy = BreakoutStrategy(entry_buffer=entry_buffer, intrabar=intrabar)
+            ambiguous_days = {timestamp.date() for timestamp in intrabar}
+            day_mask = np.isin(index_data.index.date, list(ambiguous_days))
+            for date, day_data in index_data[day_mask].groupby(index_data.index.date[day_mask]):
+                strategy.analyze_day(day_data, opening_time)
+            unresolved = ~np.isin(columns['Date'], strategy.trades['Date'])
+            trades.extend({column: values[unresolved] for column, values in columns.items()})
+            trades.extend(strategy.trades)
+            trades.sort()
+        else:
+            trades.extend(columns)
+    else:
+        strategy = BreakoutStrategy(entry_buffer=entry_buffer, intrabar=intrabar)
+        
+        for date, day_data in index_data.groupby(index_data.index.date):
+            strategy.analyze_day(day_data, opening_time)
+        
+        trades = strategy.trades
+    return trades
+
+def run_backtest(index_symbol='^IXIC', opening_time='14:45', engine='loop', store=None, entry_buffer=0,
+                 intrabar_path=None, output=None, append=False, cache=None):
+    """
+    Run the backtest for a given index and opening time.
+    
+    Args:
+        index_symbol (str): The ticker symbol for the index (e.g., '^IXIC' for NASDAQ).
+        opening_time (str): Time of the opening candle in 'HH:MM' format (e.g., '14:45').
+        engine (str): 'loop' to walk every day with BreakoutStrategy.analyze_day, or
+            'vectorized' to evaluate all days at once with NumPy (same results, much faster).
+        store (BarStore): Bar cache to load from (defaults to the local cache in front of Yahoo Finance).
+        entry_buffer (float): Points beyond the opening high/low needed to trigger an entry (5 live).
+        intrabar_path (str): Optional 1-minute bar or tick file (Parquet or CSV, see intrabar.iter_chunks)
+            used to resolve candles that cross both the stop loss and the take profit, or trigger
+            and stop out in the same candle. Only those candles are read, chunk by chunk.
+        output (str): Where to save the per-day results: a Parquet file with coded results
+            (see trade_store), or a CSV file if the name ends in '.csv'. Defaults to
+            'backtest_results.parquet', or the 'backtest_results' directory with append=True.
+        append (bool): Add the results to the `output` Parquet dataset directory as a new part
+            instead of replacing it (read them back with trade_store.read_trades).
+        cache (ResultCache): Reuse the stored outcome of every day whose bars have not changed
+            since an earlier run and only evaluate the rest (see result_cache). Not used
+            together with intrabar_path.
+    """
+    # Set date range to include recent data
+    start_date = (datetime.now() - timedelta(days=55)).strftime('%Y-%m-%d')
+    end_date = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+    
+    index_data = fetch_data(index_symbol, start_date, end_date, store=store)
+    if index_data is None:
+        return
+    
+    intrabar = {}
+    if intrabar_path:
+        print(f"Loading intrabar data from {intrabar_path}...")
+        intrabar = load_intrabar(index_data, intrabar_path, opening_time, entry_buffer=entry_buffer)
+        print(f"Resolving {len(intrabar)} ambiguous candles")
+    
+    print("Running strategy analysis...")
+    if cache is not None and not intrabar:
+        trades = TradeBuffer(capacity=0)
+        trades.extend(cache.backtest(to_day_bars(index_data), index_symbol, opening_time, entry_buffer=entry_buffer))
+        print(f"Result cache: {cache.hits} days reused, {cache.misses} evaluated")
+    else:
+        trades = backtest(index_data, opening_time, engine=engine, entry_buffer=entry_buffer, intrabar=intrabar)
+    
+    if len(trades):
+        metrics = compute_metrics(trades)
         print("\nBacktest Results:")
         print("================")
-        print(f"Total Days Analyzed: {len(results_df)}")
-        
-        # Long trade statistics
-        long_sl_hit = len(results_df[results_df['Long_Result'] == 'SL Hit'])
-        long_tp_hit = len(results_df[results_df['Long_Result'] == 'TP Hit'])
-        long_eod = len(results_df[results_df['Long_Result'] == 'EOD'])
-        long_not_triggered = len(results_df[results_df['Long_Result'] == 'Not Triggered'])
-        long_total_points = results_df['Long_Points'].sum()
-        
-        print("\nLong Trades:")
-        print(f"SL Hit: {long_sl_hit}")
-        print(f"TP Hit: {long_tp_hit}")
-        print(f"EOD (Closed at End of Day): {long_eod}")
-        print(f"Not Triggered: {long_not_triggered}")
-        print(f"Total Points: {long_total_points:.2f}")
-        
-        # Short trade statistics
-        short_sl_hit = len(results_df[results_df['Short_Result'] == 'SL Hit'])
-        short_tp_hit = len(results_df[results_df['Short_Result'] == 'TP Hit'])
-        short_eod = len(results_df[results_df['Short_Result'] == 'EOD'])
-        short_not_triggered = len(results_df[results_df['Short_Result'] == 'Not Triggered'])
-        short_total_points = results_df['Short_Points'].sum()
-        
-        print("\nShort Trades:")
-        print(f"SL Hit: {short_sl_hit}")
-        print(f"TP Hit: {short_tp_hit}")
-        print(f"EOD (Closed at End of Day): {short_eod}")
-        print(f"Not Triggered: {short_not_triggered}")
-        print(f"Total Points: {short_total_points:.2f}")
-        
-        print(f"\nOverall Total Points: {(long_total_points + short_total_points):.2f}")
-        
-        # Calculate additional metrics
-        long_triggered = results_df[results_df['Long_Result'] != 'Not Triggered']
-        short_triggered = results_df[results_df['Short_Result'] != 'Not Triggered']
-        
-        total_trades = len(long_triggered) + len(short_triggered)
-        wins = len(long_triggered[long_triggered['Long_Result'] == 'TP Hit']) + len(short_triggered[short_triggered['Short_Result'] == 'TP Hit'])
-        win_rate = (wins / total_trades * 100) if total_trades > 0 else 0
-        
-        all_points = pd.concat([long_triggered['Long_Points'], short_triggered['Short_Points']])
-        gross_profits = all_points[all_points > 0].sum()
-        gross_losses = abs(all_points[all_points < 0].sum())
-        profit_factor = gross_profits / gross_losses if gross_losses > 0 else float('inf')
-        
-        avg_win = all_points[all_points > 0].mean() if wins > 0 else 0
-        avg_loss = abs(all_points[all_points < 0].mean()) if (total_trades - wins) > 0 else 0
-        expectancy = (win_rate / 100 * avg_win) - ((1 - win_rate / 100) * avg_loss)
+        print(f"Total Days Analyzed: {metrics['total_days']}")
+        
+        for side in ('Long', 'Short'):
+            key = side.lower()
+            print(f"\n{side} Trades:")
+            print(f"SL Hit: {metrics[f'{key}_sl_hit']}")
+            print(f"TP Hit: {metrics[f'{key}_tp_hit']}")
+            print(f"EOD (Closed at End of Day): {metrics[f'{key}_eod']}")
+            print(f"Not Triggered: {metrics[f'{key}_not_triggered']}")
+            print(f"Total Points: {metrics[f'{key}_total_points']:.2f}")
+        
+        print(f"\nOverall Total Points: {metrics['total_points']:.2f}")
         
         print("\nAdditional Metrics:")
-        print(f"Total Trades: {total_trades}")
-        print(f"Win Rate: {win_rate:.2f}% (>55% preferably)")
-        print(f"Profit Factor: {profit_factor:.2f} (>1.5 preferably)")
-        print(f"Expectancy (Points per Trade): {expectancy:.2f} (>5 points preferably)")
+        print(f"Total Trades: {metrics['total_trades']}")
+        print(f"Win Rate: {metrics['win_rate']:.2f}% (>55% preferably)")
+        print(f"Profit Factor: {metrics['profit_factor']:.2f} (>1.5 preferably)")
+        print(f"Expectancy (Points per Trade): {metrics['expectancy']:.2f} (>5 points preferably)")
+        print(f"Max Drawdown: {metrics['max_drawdown']:.2f} points")
+        print(f"Sharpe Ratio (last 50 trades, annualized): {metrics['rolling_sharpe']:.2f}")
         
-        results_df.to_csv('backtest_results.csv', index=False)
-        print("\nDetailed results saved to 'backtest_results.csv'")
+        if output is None:
+            output = 'backtest_results' if append else 'backtest_results.parquet'
+        if output.endswith('.csv'):
+            trades.write_csv(output)
+        else:
+            trades.write_parquet(output, append=append)
+        print(f"\nDetailed results saved to '{output}'")
     else:
         print("No trades were executed in the backtest period.")
 
 if __name__ == "__main__":
     # Example: Customize index_symbol and opening_time as needed
     run_backtest(index_symbol='^IXIC', opening_time='14:45')  # NASDAQ, 14:45 opening
-    # run_backtest(index_symbol='^GSPC', opening_time='09:30')  # S&P 500, 09:30 opening
\ No newline at end of file
+    # run_backtest(index_symbol='^GSPC', opening_time='09:30')  # S&P 500, 09:30 opening
@@ -0,0 +1,184 @@
+import json
+import os
+import re
+
+import pandas as pd
+import yfinance as yf
+from yfinance.exceptions import YFPricesMissingError
+
+BAR_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def _normalize(data):
+    """Flatten yfinance's (field, ticker) columns, drop the timezone and sort by time."""
+    if isinstance(data.columns, pd.MultiIndex):
+        data.columns = data.columns.get_level_values(0)
+    data = data[[column for column in BAR_COLUMNS if column in data.columns]]
+    if data.index.tz is not None:
+        data.index = data.index.tz_localize(None)
+    data.index.name = 'Datetime'
+    return data.sort_index()
+
+
+def _empty_bars():
+    return pd.DataFrame(columns=BAR_COLUMNS, index=pd.DatetimeIndex([], name='Datetime'))
+
+
+class YahooSource:
+    """Bar source backed by yfinance's Ticker.history."""
+
+    def fetch(self, symbol, interval, start, end):
+        """
+        Download bars for [start, end).
+
+        Args:
+            symbol (str): Ticker symbol (e.g., '^IXIC').
+            interval (str): Bar size understood by yfinance (e.g., '15m').
+            start (pd.Timestamp): First date to fetch.
+            end (pd.Timestamp): Date to stop at (exclusive).
+
+        Returns an empty frame when nothing traded in the range (weekend, holiday); any other
+        failure (network, rate limit, unknown symbol) propagates, so the range is not recorded
+        as covered.
+        """
+        try:
+            data = yf.Ticker(symbol).history(start=start.strftime('%Y-%m-%d'), end=end.strftime('%Y-%m-%d'),
+                                             interval=interval, raise_errors=True)
+        except YFPricesMissingError:
+            return _empty_bars()
+        return _normalize(data)
+
+
+class CSVSource:
+    """Bar source reading local '<symbol>_<interval>.csv' files, e.g. for offline tests."""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def fetch(self, symbol, interval, start, end):
+        path = os.path.join(self.directory, f"{_safe_name(symbol)}_{interval}.csv")
+        if not os.path.exists(path):
+            return _empty_bars()
+        data = _normalize(pd.read_csv(path, index_col=0, parse_dates=True))
+        return data[(data.index >= start) & (data.index < end)]
+
+
+def _safe_name(symbol):
+    return re.sub(r'[^A-Za-z0-9._-]', '_', symbol)
+
+
+def _merge_ranges(ranges):
+    """Merge overlapping or touching [start, end) date ranges."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+class BarStore:
+    """
+    On-disk Parquet bar cache keyed by symbol and interval.
+
+    Each (symbol, interval) pair is one Parquet file plus a small JSON file with the date
+    ranges already fetched, so a load only asks the source for the dates it has never seen.
+    """
+
+    def __init__(self, directory='bar_cache', source=None):
+        """
+        Args:
+            directory (str): Folder holding the cached bars.
+            source: Object with fetch(symbol, interval, start, end) -> pd.DataFrame
+                (defaults to YahooSource).
+        """
+        self.directory = directory
+        self.source = source if source is not None else YahooSource()
+
+    def _paths(self, symbol, interval):
+        base = os.path.join(self.directory, _safe_name(symbol), interval)
+        return base + '.parquet', base + '.coverage.json'
+
+    def _coverage(self, symbol, interval):
+        _, coverage_path = self._paths(symbol, interval)
+        if not os.path.exists(coverage_path):
+            return []
+        with open(coverage_path) as f:
+            return [[pd.Timestamp(start), pd.Timestamp(end)] for start, end in json.load(f)]
+
+    def missing_ranges(self, symbol, interval, start, end):
+        """Return the [start, end) date ranges not fetched yet."""
+        gaps = []
+        cursor = start
+        for covered_start, covered_end in self._coverage(symbol, interval):
+            if covered_end <= cursor:
+                continue
+            if covered_start >= end:
+                break
+            if covered_start > cursor:
+                gaps.append((cursor, covered_start))
+            cursor = max(cursor, covered_end)
+        if cursor < end:
+            gaps.append((cursor, end))
+        return gaps
+
+    def read(self, symbol, interval):
+        """Return every cached bar for symbol/interval (empty frame if none)."""
+        data_path, _ = self._paths(symbol, interval)
+        if not os.path.exists(data_path):
+            return _empty_bars()
+        return pd.read_parquet(data_path)
+
+    def refresh(self, symbol, interval, start, end):
+        """
+        Fetch the missing parts of [start, end) from the source and merge them into the cache.
+
+        Days from today on are never marked as covered, because their bars are still forming,
+        and neither are gaps whose fetch failed: what did arrive is stored, then the first
+        error is raised so the caller does not run on missing data.
+        """
+        gaps = self.missing_ranges(symbol, interval, start, end)
+        if not gaps:
+            return
+        fetched, done, error = [], [], None
+        for gap_start, gap_end in gaps:
+            try:
+                data = self.source.fetch(symbol, interval, gap_start, gap_end)
+            except Exception as e:
+                error = error or e
+                continue
+            done.append((gap_start, gap_end))
+            if not data.empty:
+                fetched.append(data)
+
+        data_path, coverage_path = self._paths(symbol, interval)
+        os.makedirs(os.path.dirname(data_path), exist_ok=True)
+        if fetched:
+            existing = [self.read(symbol, interval)] if os.path.exists(data_path) else []
+            merged = pd.concat(existing + fetched)
+            merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+            merged.to_parquet(data_path)
+
+        today = pd.Timestamp.now().normalize()
+        covered = self._coverage(symbol, interval)
+        covered += [[gap_start, min(gap_end, today)] for gap_start, gap_end in done if gap_start < today]
+        with open(coverage_path, 'w') as f:
+            json.dump([[s.strftime('%Y-%m-%d'), e.strftime('%Y-%m-%d')] for s, e in _merge_ranges(covered)], f)
+        if error is not None:
+            raise error
+
+    def load(self, symbol, interval, start, end):
+        """
+        Return bars for [start, end), fetching only what is not cached yet.
+
+        Args:
+            symbol (str): Ticker symbol (e.g., '^IXIC').
+            interval (str): Bar size (e.g., '15m').
+            start (str or pd.Timestamp): First date to load.
+            end (str or pd.Timestamp): Date to stop at (exclusive).
+        """
+        start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+        self.refresh(symbol, interval, start, end)
+        data = self.read(symbol, interval)
+        return data[(data.index >= start) & (data.index < end)]
@@ -0,0 +1,120 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from backtesting import backtest, compute_metrics, fetch_data
+from bar_cache import BarStore
+from trade_store import CSV_FLOAT_FORMAT
+
+JOB_COLUMNS = ['symbol', 'opening_time', 'start_date', 'end_date']
+REPORT_METRICS = ['total_days', 'total_trades', 'win_rate', 'profit_factor', 'expectancy',
+                  'total_points', 'max_drawdown', 'rolling_sharpe']
+
+
+def batch_jobs(symbols, opening_times, date_ranges):
+    """
+    Expand symbols x opening times x date ranges into one job per combination.
+
+    Args:
+        symbols (list[str]): Ticker symbols (e.g., ['^IXIC', '^GSPC']).
+        opening_times (list[str]): Opening candle times in 'HH:MM' format.
+        date_ranges (list[tuple]): (start, end) dates in 'YYYY-MM-DD' format, end exclusive.
+
+    Returns:
+        list[dict]: One dict per job with the JOB_COLUMNS keys.
+    """
+    return [dict(zip(JOB_COLUMNS, (symbol, opening_time, start, end)))
+            for symbol, opening_time, (start, end) in itertools.product(symbols, opening_times, date_ranges)]
+
+
+def load_symbols(jobs, store=None, io_workers=4, interval='15m'):
+    """
+    Load the bars every job needs, one symbol per I/O thread.
+
+    Each symbol is loaded once over the union of its jobs' date ranges, so two threads never
+    refresh the same cache file; the jobs then slice their own range out of it.
+
+    Returns:
+        dict: symbol -> pd.DataFrame, or None where nothing could be loaded.
+    """
+    store = store if store is not None else BarStore()
+    spans = {}
+    for job in jobs:
+        start, end = spans.get(job['symbol'], (job['start_date'], job['end_date']))
+        spans[job['symbol']] = (min(start, job['start_date']), max(end, job['end_date']))
+    with ThreadPoolExecutor(max_workers=io_workers) as pool:
+        futures = {symbol: pool.submit(fetch_data, symbol, start, end, interval, store)
+                   for symbol, (start, end) in spans.items()}
+        return {symbol: future.result() for symbol, future in futures.items()}
+
+
+def _run_job(job, index_data, engine, entry_buffer):
+    """Process pool task: backtest one job on its slice of bars; returns (metrics, trades)."""
+    trades = backtest(index_data, job['opening_time'], engine=engine, entry_buffer=entry_buffer)
+    return compute_metrics(trades) if len(trades) else {}, trades
+
+
+def run_batch(symbols, opening_times, date_ranges, engine='vectorized', store=None, entry_buffer=0,
+              io_workers=4, workers=None, output='batch_results.csv', trades_output=None):
+    """
+    Backtest every symbol x opening time x date range and write one comparison table.
+
+    Bars are loaded concurrently on an I/O thread pool (from the cache, or the source for
+    dates not cached yet); the strategy runs on a process pool, one task per job.
+
+    Args:
+        symbols (list[str]): Ticker symbols.
+        opening_times (list[str]): Opening candle times in 'HH:MM' format.
+        date_ranges (list[tuple]): (start, end) dates in 'YYYY-MM-DD' format, end exclusive.
+        engine (str): 'loop' or 'vectorized' (see backtesting.run_backtest).
+        store (BarStore): Bar cache to load from (defaults to the local cache in front of Yahoo Finance).
+        entry_buffer (float): Points beyond the opening high/low needed to trigger an entry.
+        io_workers (int): Threads loading bars.
+        workers (int): Processes running the strategy (defaults to all cores).
+        output (str): CSV file for the comparison table (None to skip).
+        trades_output (str): Optional CSV file with every job's per-day results, tagged with
+            the job columns.
+
+    Returns:
+        pd.DataFrame: One row per job with its JOB_COLUMNS and metrics, in job order.
+    """
+    jobs = batch_jobs(symbols, opening_times, date_ranges)
+    bars = load_symbols(jobs, store=store, io_workers=io_workers)
+
+    rows, frames, futures = [], [], []
+    workers = min(workers or os.cpu_count() or 1, max(len(jobs), 1))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for job in jobs:
+            index_data = bars[job['symbol']]
+            if index_data is not None:
+                start, end = pd.Timestamp(job['start_date']), pd.Timestamp(job['end_date'])
+                index_data = index_data[(index_data.index >= start) & (index_data.index < end)]
+            if index_data is None or index_data.empty:
+                futures.append(None)
+                continue
+            futures.append(pool.submit(_run_job, job, index_data, engine, entry_buffer))
+        for job, future in zip(jobs, futures):
+            metrics, trades = future.result() if future is not None else ({}, None)
+            rows.append({**job, **metrics})
+            if trades_output and trades:
+                frames.append(trades.to_frame().assign(**{column.title(): job[column] for column in JOB_COLUMNS}))
+
+    table = pd.DataFrame(rows)
+    if output:
+        table.to_csv(output, index=False, float_format=CSV_FLOAT_FORMAT)
+        print(f"Comparison of {len(jobs)} backtests saved to '{output}'")
+    if trades_output and frames:
+        pd.concat(frames, ignore_index=True).to_csv(trades_output, index=False, float_format=CSV_FLOAT_FORMAT)
+        print(f"Per-day results saved to '{trades_output}'")
+    return table
+
+
+if __name__ == "__main__":
+    # Example: NASDAQ and S&P 500 at both opening times over the last 55 days
+    start_date = (datetime.now() - timedelta(days=55)).strftime('%Y-%m-%d')
+    end_date = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+    report = run_batch(['^IXIC', '^GSPC'], ['09:30', '14:45'], [(start_date, end_date)])
+    print(report[JOB_COLUMNS + [column for column in REPORT_METRICS if column in report]].to_string(index=False))
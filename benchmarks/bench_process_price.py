@@ -0,0 +1,121 @@
+"""
+Micro-benchmark of the live tick path: BreakoutApp.process_price ticks per second.
+
+Run from the repository root:
+    python benchmarks/bench_process_price.py [n_ticks]
+
+Each case is timed twice on the same prices: through baseline_process_price, a copy of the
+per-tick path before the session levels were precomputed, and through the current
+process_price. INFO logging is disabled so the numbers reflect the decision path rather
+than disk I/O.
+"""
+import logging
+import os
+import random
+import sys
+import time
+from datetime import datetime, time as dt_time
+
+import pytz
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixtures import make_app, make_app_in_trade
+
+
+def baseline_process_price(app, price):
+    """
+    The former process_price: levels, SL/TP and a trade_result dict rebuilt on every tick,
+    the time zone looked up and the clock read for the EOD check. Entries and exits are
+    returned instead of sent, so timing it never places an order.
+    """
+    if not app.opening_candle:
+        return None
+    now = datetime.now(pytz.timezone('US/Eastern'))
+    opening_open = app.opening_candle['Open']
+    opening_high = app.opening_candle['High']
+    opening_low = app.opening_candle['Low']
+    opening_close = app.opening_candle['Close']
+
+    if opening_close > opening_open:
+        candle_color = 'green'
+        long_sl = opening_low - app.sl_offset
+        short_sl = opening_high + app.sl_offset
+    elif opening_close < opening_open:
+        candle_color = 'red'
+        long_sl = opening_low - app.sl_offset
+        short_sl = opening_high + app.sl_offset
+    else:
+        return None
+
+    risk = opening_high - opening_low
+    long_tp = opening_high + (risk * app.tp_ratio)
+    short_tp = opening_low - (risk * app.tp_ratio)
+
+    trade_result = {
+        'Date': now.date(),
+        'Candle_Color': candle_color,
+        'Opening_High': opening_high,
+        'Opening_Low': opening_low,
+        'Long_SL': long_sl,
+        'Long_TP': long_tp,
+        'Short_SL': short_sl,
+        'Short_TP': short_tp,
+        'Long_Result': 'Not Triggered',
+        'Long_Points': 0,
+        'Short_Result': 'Not Triggered',
+        'Short_Points': 0
+    }
+
+    active_orders = app.orders.orders
+    if app.position is None and not active_orders:
+        if price > opening_high + app.entry_buffer:
+            return 'enter', 'long', trade_result
+        elif price < opening_low - app.entry_buffer:
+            return 'enter', 'short', trade_result
+        else:
+            logging.info(f"No trade triggered: Price={price}, Long Trigger={opening_high + app.entry_buffer}, Short Trigger={opening_low - app.entry_buffer}")
+    elif app.position == 'long' and len(active_orders) < 2:
+        if price <= app.sl_price:
+            return 'exit', 'SL Hit', trade_result
+        elif price >= app.tp_price:
+            return 'exit', 'TP Hit', trade_result
+        elif now.time() >= dt_time(16, 0):
+            return 'exit', 'EOD', trade_result
+    elif app.position == 'short' and len(active_orders) < 2:
+        if price >= app.sl_price:
+            return 'exit', 'SL Hit', trade_result
+        elif price <= app.tp_price:
+            return 'exit', 'TP Hit', trade_result
+        elif now.time() >= dt_time(16, 0):
+            return 'exit', 'EOD', trade_result
+    return None
+
+
+def ticks_per_second(process_price, prices):
+    start = time.perf_counter()
+    for price in prices:
+        process_price(price)
+    return len(prices) / (time.perf_counter() - start)
+
+
+def compare(label, app, prices):
+    baseline = ticks_per_second(lambda price: baseline_process_price(app, price), prices)
+    current = ticks_per_second(app.process_price, prices)
+    print(f"{label:<20}{baseline:>12,.0f}{current:>12,.0f} ticks/s{current / baseline:>8.1f}x")
+
+
+def main(n_ticks=200_000):
+    logging.disable(logging.INFO)
+    rng = random.Random(0)
+    # Prices inside the opening range never trigger an entry, nor reach the long SL or TP
+    prices = [round(rng.uniform(19990.0, 20030.0), 2) for _ in range(n_ticks)]
+
+    print(f"{'':<20}{'baseline':>12}{'current':>12}")
+    compare("flat (no trigger)", make_app(), prices)
+    # SL and TP rest at the broker, so in a trade only the EOD cutoff is checked per tick
+    compare("long (EOD check)", make_app_in_trade(), prices)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,79 @@
+"""
+Startup benchmark: time from a fresh interpreter to a connected BreakoutApp.
+
+Run from the repository root:
+    python benchmarks/bench_startup.py [runs]
+
+Each run is a new process, so nothing is warm in sys.modules. Two start paths are compared:
+  calendar  what main() did before the session table: exchange_calendars imported at load
+            and the NYSE calendar built to look today up
+  table     the fast start: deferred heavy imports and the persisted session table
+The TWS handshake is not part of the measurement; connect() is replaced by the immediate
+nextValidId the replay harness uses, so the numbers are the app's own startup cost.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODES = ('calendar', 'table')
+STAGES = ('import', 'sessions', 'connected')
+
+
+def child(mode, table_dir):
+    start = time.perf_counter()
+    sys.path.insert(0, ROOT)
+    if mode == 'calendar':
+        import exchange_calendars as xcals
+    import main
+    imported = time.perf_counter()
+
+    today = main.datetime.now().date()
+    if mode == 'calendar':
+        from scheduler import session_times
+        session_times(xcals.get_calendar("NYSE"), today)
+    else:
+        main.cached_session_times(today, directory=table_dir)
+    sessions = time.perf_counter()
+
+    app = main.BreakoutApp(index_symbol="NQ", opening_time="09:30")
+    app.connect = lambda host, port, clientId: app.nextValidId(1)
+    app.connect("127.0.0.1", 7497, clientId=123)
+    connected = time.perf_counter()
+    main.log_listener.stop()
+    print(json.dumps({'import': imported - start, 'sessions': sessions - start, 'connected': connected - start}))
+
+
+def run(mode, table_dir, workdir):
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', mode, table_dir],
+                         cwd=workdir, capture_output=True, text=True, check=True).stdout
+    stages = json.loads(out.strip().splitlines()[-1])
+    stages['process'] = time.perf_counter() - start
+    return stages
+
+
+def main(runs=5):
+    workdir = tempfile.mkdtemp(prefix='bench_startup_')  # main.py opens its log files in the working directory
+    table_dir = os.path.join(workdir, 'session_tables')
+    subprocess.run([sys.executable, '-c', f"import sys; sys.path.insert(0, {ROOT!r}); from datetime import date; "
+                    f"from session_table import cached_session_times; cached_session_times(date.today(), directory={table_dir!r})"],
+                   cwd=workdir, check=True, capture_output=True)
+
+    print(f"{'mode':<10} {'import':>9} {'sessions':>9} {'connected':>10} {'process':>9}   (median of {runs}, seconds)")
+    for mode in MODES:
+        results = [run(mode, table_dir, workdir) for _ in range(runs)]
+        medians = {key: statistics.median(r[key] for r in results) for key in STAGES + ('process',)}
+        print(f"{mode:<10} {medians['import']:>9.3f} {medians['sessions']:>9.3f} {medians['connected']:>10.3f} "
+              f"{medians['process']:>9.3f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        child(sys.argv[2], sys.argv[3])
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
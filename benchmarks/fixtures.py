@@ -0,0 +1,33 @@
+"""
+BreakoutApp fixtures shared by the benchmarks and the tests.
+
+The opening candle is green: long above 20045 (20040 + entry_buffer 5), stop 19972,
+target 20040 + 0.8 * 60 = 20088; short below 19975, stop 20048, target 19932.
+"""
+from main import BreakoutApp
+
+OPENING_CANDLE = {'Open': 20000.0, 'High': 20040.0, 'Low': 19980.0, 'Close': 20030.0, 'Volume': 0}
+
+
+def make_app(app=None):
+    """
+    Set OPENING_CANDLE on `app`, so its session levels are computed and ticks are traded.
+
+    Args:
+        app (BreakoutApp): App to prepare, e.g. a connected ReplayApp; defaults to a new NQ BreakoutApp.
+    """
+    if app is None:
+        app = BreakoutApp(index_symbol="NQ", opening_time="09:30")
+    app.set_opening_candle(dict(OPENING_CANDLE), "fixture")
+    return app
+
+
+def make_app_in_trade():
+    # SL and TP rest at the broker, so in a trade process_price only checks the EOD cutoff
+    app = make_app()
+    app.levels = app.levels._replace(eod_cutoff=float('inf'))  # stay before the close
+    app.position = 'long'
+    app.entry_price = 20040.0
+    app.sl_price = app.levels.long_sl
+    app.tp_price = app.levels.long_tp
+    return app
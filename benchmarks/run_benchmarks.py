@@ -0,0 +1,220 @@
+"""
+Benchmark suite for the backtest and live hot paths, on synthetic data (no network).
+
+Run from the repository root:
+    python benchmarks/run_benchmarks.py [--quick] [--only PATTERN] [--output FILE]
+                                        [--baseline FILE [--threshold 0.2] [--fail-on-regression]]
+
+Each benchmark is repeated until it has run for --min-time seconds (at most --max-repeat times)
+and the best time is kept. Results are written as JSON so runs can be compared over time; with
+--baseline, every benchmark slower than the baseline by more than --threshold is reported, and
+--fail-on-regression turns that into a non-zero exit status.
+"""
+import argparse
+import atexit
+import contextlib
+import fnmatch
+import io
+import json
+import logging
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backtesting import BreakoutStrategy, run_backtest
+from bar_cache import BarStore, CSVSource, _safe_name
+from replay import make_bar
+from vectorized import analyze_days
+from fixtures import make_app, make_app_in_trade
+from synthetic import INTERVALS, PERIODS, synthetic_bars, synthetic_ticks
+
+OPENING_TIME = '14:45'  # run_backtest's default
+TICK_BURSTS = (10_000, 100_000, 1_000_000)
+INGEST_PERIODS = ('1mo', '1y')  # one BarData object per bar; 10 years of 1m bars would not fit a request anyway
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+def measure(fn, setup=None, min_time=1.0, max_repeat=5):
+    """
+    Time fn(setup()) repeatedly and return (best seconds, repeats); setup is not timed.
+    """
+    best = float('inf')
+    total = 0.0
+    repeats = 0
+    while repeats < max_repeat and (repeats == 0 or total < min_time):
+        state = setup() if setup else None
+        start = time.perf_counter()
+        fn(state)
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+        total += elapsed
+        repeats += 1
+    return best, repeats
+
+
+def bench_analyze_day(bars):
+    days = [day_data for _, day_data in bars.groupby(bars.index.date)]
+
+    def run(_):
+        strategy = BreakoutStrategy()
+        for day_data in days:
+            strategy.analyze_day(day_data, OPENING_TIME)
+    return run
+
+
+def bench_analyze_days(bars):
+    return lambda _: analyze_days(bars, OPENING_TIME)
+
+
+def bench_run_backtest(directory, engine):
+    store = BarStore(os.path.join(directory, 'cache'), source=CSVSource(directory))
+
+    def run(_):
+        with contextlib.redirect_stdout(io.StringIO()):
+            run_backtest('^IXIC', OPENING_TIME, engine=engine, store=store)
+    return run
+
+
+def bench_process_price(prices):
+    def run(app):
+        process_price = app.process_price
+        for price in prices:
+            process_price(price)
+    return run
+
+
+def bench_historical_data(bars):
+    def run(app):
+        for bar in bars:
+            app.historicalData(app.historical_req_id, bar)
+        app.historicalDataEnd(app.historical_req_id, "", "")
+    return run
+
+
+def collect(quick=False):
+    """
+    Yield (name, callable, setup, items, unit) for every benchmark in the suite.
+    """
+    periods = [(label, n_days) for label, n_days in PERIODS if not (quick and label == '10y')]
+    for label, n_days in periods:
+        for interval in INTERVALS:
+            bars = synthetic_bars(n_days, interval, seed=n_days + interval)
+            n_days_actual = len(set(bars.index.date))
+            yield f'analyze_day/loop/{label}-{interval}m', bench_analyze_day(bars), None, n_days_actual, 'days'
+            yield f'analyze_day/vectorized/{label}-{interval}m', bench_analyze_days(bars), None, n_days_actual, 'days'
+            if label in INGEST_PERIODS:
+                bar_data = [make_bar(ts, row.Open, row.High, row.Low, row.Close, row.Volume)
+                            for ts, row in zip(bars.index, bars.itertuples(index=False))]
+                yield f'historicalData/{label}-{interval}m', bench_historical_data(bar_data), make_app, len(bar_data), 'bars'
+
+    # run_backtest loads the last 55 days from the store, so the data has to end today
+    directory = tempfile.mkdtemp(prefix='bench_backtest_')
+    start = (datetime.now() - timedelta(days=90)).strftime('%Y-%m-%d')
+    backtest_bars = synthetic_bars(70, 15, start=start, seed=1)
+    backtest_bars.to_csv(os.path.join(directory, f"{_safe_name('^IXIC')}_15m.csv"))
+    atexit.register(shutil.rmtree, directory, ignore_errors=True)
+    _in_directory(directory, bench_run_backtest(directory, 'vectorized'))(None)  # fill the parquet cache
+    for engine in ('loop', 'vectorized'):
+        yield f'run_backtest/{engine}', _in_directory(directory, bench_run_backtest(directory, engine)), None, 1, 'runs'
+
+    for n_ticks in TICK_BURSTS:
+        if quick and n_ticks > 100_000:
+            continue
+        # Prices inside the opening range never trigger an entry; in a trade no price exits
+        flat = synthetic_ticks(n_ticks, seed=n_ticks, start_price=20010.0, bounds=(19990.0, 20030.0))
+        in_trade = synthetic_ticks(n_ticks, seed=n_ticks, start_price=20030.0, bounds=(19980.0, 20080.0))
+        yield f'process_price/flat/{n_ticks}', bench_process_price(flat), make_app, n_ticks, 'ticks'
+        yield f'process_price/long/{n_ticks}', bench_process_price(in_trade), make_app_in_trade, n_ticks, 'ticks'
+
+
+def _in_directory(directory, fn):
+    # run_backtest writes backtest_results.parquet to the working directory
+    def run(state):
+        cwd = os.getcwd()
+        os.chdir(directory)
+        try:
+            fn(state)
+        finally:
+            os.chdir(cwd)
+    return run
+
+
+def compare(results, baseline, threshold):
+    """
+    Print each benchmark's time against the baseline and return the names that regressed.
+    """
+    regressions = []
+    print(f"\n{'benchmark':<40} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        change = result['seconds'] / previous['seconds'] - 1
+        flag = ''
+        if change > threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:<40} {previous['seconds']:>10.4f} {result['seconds']:>10.4f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--quick', action='store_true', help='skip the 10-year datasets and the 1M-tick bursts')
+    parser.add_argument('--only', help='run only benchmarks whose name matches this glob (e.g. "process_price/*")')
+    parser.add_argument('--output', help='JSON results file (default: benchmarks/results/<timestamp>.json)')
+    parser.add_argument('--baseline', help='JSON results file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed slowdown vs the baseline (0.2 = 20%%)')
+    parser.add_argument('--fail-on-regression', action='store_true', help='exit with status 1 on a regression')
+    parser.add_argument('--min-time', type=float, default=1.0, help='seconds to keep repeating each benchmark')
+    parser.add_argument('--max-repeat', type=int, default=5, help='maximum repetitions of each benchmark')
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.INFO)
+    results = {}
+    for name, fn, setup, items, unit in collect(args.quick):
+        if args.only and not fnmatch.fnmatch(name, args.only):
+            continue
+        seconds, repeats = measure(fn, setup, args.min_time, args.max_repeat)
+        results[name] = {'seconds': seconds, 'repeats': repeats, 'items': items, 'unit': unit,
+                         'rate': items / seconds}
+        print(f"{name:<40} {seconds:>10.4f}s {items / seconds:>14,.0f} {unit}/s")
+
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'machine': platform.platform(),
+        'results': results,
+    }
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults saved to '{output}'")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) slower than the baseline by more than {args.threshold:.0%}")
+            if args.fail_on_regression:
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""
+Synthetic market data for the benchmarks: regular-session OHLC bars and tick bursts.
+
+Everything is seeded, so two runs of the suite time exactly the same inputs.
+"""
+import numpy as np
+import pandas as pd
+
+# (label, trading days) of the dataset sizes used by the suite
+PERIODS = (('1mo', 21), ('1y', 252), ('10y', 2520))
+INTERVALS = (1, 15)  # bar size in minutes
+SESSION_MINUTES = 390  # 09:30-16:00
+
+
+def synthetic_bars(n_days, interval_minutes=15, start='2015-01-02', seed=0, start_price=15000.0, volatility=2.0):
+    """
+    Generate random-walk regular-session bars shaped like fetch_data's output.
+
+    Args:
+        n_days (int): Number of business days to generate.
+        interval_minutes (int): Bar size in minutes (must divide 390).
+        start (str): First business day in 'YYYY-MM-DD' format.
+        seed (int): Random seed.
+        start_price (float): Price at the first open.
+        volatility (float): Standard deviation of the one-minute price change, in points.
+
+    Returns:
+        pd.DataFrame: Open, High, Low, Close and Volume indexed by naive US/Eastern bar start times.
+    """
+    rng = np.random.default_rng(seed)
+    days = pd.bdate_range(start, periods=n_days)
+    offsets = pd.to_timedelta(570 + np.arange(SESSION_MINUTES // interval_minutes) * interval_minutes, unit='min')
+    index = pd.DatetimeIndex((days.values[:, None] + offsets.values[None, :]).ravel(), name='Datetime')
+
+    n = len(index)
+    sigma = volatility * np.sqrt(interval_minutes)
+    close = start_price + np.cumsum(rng.normal(0.0, sigma, n))
+    open_ = np.concatenate(([start_price], close[:-1]))
+    wicks = np.abs(rng.normal(0.0, sigma / 2, (2, n)))
+    high = np.maximum(open_, close) + wicks[0]
+    low = np.minimum(open_, close) - wicks[1]
+    return pd.DataFrame({
+        'Open': _tick_round(open_),
+        'High': _tick_round(high),
+        'Low': _tick_round(low),
+        'Close': _tick_round(close),
+        'Volume': rng.integers(100, 5000, n),
+    }, index=index)
+
+
+def synthetic_ticks(n_ticks, seed=0, start_price=20000.0, volatility=0.5, bounds=None):
+    """
+    Generate a random-walk burst of trade prices.
+
+    Args:
+        n_ticks (int): Number of prices.
+        seed (int): Random seed.
+        start_price (float): First price.
+        volatility (float): Standard deviation of the tick-to-tick change, in points.
+        bounds (tuple): Optional (low, high) the walk is clipped to, e.g. to stay between SL and TP.
+
+    Returns:
+        list[float]: Prices rounded to the 0.25 tick.
+    """
+    rng = np.random.default_rng(seed)
+    prices = start_price + np.cumsum(rng.normal(0.0, volatility, n_ticks))
+    if bounds is not None:
+        prices = np.clip(prices, *bounds)
+    return _tick_round(prices).tolist()
+
+
+def _tick_round(values):
+    return np.round(values * 4) / 4
@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from vectorized import day_levels, to_day_bars
+
+CHUNK_ROWS = 1_000_000
+
+
+def _price_columns(names):
+    """Return the (time, high, low) column names of a bar file, or (time, price, price) of a tick file."""
+    lookup = {name.lower(): name for name in names}
+    time_column = lookup.get('datetime', lookup.get('timestamp', names[0]))
+    if 'high' in lookup and 'low' in lookup:
+        return time_column, lookup['high'], lookup['low']
+    return time_column, lookup['price'], lookup['price']
+
+
+def _chunk_arrays(frame, time_column, high_column, low_column):
+    times = pd.DatetimeIndex(pd.to_datetime(frame[time_column]))
+    if times.tz is not None:
+        times = times.tz_localize(None)
+    return (times.values.astype('datetime64[ns]').view(np.int64),
+            frame[high_column].to_numpy(dtype=np.float64),
+            frame[low_column].to_numpy(dtype=np.float64))
+
+
+def iter_chunks(path, chunk_rows=CHUNK_ROWS):
+    """
+    Stream a lower-timeframe file in chunks of at most chunk_rows rows.
+
+    The file is a Parquet (e.g., a BarStore '1m.parquet') or CSV file sorted by time, holding
+    either bars (Datetime, High, Low, ...) or ticks (timestamp, price) in naive local time,
+    like the 15-minute bars. Only the time and price columns are read.
+
+    Yields:
+        tuple: (int64 nanosecond timestamps, high, low) arrays; for ticks high and low are the price.
+    """
+    if path.endswith('.parquet'):
+        parquet = pq.ParquetFile(path)
+        columns = _price_columns(parquet.schema_arrow.names)
+        for batch in parquet.iter_batches(batch_size=chunk_rows, columns=list(dict.fromkeys(columns))):
+            yield _chunk_arrays(batch.to_pandas(ignore_metadata=True), *columns)
+    else:
+        columns = None
+        for frame in pd.read_csv(path, chunksize=chunk_rows):
+            columns = columns or _price_columns(list(frame.columns))
+            yield _chunk_arrays(frame, *columns)
+
+
+def ambiguous_bars(bars, opening_time, sl_offset=8, tp_ratio=0.8, entry_buffer=0):
+    """
+    Find the bars whose outcome depends on the price path inside the bar.
+
+    A bar is ambiguous when it crosses both entry triggers, triggers an entry and reaches that
+    trade's stop loss, or reaches both the stop loss and the take profit of either side. This
+    covers every bar where BreakoutStrategy.analyze_day has to guess the order of events.
+
+    Args:
+        bars (DayBars): Bars of all days, see vectorized.to_day_bars.
+        opening_time (str): Time of the opening candle in 'HH:MM' format (e.g., '14:45').
+        sl_offset, tp_ratio, entry_buffer (float): Strategy parameters.
+
+    Returns:
+        np.ndarray: Indices of the ambiguous bars, in time order.
+    """
+    levels = day_levels(bars, opening_time, sl_offset, tp_ratio, entry_buffer)
+    if levels is None:
+        return np.empty(0, dtype=np.int64)
+    slot = levels.slot
+    after_open = levels.in_kept_day & (np.arange(len(bars.timestamps)) >= levels.later_start[slot])
+    long_break = bars.high > levels.long_entry[slot]
+    short_break = bars.low < levels.short_entry[slot]
+    long_sl_hit = bars.low <= levels.long_sl[slot]
+    short_sl_hit = bars.high >= levels.short_sl[slot]
+    long_tp_hit = bars.high >= levels.long_tp[slot]
+    short_tp_hit = bars.low <= levels.short_tp[slot]
+    ambiguous = ((long_break & short_break) | (long_break & long_sl_hit) | (short_break & short_sl_hit)
+                 | (long_sl_hit & long_tp_hit) | (short_sl_hit & short_tp_hit))
+    return np.flatnonzero(after_open & ambiguous)
+
+
+def load_windows(path, window_starts, window_ns, chunk_rows=CHUNK_ROWS):
+    """
+    Collect the lower-timeframe rows falling inside each [start, start + window_ns) window.
+
+    The file is read once, chunk by chunk, and merged against the sorted windows, so memory
+    holds one chunk plus the rows actually kept. Reading stops after the last window.
+
+    Args:
+        path (str): Lower-timeframe file, see iter_chunks.
+        window_starts (np.ndarray): Sorted int64 nanosecond window starts.
+        window_ns (int): Window length in nanoseconds (the coarse bar size).
+        chunk_rows (int): Rows per chunk.
+
+    Returns:
+        dict: window start (int64 ns) -> (k, 2) array of [high, low] rows in time order.
+    """
+    starts = np.asarray(window_starts, dtype=np.int64)
+    ends = starts + window_ns
+    pieces = {}
+    if len(starts) == 0:
+        return pieces
+    for timestamps, high, low in iter_chunks(path, chunk_rows):
+        if len(timestamps) == 0:
+            continue
+        # Windows overlapping this chunk
+        first = np.searchsorted(ends, timestamps[0], side='right')
+        last = np.searchsorted(starts, timestamps[-1], side='right')
+        lo = np.searchsorted(timestamps, starts[first:last], side='left')
+        hi = np.searchsorted(timestamps, ends[first:last], side='left')
+        for window, row_start, row_end in zip(range(first, last), lo, hi):
+            if row_end > row_start:
+                rows = np.column_stack((high[row_start:row_end], low[row_start:row_end]))
+                pieces.setdefault(int(starts[window]), []).append(rows)
+        if timestamps[-1] >= ends[-1]:
+            break
+    return {start: np.concatenate(rows) for start, rows in pieces.items()}
+
+
+def load_intrabar(index_data, path, opening_time, bar_minutes=15, chunk_rows=CHUNK_ROWS, **params):
+    """
+    Load lower-timeframe bars or ticks for the ambiguous bars of index_data only.
+
+    Args:
+        index_data (pd.DataFrame): Coarse OHLC bars indexed by naive timestamps.
+        path (str): Lower-timeframe file, see iter_chunks.
+        opening_time (str): Time of the opening candle in 'HH:MM' format (e.g., '14:45').
+        bar_minutes (int): Size of the coarse bars.
+        chunk_rows (int): Rows read from the file at a time.
+        **params: Strategy parameters (sl_offset, tp_ratio, entry_buffer).
+
+    Returns:
+        dict: coarse bar timestamp (pd.Timestamp) -> (k, 2) array of [high, low] rows, as
+        expected by BreakoutStrategy(intrabar=...).
+    """
+    bars = to_day_bars(index_data)
+    window_starts = bars.timestamps[ambiguous_bars(bars, opening_time, **params)]
+    windows = load_windows(path, window_starts, bar_minutes * 60 * 10**9, chunk_rows)
+    return {pd.Timestamp(start): rows for start, rows in windows.items()}
@@ -0,0 +1,90 @@
+import logging
+import struct
+import sys
+
+import numpy as np
+
+# Event, side and result codes stored in the journal
+ENTRY, EXIT, ENTRY_FILL, EXIT_FILL = 1, 2, 3, 4
+EVENTS = {ENTRY: 'ENTRY', EXIT: 'EXIT', ENTRY_FILL: 'ENTRY_FILL', EXIT_FILL: 'EXIT_FILL'}
+SIDES = {0: '', 1: 'LONG', 2: 'SHORT'}
+RESULTS = {0: '', 1: 'SL Hit', 2: 'TP Hit', 3: 'EOD'}
+SIDE_CODES = {'long': 1, 'short': 2}
+RESULT_CODES = {'SL Hit': 1, 'TP Hit': 2, 'EOD': 3}
+
+# One fixed-size little-endian record per trade event (59 bytes, no padding)
+RECORD = struct.Struct('<dBBBqdddd8s')
+RECORD_DTYPE = np.dtype([
+    ('timestamp', '<f8'), ('event', 'u1'), ('side', 'u1'), ('result', 'u1'), ('order_id', '<i8'),
+    ('price', '<f8'), ('sl', '<f8'), ('tp', '<f8'), ('points', '<f8'), ('symbol', 'S8'),
+])
+assert RECORD.size == RECORD_DTYPE.itemsize
+
+
+class JournalHandler(logging.Handler):
+    """
+    Appends trade events to a compact binary journal.
+
+    Only records logged with extra={'trade': {...}} are written. The handler is meant to sit
+    behind a QueueListener, so the file write happens on the listener thread, not the caller's.
+    """
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self.file = open(path, 'ab')
+
+    def filter(self, record):
+        return hasattr(record, 'trade') and super().filter(record)
+
+    def emit(self, record):
+        trade = record.trade
+        try:
+            self.file.write(RECORD.pack(
+                record.created,
+                trade['event'],
+                SIDE_CODES.get(trade.get('side'), 0),
+                RESULT_CODES.get(trade.get('result'), 0),
+                trade.get('order_id', -1),
+                trade.get('price', np.nan),
+                trade.get('sl', np.nan),
+                trade.get('tp', np.nan),
+                trade.get('points', np.nan),
+                trade.get('symbol', '').encode()[:8],
+            ))
+            self.file.flush()
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        self.file.close()
+        super().close()
+
+
+def read_journal(path):
+    """
+    Load a trade journal into a DataFrame with decoded event, side and result names.
+
+    Args:
+        path (str): Journal file written by JournalHandler.
+    """
+    import pandas as pd
+
+    raw = np.fromfile(path, dtype=np.uint8)
+    # Ignore a trailing partial record left by an interrupted write
+    usable = len(raw) - len(raw) % RECORD_DTYPE.itemsize
+    journal = pd.DataFrame(raw[:usable].view(RECORD_DTYPE))
+    journal['timestamp'] = pd.to_datetime(journal['timestamp'], unit='s', utc=True).dt.tz_convert('US/Eastern')
+    journal['event'] = journal['event'].map(EVENTS)
+    journal['side'] = journal['side'].map(SIDES)
+    journal['result'] = journal['result'].map(RESULTS)
+    journal['symbol'] = journal['symbol'].str.decode('ascii')
+    return journal
+
+
+if __name__ == "__main__":
+    # Usage: python journal.py trade_journal.bin [trade_journal.csv]
+    journal_path = sys.argv[1] if len(sys.argv) > 1 else 'trade_journal.bin'
+    csv_path = sys.argv[2] if len(sys.argv) > 2 else 'trade_journal.csv'
+    read_journal(journal_path).to_csv(csv_path, index=False)
+    print(f"Journal exported to '{csv_path}'")
@@ -0,0 +1,139 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SUB_BUCKET_BITS = 4  # 16 buckets per power of two: values are kept to within ~6%
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+LATENCIES = ('decision', 'submit', 'fill')
+
+
+class LatencyHistogram:
+    """
+    HDR-style histogram of nanosecond durations in fixed log-linear buckets.
+
+    Values below 2 * SUB_BUCKETS are counted exactly; above that every power of two is split
+    into SUB_BUCKETS equal buckets. Recording is a few integer operations and one list
+    increment, and memory does not grow with the number of samples.
+    """
+
+    def __init__(self, max_bits=48):
+        self.counts = [0] * ((max_bits + 1) * SUB_BUCKETS)
+        self.count = 0
+        self.max = 0
+
+    def record(self, value):
+        value = max(int(value), 0)
+        shift = value.bit_length() - SUB_BUCKET_BITS - 1
+        if shift <= 0:
+            index = value
+        else:
+            index = (shift + 1) * SUB_BUCKETS + ((value >> shift) & (SUB_BUCKETS - 1))
+        self.counts[min(index, len(self.counts) - 1)] += 1
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    @staticmethod
+    def bucket_high(index):
+        """Highest value counted in bucket `index`."""
+        if index < 2 * SUB_BUCKETS:
+            return index
+        shift = index // SUB_BUCKETS - 1
+        return ((SUB_BUCKETS + index % SUB_BUCKETS + 1) << shift) - 1
+
+    def percentile(self, q):
+        """Value at percentile q (0-100), to bucket precision; 0 if nothing was recorded."""
+        if not self.count:
+            return 0
+        rank = max(1, -(-self.count * q // 100))
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(self.bucket_high(index), self.max)
+        return self.max
+
+    def summary(self):
+        """Count plus p50, p99 and max in microseconds."""
+        return {'count': self.count, 'p50_us': self.percentile(50) / 1e3,
+                'p99_us': self.percentile(99) / 1e3, 'max_us': self.max / 1e3}
+
+
+class LatencyRecorder:
+    """
+    Per-session latency and slippage of the live order path, on the monotonic clock.
+
+    decision: tickPrice receipt -> the order decision taken on that tick
+    submit:   the decision -> placeOrder returned
+    fill:     placeOrder -> orderStatus reporting the order filled (market orders only;
+              resting bracket exits fill whenever the price gets there)
+    """
+
+    def __init__(self):
+        self.histograms = {name: LatencyHistogram() for name in LATENCIES}
+        self.tick_received = None  # set by tickPrice; None outside the tick path
+        self.sent = {}             # orderId -> placeOrder time
+        self.slippage = []
+
+    def decided(self):
+        """Mark an order decision; returns its time for submitted()."""
+        now = time.perf_counter_ns()
+        if self.tick_received is not None:
+            self.histograms['decision'].record(now - self.tick_received)
+        return now
+
+    def submitted(self, order_id, decided):
+        now = time.perf_counter_ns()
+        self.histograms['submit'].record(now - decided)
+        self.sent[order_id] = now
+
+    def filled(self, order_id):
+        sent = self.sent.pop(order_id, None)
+        if sent is not None:
+            self.histograms['fill'].record(time.perf_counter_ns() - sent)
+
+    def record_slippage(self, order_id, role, action, modelled, fill_price):
+        """Record a fill against its modelled price; positive points are against us."""
+        points = fill_price - modelled if action == 'BUY' else modelled - fill_price
+        self.slippage.append({'order_id': order_id, 'role': role, 'action': action,
+                              'modelled': modelled, 'fill': fill_price, 'points': points})
+
+    def summary(self):
+        report = {name: histogram.summary() for name, histogram in self.histograms.items()}
+        by_role = {}
+        for fill in self.slippage:
+            by_role.setdefault(fill['role'], []).append(fill['points'])
+        report['slippage'] = {role: {'count': len(points), 'mean_points': sum(points) / len(points),
+                                     'max_points': max(points)} for role, points in by_role.items()}
+        report['fills'] = list(self.slippage)
+        return report
+
+    def write(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+        return path
+
+
+def serve_metrics(summary, port, host='127.0.0.1'):
+    """
+    Serve summary() as JSON on http://host:port/ from a daemon thread.
+
+    Returns:
+        ThreadingHTTPServer: Call shutdown() on it to stop serving.
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = json.dumps(summary()).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # keep requests out of stderr
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
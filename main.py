@@ -1,322 +1,788 @@
-import pandas as pd
+import numpy as np
 from ibapi.client import EClient
 from ibapi.wrapper import EWrapper
 from ibapi.contract import Contract
-from ibapi.order import Order
 import threading
 import time
-from datetime import datetime, timedelta, time as dt_time
+from datetime import date, datetime, time as dt_time
+from typing import NamedTuple
 import pytz
-import exchange_calendars as xcals
+import atexit
+import json
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from journal import JournalHandler, ENTRY, EXIT, ENTRY_FILL, EXIT_FILL
+from scheduler import SessionScheduler
+from session_table import cached_session_times
+from latency import LatencyRecorder, serve_metrics
+from tick_queue import ConflatingTickQueue
+from tick_recorder import TickRecorder, session_path
+from metrics import MetricsAccumulator
+from orders import (ENTRY as ENTRY_ORDER, FILLED, FLATTEN, STOP, TARGET, OrderBook, bracket_orders, market_order,
+                    round_to_tick)
+from trade_store import COLOR_CODES, NOT_TRIGGERED, RESULT_CODES, RESULT_NAMES, SL_HIT, TP_HIT, TRIGGERED, TradeBuffer
 
-logging.basicConfig(filename='breakout_trading.log', level=logging.INFO, 
-                    format='%(asctime)s - %(levelname)s - %(message)s')
+class DeferredQueueHandler(QueueHandler):
+    """QueueHandler that leaves all formatting to the listener thread."""
 
-trade_logger = logging.getLogger('trade_logger')
+    def prepare(self, record):
+        return record
+
+class RateLimitFilter(logging.Filter):
+    """Lets through at most one record per message template every `interval` seconds."""
+
+    def __init__(self, interval=1.0):
+        super().__init__()
+        self.interval = interval
+        self.last_emit = {}
+        self.suppressed = {}
+
+    def filter(self, record):
+        now = time.monotonic()
+        key = record.msg
+        if now - self.last_emit.get(key, -self.interval) < self.interval:
+            self.suppressed[key] = self.suppressed.get(key, 0) + 1
+            return False
+        self.last_emit[key] = now
+        skipped = self.suppressed.pop(key, 0)
+        if skipped:
+            record.msg = f"{record.msg} ({skipped} similar suppressed)"
+        return True
+
+# All handlers run on the listener thread; callers only enqueue records
+log_handler = logging.FileHandler('breakout_trading.log')
+log_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
 trade_handler = logging.FileHandler('trade_execution.log')
 trade_handler.setFormatter(logging.Formatter('%(asctime)s - %(message)s'))
-trade_logger.addHandler(trade_handler)
+trade_handler.addFilter(logging.Filter('trade_logger'))
+journal_handler = JournalHandler('trade_journal.bin')
+log_queue = queue.SimpleQueue()
+log_listener = QueueListener(log_queue, log_handler, trade_handler, journal_handler, respect_handler_level=True)
+log_listener.start()
+atexit.register(log_listener.stop)
+
+logging.getLogger().addHandler(DeferredQueueHandler(log_queue))
+logging.getLogger().setLevel(logging.INFO)
+
+trade_logger = logging.getLogger('trade_logger')
 trade_logger.setLevel(logging.INFO)
 
+# Per-tick messages are sampled so a busy open cannot flood the log
+tick_logger = logging.getLogger('ticks')
+tick_logger.addFilter(RateLimitFilter(interval=1.0))
+
+EASTERN = pytz.timezone('US/Eastern')
+MARKET_DATA_TYPE = 3  # 1 = live, 3 = delayed; with delayed data the opening candle comes from historical bars only
+LAST_PRICE_TICKS = (4, 68)  # LAST, DELAYED_LAST
+LAST_SIZE_TICKS = (5, 71)   # LAST_SIZE, DELAYED_LAST_SIZE
+PRICE_TICKS = frozenset((1, 2, 4, 66, 67, 68))  # BID, ASK, LAST and their delayed versions
+ORDER_TIMEOUT = 30        # seconds before an unfilled order is reported
+HISTORICAL_RETRY = 25     # seconds between historical opening-candle requests
+HISTORICAL_KEEP_UP_TO_DATE = True  # subscribe to new bars instead of re-requesting the window on retries
+HISTORICAL_DATE_FORMAT = '%Y%m%d %H:%M:%S'  # bar.date with formatDate=1, in US/Eastern
+SHUTDOWN_DELAY = 70       # seconds after the close before the session shuts down
+LATENCY_METRICS_FILE = 'latency_metrics.json'  # written at session end
+METRICS_HTTP_PORT = None  # e.g. 8000 to also serve the latency metrics on http://127.0.0.1:8000/
+RECORD_TICKS = True       # keep every tick of the session in ticks/<symbol>_<date>.ticks
+COMPRESS_TICKS = True     # gzip the tick file once the session is over
+STRATEGY_THREAD = True    # decide on conflated ticks in a strategy thread instead of the ibapi reader thread
+
+class BarAggregator:
+    """Builds fixed-size OHLC bars from trade ticks as they arrive."""
+
+    def __init__(self, bar_seconds=15 * 60):
+        self.bar_seconds = bar_seconds
+        self.bars = {}  # window start (epoch seconds) -> completed bar
+        self.current = None
+        self.current_start = None
+        self.streaming_since = None  # when the market data subscription started
+        self.lock = threading.Lock()
+
+    def add_trade(self, price, timestamp):
+        """Add a trade at epoch time `timestamp`; returns the bar it completed, if any."""
+        start = int(timestamp // self.bar_seconds) * self.bar_seconds
+        with self.lock:
+            if start == self.current_start:
+                bar = self.current
+                if price > bar['High']:
+                    bar['High'] = price
+                elif price < bar['Low']:
+                    bar['Low'] = price
+                bar['Close'] = price
+                return None
+            if self.current_start is not None and start < self.current_start:
+                return None  # late tick from an already closed window
+            completed = self._close()
+            self.current_start = start
+            self.current = {'Open': price, 'High': price, 'Low': price, 'Close': price, 'Volume': 0}
+            return completed
+
+    def add_size(self, size):
+        with self.lock:
+            if self.current is not None:
+                self.current['Volume'] += size
+
+    def start_streaming(self, timestamp):
+        """Record that the trade stream starts at `timestamp`; a resubscription restarts it."""
+        with self.lock:
+            self.streaming_since = timestamp
+
+    def is_complete(self, bar):
+        """True if the subscription was already running when the bar's window opened, so no trade of it is missing."""
+        return self.streaming_since is not None and self.streaming_since <= bar['Date'].timestamp()
+
+    def close_until(self, timestamp):
+        """Close the current bar if its window has ended by `timestamp`; returns it, if any."""
+        with self.lock:
+            if self.current_start is not None and self.current_start + self.bar_seconds <= timestamp:
+                return self._close()
+        return None
+
+    def _close(self):
+        if self.current is None:
+            return None
+        bar = self.current
+        bar['Date'] = datetime.fromtimestamp(self.current_start, EASTERN)
+        self.bars[self.current_start] = bar
+        self.current = None
+        self.current_start = None
+        return bar
+
+class HistoricalBars:
+    """
+    Bars from reqHistoricalData in preallocated arrays, indexed by bar start (epoch seconds).
+
+    append() only copies a bar's fields; the date strings are parsed in one vectorised call
+    by index(), normally at historicalDataEnd.
+    """
+
+    def __init__(self, capacity=1024):
+        self.ohlc = np.empty((capacity, 4))
+        self.dates = np.empty(capacity, dtype=object)
+        self.size = 0
+        self.indexed = 0  # rows [0, indexed) are in self.rows
+        self.rows = {}    # bar start -> row
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, start):
+        return start in self.rows
+
+    def clear(self):
+        self.size = 0
+        self.indexed = 0
+        self.rows = {}
+
+    def append(self, bar):
+        if self.size == len(self.dates):
+            self._grow()
+        row = self.size
+        self.ohlc[row] = (bar.open, bar.high, bar.low, bar.close)
+        self.dates[row] = bar.date
+        self.size += 1
+        return row
+
+    def update(self, bar):
+        """Apply a keepUpToDate update, revising the bar with the same start or adding it; returns its start."""
+        self.index()
+        start = int(parse_bar_starts([bar.date])[0])
+        row = self.rows.get(start)
+        if row is None:
+            self.rows[start] = self.append(bar)
+            self.indexed = self.size
+        else:
+            self.ohlc[row] = (bar.open, bar.high, bar.low, bar.close)
+        return start
+
+    def index(self):
+        """Parse the dates of rows appended since the last call and add them to the index."""
+        if self.indexed == self.size:
+            return
+        starts = parse_bar_starts(self.dates[self.indexed:self.size])
+        self.rows.update(zip(starts.tolist(), range(self.indexed, self.size)))
+        self.indexed = self.size
+
+    def get(self, start):
+        """The bar starting at epoch `start` as an OHLC dict, or None."""
+        row = self.rows.get(start)
+        if row is None:
+            return None
+        open_, high, low, close = self.ohlc[row].tolist()
+        return {'Open': open_, 'High': high, 'Low': low, 'Close': close,
+                'Date': datetime.fromtimestamp(start, EASTERN)}
+
+    def _grow(self):
+        capacity = 2 * len(self.dates)
+        ohlc = np.empty((capacity, 4))
+        ohlc[:self.size] = self.ohlc[:self.size]
+        dates = np.empty(capacity, dtype=object)
+        dates[:self.size] = self.dates[:self.size]
+        self.ohlc = ohlc
+        self.dates = dates
+
+def parse_bar_starts(dates):
+    """Epoch seconds of US/Eastern bar.date strings, parsed in one call."""
+    import pandas as pd  # deferred: only needed once historical bars arrive
+
+    index = pd.to_datetime(pd.Index(dates), format=HISTORICAL_DATE_FORMAT).tz_localize(EASTERN)
+    return np.asarray((index - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1), dtype=np.int64)
+
+class SessionLevels(NamedTuple):
+    """Trading levels derived once from the opening candle."""
+    session_date: date
+    candle_color: str
+    opening_high: float
+    opening_low: float
+    long_trigger: float
+    short_trigger: float
+    long_sl: float
+    long_tp: float
+    short_sl: float
+    short_tp: float
+    eod_cutoff: float  # epoch seconds of the session close (16:00 US/Eastern unless early close)
+
 class BreakoutApp(EWrapper, EClient):
-    def __init__(self, index_symbol="NQ", opening_time="09:30"):
+    def __init__(self, index_symbol="NQ", opening_time="09:30", sl_offset=8, tp_ratio=0.8, entry_buffer=5,
+                 market_data_type=MARKET_DATA_TYPE, keep_up_to_date=HISTORICAL_KEEP_UP_TO_DATE, clock=time.time,
+                 min_tick=0.25):
         EClient.__init__(self, self)
+        self.clock = clock  # returns epoch seconds; injectable for replay
         self.nextOrderId = None
-        self.historical_data = []
+        self.order_id_lock = threading.Lock()
+        self.historical_req_id = 1
+        self.market_data_req_id = 2
+        self.historical_bars = HistoricalBars()
+        self.historical_subscribed = False  # keepUpToDate request still streaming
         self.opening_candle = None
+        self.levels = None
         self.position = None
+        self.trade_taken = False  # one trade per session, as in the backtest
+        self.last_price = None
+        self.scheduler = None
+        self.session_close = None
+        self.session_done = threading.Event()
         self.entry_price = None
         self.sl_price = None
         self.tp_price = None
         self.index_symbol = index_symbol
         self.opening_time = opening_time
+        self.sl_offset = sl_offset
+        self.tp_ratio = tp_ratio
+        self.entry_buffer = entry_buffer
+        self.min_tick = min_tick  # minimum price variation of the contract; order prices are rounded to it
+        self.market_data_type = market_data_type
+        self.keep_up_to_date = keep_up_to_date
+        self.bar_aggregator = BarAggregator()
         self.data_ready = threading.Event()
-        self.trades = []
-        self.active_orders = {}
+        self.trades = TradeBuffer(capacity=4)
+        self.trade_row = None  # row of the current trade in self.trades
+        self.metrics = MetricsAccumulator()  # fed by exit fills
+        self.orders = OrderBook()
+        self.latency = LatencyRecorder()
+        self.tick_recorder = None  # TickRecorder, when the session's ticks are kept
+        # Guards position, trade and order state between the reader, strategy and scheduler threads
+        self.state_lock = threading.RLock()
+        self.tick_queue = None       # ConflatingTickQueue while the strategy thread runs
+        self.strategy_thread = None
+        self.quantity = 1
+        self.oca_group = None    # OCA group of the current trade's exits
+        self.flatten_id = None  # working flatten order, if any
 
     def nextValidId(self, orderId: int):
         self.nextOrderId = orderId
         logging.info(f"Next valid order ID received: {orderId}")
 
     def historicalData(self, reqId, bar):
-        self.historical_data.append({
-            'Open': bar.open,
-            'High': bar.high,
-            'Low': bar.low,
-            'Close': bar.close,
-            'Date': pd.to_datetime(bar.date, format='%Y%m%d %H:%M:%S')
-        })
+        self.historical_bars.append(bar)
 
     def historicalDataEnd(self, reqId, start, end):
         logging.info("Historical data retrieval complete")
-        eastern = pytz.timezone('US/Eastern')
-        opening_candle_time = pd.to_datetime(self.opening_time, format='%H:%M').replace(
-            year=datetime.now(eastern).year, 
-            month=datetime.now(eastern).month, 
-            day=datetime.now(eastern).day
-        ).tz_localize(eastern).time()
-        for bar in self.historical_data:
-            if bar['Date'].time() == opening_candle_time:
-                self.opening_candle = bar
-                logging.info(f"Opening candle set: Open={bar['Open']}, High={bar['High']}, "
-                            f"Low={bar['Low']}, Close={bar['Close']}")
-                break
+        self.historical_bars.index()
+        bar = self.historical_bars.get(self.opening_bar_start())
+        if bar is None:
+            logging.warning("Opening candle not found.")
+            return
+        self.on_historical_opening_candle(bar)
+
+    def historicalDataUpdate(self, reqId, bar):
+        # The opening bar is complete once a later bar starts
+        start = self.historical_bars.update(bar)
+        opening_start = self.opening_bar_start()
+        if self.opening_candle is None and start > opening_start and opening_start in self.historical_bars:
+            self.on_historical_opening_candle(self.historical_bars.get(opening_start))
+
+    def on_historical_opening_candle(self, bar):
         if self.opening_candle:
-            self.data_ready.set()
+            self.cross_check_opening_candle(bar)
         else:
-            logging.warning("Opening candle not found.")
+            self.set_opening_candle(bar, "historical data")
+        if self.historical_subscribed:
+            self.cancelHistoricalData(self.historical_req_id)
+            self.historical_subscribed = False
 
-    def tickPrice(self, reqId, tickType, price, attrib):
-        logging.info(f"Received tick - Type: {tickType}, Price: {price}")
-        if tickType not in [1, 2, 4, 66, 67, 68]:
-            return
-        self.process_price(price)
+    def opening_bar_start(self, session_date=None):
+        """Epoch seconds at which the session's opening candle starts."""
+        if session_date is None:
+            session_date = datetime.fromtimestamp(self.clock(), EASTERN).date()
+        hour, minute = map(int, self.opening_time.split(":"))
+        return int(EASTERN.localize(datetime.combine(session_date, dt_time(hour, minute))).timestamp())
 
-    def process_price(self, price):
-        if not self.opening_candle:
-            return
-        now = datetime.now(pytz.timezone('US/Eastern'))
-        opening_open = self.opening_candle['Open']
-        opening_high = self.opening_candle['High']
-        opening_low = self.opening_candle['Low']
-        opening_close = self.opening_candle['Close']
+    def set_opening_candle(self, bar, source):
+        self.opening_candle = bar
+        self.levels = self.compute_levels(bar, datetime.fromtimestamp(self.clock(), EASTERN).date())
+        logging.info(f"Opening candle set from {source}: Open={bar['Open']}, High={bar['High']}, "
+                     f"Low={bar['Low']}, Close={bar['Close']}")
+        if self.levels is None:
+            logging.warning("Opening candle closed at its open. No trades today.")
+        self.data_ready.set()
 
+    def compute_levels(self, bar, session_date):
+        opening_open = bar['Open']
+        opening_high = bar['High']
+        opening_low = bar['Low']
+        opening_close = bar['Close']
         if opening_close > opening_open:
             candle_color = 'green'
-            long_sl = opening_low - 8
-            short_sl = opening_high + 8
         elif opening_close < opening_open:
             candle_color = 'red'
-            long_sl = opening_low - 8
-            short_sl = opening_high + 8
         else:
-            return
+            return None
 
         risk = opening_high - opening_low
-        long_tp = opening_high + (risk * 0.8)
-        short_tp = opening_low - (risk * 0.8)
-
-        trade_result = {
-            'Date': now.date(),
-            'Candle_Color': candle_color,
-            'Opening_High': opening_high,
-            'Opening_Low': opening_low,
-            'Long_SL': long_sl,
-            'Long_TP': long_tp,
-            'Short_SL': short_sl,
-            'Short_TP': short_tp,
-            'Long_Result': 'Not Triggered',
-            'Long_Points': 0,
-            'Short_Result': 'Not Triggered',
-            'Short_Points': 0
-        }
-
-        if self.position is None and not self.active_orders:
-            if price > opening_high + 5:
-                self.enter_trade('long', opening_high, long_sl, long_tp, trade_result)
-            elif price < opening_low - 5:
-                self.enter_trade('short', opening_low, short_sl, short_tp, trade_result)
+        eod_cutoff = self.session_close or EASTERN.localize(datetime.combine(session_date, dt_time(16, 0))).timestamp()
+        return SessionLevels(
+            session_date=session_date,
+            candle_color=candle_color,
+            opening_high=opening_high,
+            opening_low=opening_low,
+            long_trigger=opening_high + self.entry_buffer,
+            short_trigger=opening_low - self.entry_buffer,
+            long_sl=opening_low - self.sl_offset,
+            long_tp=opening_high + (risk * self.tp_ratio),
+            short_sl=opening_high + self.sl_offset,
+            short_tp=opening_low - (risk * self.tp_ratio),
+            eod_cutoff=eod_cutoff,
+        )
+
+    def cross_check_opening_candle(self, bar):
+        diffs = {k: bar[k] - self.opening_candle[k] for k in ('Open', 'High', 'Low', 'Close')
+                 if bar[k] != self.opening_candle[k]}
+        if diffs:
+            logging.warning(f"Streamed opening candle differs from historical bar: {diffs}")
+        else:
+            logging.info("Streamed opening candle matches historical bar.")
+
+    def on_bar_closed(self, bar):
+        if self.opening_candle is None and bar['Date'].strftime('%H:%M') == self.opening_time:
+            if not self.bar_aggregator.is_complete(bar):
+                # Started or reconnected mid-window: the first ticks of the candle were missed
+                logging.info("Streamed opening candle is partial. Using historical data instead.")
+                return
+            self.set_opening_candle(bar, "live ticks")
+
+    def finalize_opening_candle(self, timestamp=None):
+        """Close the streamed bar once its window has ended; True if the opening candle is set."""
+        bar = self.bar_aggregator.close_until(self.clock() if timestamp is None else timestamp)
+        if bar:
+            self.on_bar_closed(bar)
+        return self.opening_candle is not None
+
+    def subscribe_market_data(self):
+        self.reqMarketDataType(self.market_data_type)
+        if self.market_data_type != 1:
+            logging.info("Delayed market data: the opening candle is taken from historical bars only.")
+        self.bar_aggregator.start_streaming(self.clock())
+        self.reqMktData(self.market_data_req_id, self.contract, "233", False, False, [])
+
+    def stop_recording(self, compress=False):
+        """
+        Cancel market data, then close the tick file; futures keep ticking after the close.
+
+        Returns:
+            str: The tick file, or None if ticks were not recorded.
+        """
+        self.cancelMktData(self.market_data_req_id)
+        recorder, self.tick_recorder = self.tick_recorder, None  # a late tick no longer reaches the file
+        if recorder is None:
+            return None
+        path = recorder.close(compress=compress)
+        logging.info(f"{recorder.count} ticks saved to '{path}'")
+        return path
+
+    def request_opening_candle(self):
+        if self.historical_subscribed:
+            return  # new bars keep arriving through historicalDataUpdate
+        logging.info(f"Requesting historical data for {self.index_symbol} opening candle...")
+        # A keepUpToDate request must leave endDateTime empty
+        end_dt = "" if self.keep_up_to_date else datetime.fromtimestamp(self.clock(), pytz.UTC).strftime('%Y%m%d %H:%M:%S UTC')
+        # Set before sending: historicalDataEnd may be handled before reqHistoricalData returns
+        self.historical_subscribed = self.keep_up_to_date
+        self.reqHistoricalData(
+            reqId=self.historical_req_id,
+            contract=self.contract,
+            endDateTime=end_dt,
+            durationStr="3 D",
+            barSizeSetting="15 mins",
+            whatToShow="TRADES",
+            useRTH=0,
+            formatDate=1,
+            keepUpToDate=self.keep_up_to_date,
+            chartOptions=[]
+        )
+
+    def schedule_session(self, scheduler, session_date, session_close):
+        """Schedule opening-candle finalisation, the EOD flatten and shutdown at exact times."""
+        self.scheduler = scheduler
+        self.session_close = session_close
+        window_close = self.opening_bar_start(session_date) + 15 * 60
+        scheduler.schedule_at(window_close, self.on_opening_window_closed,
+                              name=f"{self.index_symbol} opening candle")
+        scheduler.schedule_at(session_close, self.close_session, name=f"{self.index_symbol} EOD flatten")
+        scheduler.schedule_at(session_close + SHUTDOWN_DELAY, self.session_done.set,
+                              name=f"{self.index_symbol} shutdown")
+
+    def on_opening_window_closed(self):
+        if self.finalize_opening_candle():
+            logging.info("Opening candle built from live ticks. Proceeding with strategy.")
+            return
+        # Fall back to historical bars until the candle is found
+        self.request_opening_candle()
+        self.scheduler.schedule_after(HISTORICAL_RETRY, self.retry_opening_candle)
+
+    def retry_opening_candle(self):
+        if self.opening_candle:
+            logging.info("Opening candle identified. Proceeding with strategy.")
+            return
+        logging.warning("Opening candle not found. Retrying...")
+        if not self.historical_subscribed:
+            self.historical_bars.clear()  # Clear previous data to avoid confusion
+            self.data_ready.clear()       # Reset event for next attempt
+        self.request_opening_candle()
+        self.scheduler.schedule_after(HISTORICAL_RETRY, self.retry_opening_candle)
+
+    def close_session(self):
+        with self.state_lock:
+            self.trade_taken = True  # no new entries after the close
+            if self.position is None:
+                return
+            self.latency.tick_received = None  # decided on the timer, not on a tick
+            self.exit_trade(self.position, 'EOD', self.last_price if self.last_price is not None else self.entry_price)
+
+    def check_order_timeout(self, orderId):
+        tracked = self.orders.get(orderId)
+        if tracked is not None and not tracked.done:
+            logging.warning(f"Order {orderId} still '{tracked.state}' after {ORDER_TIMEOUT}s")
+            print(f"Warning: Order {orderId} still '{tracked.state}' after {ORDER_TIMEOUT}s")
+
+    def allocate_order_id(self):
+        with self.order_id_lock:
+            orderId = self.nextOrderId
+            self.nextOrderId += 1
+        return orderId
+
+    def start_strategy_thread(self):
+        """Move price decisions off the reader thread: tickPrice then only queues conflated ticks."""
+        self.tick_queue = ConflatingTickQueue()
+        self.strategy_thread = threading.Thread(target=self.run_strategy, name=f"{self.index_symbol} strategy",
+                                                daemon=True)
+        self.strategy_thread.start()
+
+    def stop_strategy_thread(self):
+        if self.strategy_thread is None:
+            return
+        self.tick_queue.close()
+        self.strategy_thread.join()
+        self.strategy_thread = None
+
+    def run_strategy(self):
+        while True:
+            ticks = self.tick_queue.get()
+            if ticks is None:
+                return
+            for tick_type, price, received in ticks:
+                self.on_price(price, received)
+
+    def tickPrice(self, reqId, tickType, price, attrib):
+        received = time.perf_counter_ns()
+        recorder = self.tick_recorder
+        if recorder is not None:
+            recorder.record(reqId, tickType, price, self.clock())
+        tick_logger.info("Received tick - Type: %s, Price: %s", tickType, price)
+        # Delayed ticks arrive minutes late, so only live trades can be bucketed by arrival time
+        if tickType in LAST_PRICE_TICKS and self.market_data_type == 1:
+            bar = self.bar_aggregator.add_trade(price, self.clock())
+            if bar:
+                self.on_bar_closed(bar)
+        if tickType not in PRICE_TICKS:
+            return
+        if self.tick_queue is not None:
+            self.tick_queue.put(tickType, price, received)
+        else:
+            self.on_price(price, received)
+
+    def on_price(self, price, received):
+        with self.state_lock:
+            self.latency.tick_received = received
+            self.last_price = price
+            self.process_price(price)
+
+    def tickSize(self, reqId, tickType, size):
+        if tickType in LAST_SIZE_TICKS and self.market_data_type == 1:
+            self.bar_aggregator.add_size(size)
+
+    def process_price(self, price):
+        levels = self.levels
+        if levels is None:
+            return
+        if self.position is None:
+            if self.trade_taken:
+                return
+            if price > levels.long_trigger:
+                self.enter_trade('long', levels.opening_high, levels.long_sl, levels.long_tp)
+            elif price < levels.short_trigger:
+                self.enter_trade('short', levels.opening_low, levels.short_sl, levels.short_tp)
             else:
-                logging.info(f"No trade triggered: Price={price}, Long Trigger={opening_high + 5}, Short Trigger={opening_low - 5}")
-        elif self.position == 'long' and len(self.active_orders) < 2:
-            if price <= self.sl_price:
-                self.exit_trade('long', 'SL Hit', self.sl_price, trade_result)
-            elif price >= self.tp_price:
-                self.exit_trade('long', 'TP Hit', self.tp_price, trade_result)
-            elif now.time() >= dt_time(16, 0):
-                self.exit_trade('long', 'EOD', price, trade_result)
-        elif self.position == 'short' and len(self.active_orders) < 2:
-            if price >= self.sl_price:
-                self.exit_trade('short', 'SL Hit', self.sl_price, trade_result)
-            elif price <= self.tp_price:
-                self.exit_trade('short', 'TP Hit', self.tp_price, trade_result)
-            elif now.time() >= dt_time(16, 0):
-                self.exit_trade('short', 'EOD', price, trade_result)
-
-    def enter_trade(self, trade_type, entry_price, sl_price, tp_price, trade_result):
-        order = Order()
-        order.action = "BUY" if trade_type == 'long' else "SELL"
-        order.totalQuantity = 1
-        order.orderType = "MKT"  # Use market order to avoid rejection
-        order.eTradeOnly = False
-        order.firmQuoteOnly = False
-        orderId = self.nextOrderId
-        self.placeOrder(orderId, self.contract, order)
-        self.active_orders[orderId] = 'Submitted'
+                tick_logger.info("No trade triggered: Price=%s, Long Trigger=%s, Short Trigger=%s",
+                                 price, levels.long_trigger, levels.short_trigger)
+        # SL and TP rest at the broker; only the EOD flatten is decided here
+        elif self.flatten_id is None and self.clock() >= levels.eod_cutoff:
+            self.exit_trade(self.position, 'EOD', price)
+
+    def enter_trade(self, trade_type, entry_price, sl_price, tp_price):
+        decided = self.latency.decided()
+        action = "BUY" if trade_type == 'long' else "SELL"
+        # TWS rejects prices off the contract's tick grid (error 110)
+        sl_price = round_to_tick(sl_price, self.min_tick)
+        tp_price = round_to_tick(tp_price, self.min_tick)
+        orderId = self.allocate_order_id()
+        target_id = self.allocate_order_id()
+        stop_id = self.allocate_order_id()
+        self.oca_group = f"{self.index_symbol}-{self.levels.session_date:%Y%m%d}-{orderId}"
+        for order_id, order in bracket_orders(orderId, target_id, stop_id, action, self.quantity,
+                                              tp_price, sl_price, self.oca_group):
+            self.placeOrder(order_id, self.contract, order)
+        self.latency.submitted(orderId, decided)
+        self.orders.add(orderId, ENTRY_ORDER, trade_type, self.quantity, price=entry_price)
+        self.orders.add(target_id, TARGET, trade_type, self.quantity, price=tp_price)
+        self.orders.add(stop_id, STOP, trade_type, self.quantity, price=sl_price)
+        if self.scheduler:
+            self.scheduler.schedule_after(ORDER_TIMEOUT, self.check_order_timeout, orderId)
+        self.trade_taken = True
         
         trade_logger.info(f"TRADE ENTRY - Type: {trade_type.upper()}, "
                          f"Entry Price: {entry_price:.2f}, "
                          f"Stop Loss: {sl_price:.2f}, "
                          f"Take Profit: {tp_price:.2f}, "
-                         f"Symbol: {self.index_symbol}M5, Order ID: {orderId}")  # Updated to NQM5
-        print(f"Market Order Placed: {trade_type.upper()} at market price, SL={sl_price}, TP={tp_price}, Order ID={orderId}")
-        self.nextOrderId += 1
-        if trade_type == 'long':
-            trade_result['Long_Result'] = 'Triggered'
-            self.position = 'long'
-            self.entry_price = entry_price
-            self.sl_price = sl_price
-            self.tp_price = tp_price
-        else:
-            trade_result['Short_Result'] = 'Triggered'
-            self.position = 'short'
-            self.entry_price = entry_price
-            self.sl_price = sl_price
-            self.tp_price = tp_price
-
-    def exit_trade(self, trade_type, result, exit_price, trade_result):
-        if any(status == 'Submitted' for status in self.active_orders.values()):
+                         f"Symbol: {self.index_symbol}M5, Order ID: {orderId}",  # Updated to NQM5
+                         extra={'trade': {'event': ENTRY, 'side': trade_type, 'order_id': orderId,
+                                          'price': entry_price, 'sl': sl_price, 'tp': tp_price,
+                                          'symbol': self.index_symbol}})
+        print(f"Bracket Order Placed: {trade_type.upper()} at market price, SL={sl_price} (ID {stop_id}), "
+              f"TP={tp_price} (ID {target_id}), Order ID={orderId}")
+        levels = self.levels
+        self.trade_row = self.trades.append(levels.session_date, COLOR_CODES[levels.candle_color],
+                                            levels.opening_high, levels.opening_low, levels.long_sl, levels.long_tp,
+                                            levels.short_sl, levels.short_tp)
+        self.trades.set_result(self.trade_row, trade_type, TRIGGERED, 0.0)
+        self.position = trade_type
+        self.entry_price = entry_price
+        self.sl_price = sl_price
+        self.tp_price = tp_price
+
+    def exit_trade(self, trade_type, result, exit_price):
+        """Flatten at market in the trade's OCA group, so a bracket exit filling first cancels it."""
+        if self.flatten_id is not None:
             return
-        order = Order()
-        order.action = "SELL" if trade_type == 'long' else "BUY"
-        order.totalQuantity = 1
-        order.orderType = "MKT"  # Use market order for exit
-        order.eTradeOnly = False
-        order.firmQuoteOnly = False
-        orderId = self.nextOrderId
+        decided = self.latency.decided()
+        entry = next((tracked for tracked in self.orders.working() if tracked.role == ENTRY_ORDER), None)
+        if entry is not None:
+            # Cancelling the parent cancels its bracket; only what already filled is flattened
+            self.cancelOrder(entry.order_id)
+            if not entry.filled:
+                self.flatten_id = entry.order_id  # the cancel stands in for the flatten
+                return
+        quantity = entry.filled if entry is not None else self.quantity
+        order = market_order("SELL" if trade_type == 'long' else "BUY", quantity, self.oca_group)
+        orderId = self.allocate_order_id()
         self.placeOrder(orderId, self.contract, order)
-        self.active_orders[orderId] = 'Submitted'
+        self.latency.submitted(orderId, decided)
+        self.orders.add(orderId, FLATTEN, trade_type, quantity, result, price=exit_price)
+        self.flatten_id = orderId
+        if self.scheduler:
+            self.scheduler.schedule_after(ORDER_TIMEOUT, self.check_order_timeout, orderId)
+        points = exit_price - self.entry_price if trade_type == 'long' else self.entry_price - exit_price
         
         trade_logger.info(f"TRADE EXIT - Type: {trade_type.upper()}, "
                          f"Entry Price: {self.entry_price:.2f}, "
                          f"Exit Price: {exit_price:.2f}, "
                          f"Result: {result}, "
-                         f"Symbol: {self.index_symbol}M5, Order ID: {orderId}")  # Updated to NQM5
+                         f"Symbol: {self.index_symbol}M5, Order ID: {orderId}",  # Updated to NQM5
+                         extra={'trade': {'event': EXIT, 'side': trade_type, 'result': result, 'order_id': orderId,
+                                          'price': exit_price, 'sl': self.sl_price, 'tp': self.tp_price,
+                                          'points': points, 'symbol': self.index_symbol}})
         print(f"Market Order Placed to Exit: {trade_type.upper()} at market price, Result={result}, Order ID={orderId}")
-        self.nextOrderId += 1
+        # The position is cleared by orderStatus once an exit order fills
 
-        # Update trade result with points
-        points = exit_price - self.entry_price if trade_type == 'long' else self.entry_price - exit_price
-        if trade_type == 'long':
-            trade_result['Long_Result'] = result
-            trade_result['Long_Points'] = points
+    def log_metrics(self):
+        m = self.metrics.summary()
+        trade_logger.info(f"RUNNING METRICS - Trades: {m['total_trades']}, Win Rate: {m['win_rate']:.2f}%, "
+                          f"Profit Factor: {m['profit_factor']:.2f}, Expectancy: {m['expectancy']:.2f}, "
+                          f"Equity: {m['equity']:.2f}, Max Drawdown: {m['max_drawdown']:.2f}, "
+                          f"Sharpe: {m['rolling_sharpe']:.2f}")
+
+    def orderStatus(self, orderId, status, filled, remaining, avgFillPrice, permId, parentId, lastFillPrice, clientId, whyHeld, mktCapPrice):
+        logging.info(f"Order Status - ID: {orderId}, Status: {status}, Filled: {filled}, Avg Fill Price: {avgFillPrice}")
+        with self.state_lock:
+            tracked = self.orders.get(orderId)
+            if tracked is None or tracked.done:
+                return
+            new_fill = tracked.update(status, filled, avgFillPrice)
+            if tracked.state == FILLED:
+                self.latency.filled(orderId)
+                self.latency.record_slippage(orderId, tracked.role, tracked.action, tracked.price, tracked.avg_fill_price)
+            if tracked.role == ENTRY_ORDER:
+                self.on_entry_status(tracked, new_fill)
+            else:
+                self.on_exit_status(tracked, new_fill)
+
+    def session_metrics(self):
+        """Latency summary plus the tick queue counters, if the strategy thread ran."""
+        report = self.latency.summary()
+        if self.tick_queue is not None:
+            report['tick_queue'] = self.tick_queue.stats()
+        return report
+
+    def on_entry_status(self, tracked, new_fill):
+        side = tracked.side
+        if new_fill:
+            self.entry_price = tracked.avg_fill_price  # Update entry price with actual fill price
+            if tracked.state != FILLED:
+                logging.info(f"Entry order {tracked.order_id} partially filled: {tracked.filled}/{tracked.quantity}")
+                return
+            trade_logger.info(f"TRADE EXECUTED - Type: {side.upper()}, "
+                             f"Entry Price: {self.entry_price:.2f}, "
+                             f"Order ID: {tracked.order_id}",
+                             extra={'trade': {'event': ENTRY_FILL, 'side': side, 'order_id': tracked.order_id,
+                                              'price': self.entry_price, 'sl': self.sl_price, 'tp': self.tp_price,
+                                              'symbol': self.index_symbol}})
+            print(f"Trade Executed: {side.upper()} - Entry={self.entry_price}, Order ID={tracked.order_id}")
+        elif tracked.done and not tracked.filled:
+            # Nothing filled, and TWS cancels the bracket with its parent
+            logging.warning(f"Entry order {tracked.order_id} {tracked.state.lower()} without a fill.")
+            self.trades.set_result(self.trade_row, side, NOT_TRIGGERED, 0.0)
+            self.clear_position()
+
+    def on_exit_status(self, tracked, new_fill):
+        if tracked.state == FILLED:
+            self.record_exit(tracked)
+        elif new_fill:
+            logging.info(f"Exit order {tracked.order_id} partially filled: {tracked.filled}/{tracked.quantity}")
+        elif tracked.done and self.position is not None:
+            # An OCA sibling cancelled after the trade closed is expected; anything else leaves risk open
+            logging.warning(f"{tracked.role.capitalize()} order {tracked.order_id} {tracked.state.lower()} "
+                            f"while the {self.position} position is open.")
+            if tracked.order_id == self.flatten_id:
+                self.flatten_id = None
+
+    def record_exit(self, tracked):
+        side = tracked.side
+        exit_price = tracked.avg_fill_price
+        points = exit_price - self.entry_price if side == 'long' else self.entry_price - exit_price
+        if tracked.role == STOP:
+            result = SL_HIT
+        elif tracked.role == TARGET:
+            result = TP_HIT
         else:
-            trade_result['Short_Result'] = result
-            trade_result['Short_Points'] = points
-        self.trades.append(trade_result)
+            result = RESULT_CODES[tracked.result]
+        self.trades.set_result(self.trade_row, side, result, points)
+        self.metrics.add_trade(side, result, points)
+        trade_logger.info(f"TRADE EXECUTED - Type: {side.upper()}, "
+                         f"Entry Price: {self.entry_price:.2f}, "
+                         f"Exit Price: {exit_price:.2f}, "
+                         f"Points: {points:.2f}, "
+                         f"Order ID: {tracked.order_id}",
+                         extra={'trade': {'event': EXIT_FILL, 'side': side, 'order_id': tracked.order_id,
+                                          'result': RESULT_NAMES[result],
+                                          'price': exit_price, 'sl': self.sl_price, 'tp': self.tp_price,
+                                          'points': points, 'symbol': self.index_symbol}})
+        print(f"Trade Executed: {side.upper()} - Entry={self.entry_price}, Exit={exit_price}, Points={points}, Order ID={tracked.order_id}")
+        self.log_metrics()
+        self.clear_position()
+
+    def clear_position(self):
         self.position = None
         self.entry_price = None
         self.sl_price = None
         self.tp_price = None
-
-    def orderStatus(self, orderId, status, filled, remaining, avgFillPrice, permId, parentId, lastFillPrice, clientId, whyHeld, mktCapPrice):
-        logging.info(f"Order Status - ID: {orderId}, Status: {status}, Filled: {filled}, Avg Fill Price: {avgFillPrice}")
-        if orderId in self.active_orders:
-            self.active_orders[orderId] = status
-            if status == "Filled" and filled > 0:
-                if len(self.active_orders) == 1:  # Entry order
-                    trade_logger.info(f"TRADE EXECUTED - Type: {self.position.upper()}, "
-                                     f"Entry Price: {lastFillPrice:.2f}, "
-                                     f"Order ID: {orderId}")
-                    print(f"Trade Executed: {self.position.upper()} - Entry={lastFillPrice}, Order ID={orderId}")
-                    self.entry_price = lastFillPrice  # Update entry price with actual fill price
-                else:  # Exit order
-                    points = lastFillPrice - self.entry_price if self.position == 'long' else self.entry_price - lastFillPrice
-                    trade_result = self.trades[-1]  # Update the last trade result
-                    if self.position == 'long':
-                        trade_result['Long_Result'] = 'SL Hit' if lastFillPrice <= self.sl_price else 'TP Hit'
-                        trade_result['Long_Points'] = points
-                    else:
-                        trade_result['Short_Result'] = 'SL Hit' if lastFillPrice >= self.sl_price else 'TP Hit'
-                        trade_result['Short_Points'] = points
-                    trade_logger.info(f"TRADE EXECUTED - Type: {self.position.upper()}, "
-                                     f"Entry Price: {self.entry_price:.2f}, "
-                                     f"Exit Price: {lastFillPrice:.2f}, "
-                                     f"Points: {points:.2f}, "
-                                     f"Order ID: {orderId}")
-                    print(f"Trade Executed: {self.position.upper()} - Entry={self.entry_price}, Exit={lastFillPrice}, Points={points}, Order ID={orderId}")
-                    self.position = None
-                    self.entry_price = None
-                    self.sl_price = None
-                    self.tp_price = None
-                    self.active_orders.clear()
-            elif status in ["Cancelled", "Inactive"]:
-                del self.active_orders[orderId]
+        self.oca_group = None
+        self.flatten_id = None
 
     def error(self, reqId, errorCode, errorString):
         logging.error(f"Error {errorCode}: {errorString}")
+        if reqId == self.historical_req_id and self.opening_candle is None:
+            # The request is dead (pacing, no data, ...): let the next retry send a new one
+            self.historical_subscribed = False
+            self.historical_bars.clear()
+
+def make_future_contract(symbol, expiry, exchange="CME"):
+    contract = Contract()
+    contract.symbol = symbol
+    contract.secType = "FUT"
+    contract.exchange = exchange
+    contract.currency = "USD"
+    contract.lastTradeDateOrContractMonth = expiry
+    return contract
 
 def run_loop(app):
     app.run()
 
-def wait_for_opening_candle(opening_time="09:30"):
-    eastern = pytz.timezone('US/Eastern')
-    now = datetime.now(eastern)
-    opening_hour, opening_minute = map(int, opening_time.split(":"))
-    target_time = now.replace(hour=opening_hour, minute=opening_minute + 15, second=0, microsecond=0)
-    if now < target_time:
-        wait_seconds = (target_time - now).total_seconds()
-        logging.info(f"Waiting {wait_seconds / 60:.1f} minutes until {opening_time} +15 minutes...")
-        time.sleep(wait_seconds)
-
 def main():
-    nyse = xcals.get_calendar("NYSE")
     today = datetime.now().date()
-    if not nyse.is_session(today):
+    times = cached_session_times(today)
+    if times is None:
         logging.info("Not a trading day. Exiting.")
         return
+    _, session_close = times
 
     logging.info(f"Starting breakout strategy for NASDAQ Futures (NQM5) on {today}")
     app = BreakoutApp(index_symbol="NQ", opening_time="09:30")
+    metrics_server = serve_metrics(app.session_metrics, METRICS_HTTP_PORT) if METRICS_HTTP_PORT else None
+    if RECORD_TICKS:
+        app.tick_recorder = TickRecorder(session_path(app.index_symbol, today))
     app.connect("127.0.0.1", 7497, clientId=123)
     api_thread = threading.Thread(target=run_loop, args=(app,), daemon=True)
     api_thread.start()
     time.sleep(2)
+    if STRATEGY_THREAD:
+        app.start_strategy_thread()
 
-    app.contract = Contract()
-    app.contract.symbol = app.index_symbol
-    app.contract.secType = "FUT"
-    app.contract.exchange = "CME"
-    app.contract.currency = "USD"
-    app.contract.lastTradeDateOrContractMonth = "20250620"  # June 2025 contract (NQM5)
-
-    wait_for_opening_candle(app.opening_time)
-
-    eastern = pytz.timezone('US/Eastern')
-    utc = pytz.UTC
-    while True:  # Loop until candle is found
-        logging.info("Requesting historical data for opening candle...")
-        now_eastern = datetime.now(eastern)
-        end_dt = now_eastern.astimezone(utc)
-        app.reqHistoricalData(
-            reqId=1,
-            contract=app.contract,
-            endDateTime=end_dt.strftime('%Y%m%d %H:%M:%S UTC'),
-            durationStr="3 D",
-            barSizeSetting="15 mins",
-            whatToShow="TRADES",
-            useRTH=0,
-            formatDate=1,
-            keepUpToDate=False,
-            chartOptions=[]
-        )
-
-        app.data_ready.wait(timeout=15)
-        if app.opening_candle:
-            logging.info("Opening candle identified. Proceeding with strategy.")
-            break  # Exit loop once candle is found
-        else:
-            logging.warning("Opening candle not found. Retrying in 10 seconds...")
-            app.historical_data = []  # Clear previous data to avoid confusion
-            app.data_ready.clear()    # Reset event for next attempt
-            time.sleep(10)  # Wait before retrying
+    app.contract = make_future_contract(app.index_symbol, "20250620")  # June 2025 contract (NQM5)
 
-    app.reqMarketDataType(3)  # Delayed data
-    app.reqMktData(2, app.contract, "233", False, False, [])
+    # Subscribe before the open so the opening candle can be built from live ticks
+    app.subscribe_market_data()
 
-    eastern = pytz.timezone('US/Eastern')
-    while datetime.now(eastern).time() < dt_time(16, 1):
-        time.sleep(1)
+    scheduler = SessionScheduler(app.clock)
+    app.schedule_session(scheduler, today, session_close)
+    scheduler.start()
+    app.session_done.wait()
+    scheduler.stop()
+    app.stop_strategy_thread()
 
-    time.sleep(10)
     if app.position:
         logging.warning("Position still open after EOD. Closing manually.")
         print("Warning: Position still open after EOD. Please close manually.")
 
-    results_df = pd.DataFrame(app.trades)
-    if not results_df.empty:
-        results_df.to_csv('trade_results.csv', index=False)
+    with open(LATENCY_METRICS_FILE, 'w') as f:
+        json.dump(app.session_metrics(), f, indent=2)
+    logging.info(f"Latency metrics saved to '{LATENCY_METRICS_FILE}'")
+    if metrics_server:
+        metrics_server.shutdown()
+    app.stop_recording(compress=COMPRESS_TICKS)
+
+    if app.trades:
+        app.trades.write_csv('trade_results.csv')
         logging.info("Trade results saved to 'trade_results.csv'")
         print("Trading session complete. Results saved to 'trade_results.csv'")
     else:
@@ -0,0 +1,184 @@
+import math
+from collections import deque
+
+import numpy as np
+
+from trade_store import EOD, NOT_TRIGGERED, RESULT_CODES, RESULT_NAMES, SL_HIT, TP_HIT, TRIGGERED, encode
+
+SIDES = ('long', 'short')
+
+
+class MetricsAccumulator:
+    """
+    Running backtest/live statistics updated in O(1) per closed trade.
+
+    Feed it day by day (add_day), trade by trade (add_trade, e.g. from the live app's exit
+    fills) or in bulk (extend, vectorized over a TradeBuffer, DataFrame or simulate() output);
+    all three leave the same state. summary() returns the compute_metrics dict plus equity,
+    max drawdown and a rolling Sharpe ratio, without rescanning history.
+    """
+
+    def __init__(self, sharpe_window=50, periods_per_year=252, keep_equity=True):
+        """
+        Args:
+            sharpe_window (int): Number of most recent trades in the rolling Sharpe ratio.
+            periods_per_year (float): Annualization factor (one trade per day at most -> 252).
+            keep_equity (bool): Keep the equity curve (cumulative points after each trade).
+        """
+        self.sharpe_window = sharpe_window
+        self.periods_per_year = periods_per_year
+        self.total_days = 0
+        self.counts = np.zeros((len(SIDES), len(RESULT_NAMES)), dtype=np.int64)  # side x result code
+        self.side_points = [0.0, 0.0]
+        self.total_trades = 0
+        self.wins = 0
+        self.gross_profit = 0.0
+        self.gross_loss = 0.0
+        self.n_profits = 0
+        self.n_losses = 0
+        self.equity = 0.0
+        self.peak = 0.0
+        self.max_drawdown = 0.0
+        self.equity_curve = [] if keep_equity else None
+        self._window = deque(maxlen=sharpe_window)
+        self._window_sum = 0.0
+        self._window_sumsq = 0.0
+
+    def add_trade(self, side, result, points):
+        """
+        Record one closed trade.
+
+        Args:
+            side (str): 'long' or 'short'.
+            result (int): SL_HIT, TP_HIT or EOD.
+            points (float): Points won (negative if lost).
+        """
+        points = float(points)
+        s = 0 if side == 'long' else 1
+        self.counts[s, result] += 1
+        self.side_points[s] += points
+        self.total_trades += 1
+        if result == TP_HIT:
+            self.wins += 1
+        if points > 0:
+            self.gross_profit += points
+            self.n_profits += 1
+        elif points < 0:
+            self.gross_loss -= points
+            self.n_losses += 1
+
+        self.equity += points
+        if self.equity > self.peak:
+            self.peak = self.equity
+        elif self.peak - self.equity > self.max_drawdown:
+            self.max_drawdown = self.peak - self.equity
+        if self.equity_curve is not None:
+            self.equity_curve.append(self.equity)
+
+        if len(self._window) == self.sharpe_window:
+            dropped = self._window[0]
+            self._window_sum -= dropped
+            self._window_sumsq -= dropped * dropped
+        self._window.append(points)
+        self._window_sum += points
+        self._window_sumsq += points * points
+
+    def add_day(self, long_result, long_points, short_result, short_points):
+        """Record one day of backtest results (result codes as in trade_store)."""
+        self.total_days += 1
+        for side, result, points in (('long', long_result, long_points), ('short', short_result, short_points)):
+            if result in (NOT_TRIGGERED, TRIGGERED):  # an open position is not a closed trade yet
+                self.counts[0 if side == 'long' else 1, result] += 1
+            else:
+                self.add_trade(side, result, points)
+
+    def extend(self, results):
+        """
+        Record many days at once, vectorized; equivalent to calling add_day for each row in order.
+
+        Args:
+            results (TradeBuffer, pd.DataFrame or dict): Columns Long_Result, Long_Points,
+                Short_Result, Short_Points with results as names or codes.
+        """
+        outcome = np.column_stack([encode(results['Long_Result'], RESULT_CODES),
+                                   encode(results['Short_Result'], RESULT_CODES)])
+        points = np.column_stack([np.asarray(results['Long_Points'], dtype=np.float64),
+                                  np.asarray(results['Short_Points'], dtype=np.float64)])
+        self.total_days += len(outcome)
+        for s in range(len(SIDES)):
+            self.counts[s] += np.bincount(outcome[:, s], minlength=len(RESULT_NAMES))
+        closed = (outcome != NOT_TRIGGERED) & (outcome != TRIGGERED)
+        # Row-major order keeps the trades in day order (long before short on the same day)
+        trade_points = points[closed]
+        for s in range(len(SIDES)):
+            self.side_points[s] += float(points[closed[:, s], s].sum())
+        if len(trade_points) == 0:
+            return
+        self.total_trades += len(trade_points)
+        self.wins += int(np.count_nonzero(outcome[closed] == TP_HIT))
+        profits = trade_points[trade_points > 0]
+        losses = trade_points[trade_points < 0]
+        self.gross_profit += float(profits.sum())
+        self.gross_loss -= float(losses.sum())
+        self.n_profits += len(profits)
+        self.n_losses += len(losses)
+
+        equity = self.equity + np.cumsum(trade_points)
+        peaks = np.maximum.accumulate(np.maximum(equity, self.peak))
+        self.max_drawdown = max(self.max_drawdown, float((peaks - equity).max()))
+        self.equity = float(equity[-1])
+        self.peak = float(peaks[-1])
+        if self.equity_curve is not None:
+            self.equity_curve.extend(equity.tolist())
+
+        self._window.extend(trade_points[-self.sharpe_window:].tolist())
+        window = np.fromiter(self._window, dtype=np.float64, count=len(self._window))
+        self._window_sum = float(window.sum())
+        self._window_sumsq = float(np.dot(window, window))
+
+    def rolling_sharpe(self):
+        """Annualized Sharpe ratio of the last sharpe_window trades (nan with fewer than 2 or no variance)."""
+        n = len(self._window)
+        if n < 2:
+            return float('nan')
+        mean = self._window_sum / n
+        variance = (self._window_sumsq - n * mean * mean) / (n - 1)
+        if variance <= 1e-12:
+            return float('nan')
+        return mean / math.sqrt(variance) * math.sqrt(self.periods_per_year)
+
+    def summary(self):
+        """
+        Return the current statistics.
+
+        Returns:
+            dict: The compute_metrics keys (result counts and points per side, total_points,
+                total_trades, win_rate (%), profit_factor, expectancy) plus equity, max_drawdown
+                (points) and rolling_sharpe.
+        """
+        metrics = {'total_days': self.total_days}
+        for s, key in enumerate(SIDES):
+            metrics[f'{key}_sl_hit'] = int(self.counts[s, SL_HIT])
+            metrics[f'{key}_tp_hit'] = int(self.counts[s, TP_HIT])
+            metrics[f'{key}_eod'] = int(self.counts[s, EOD])
+            metrics[f'{key}_not_triggered'] = int(self.counts[s, NOT_TRIGGERED])
+            metrics[f'{key}_total_points'] = float(self.side_points[s])
+
+        total_trades = self.total_trades
+        win_rate = (self.wins / total_trades * 100) if total_trades > 0 else 0
+        profit_factor = self.gross_profit / self.gross_loss if self.gross_loss > 0 else float('inf')
+        avg_win = self.gross_profit / self.n_profits if self.wins > 0 and self.n_profits else 0
+        avg_loss = self.gross_loss / self.n_losses if (total_trades - self.wins) > 0 and self.n_losses else 0
+        expectancy = (win_rate / 100 * avg_win) - ((1 - win_rate / 100) * avg_loss)
+
+        metrics.update({
+            'total_points': metrics['long_total_points'] + metrics['short_total_points'],
+            'total_trades': total_trades,
+            'win_rate': float(win_rate),
+            'profit_factor': float(profit_factor),
+            'expectancy': float(expectancy),
+            'equity': float(self.equity),
+            'max_drawdown': float(self.max_drawdown),
+            'rolling_sharpe': self.rolling_sharpe(),
+        })
+        return metrics
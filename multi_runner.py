@@ -0,0 +1,225 @@
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+
+from ibapi.client import EClient
+from ibapi.wrapper import EWrapper
+
+from latency import serve_metrics
+from main import (COMPRESS_TICKS, LATENCY_METRICS_FILE, METRICS_HTTP_PORT, RECORD_TICKS, STRATEGY_THREAD,
+                  BreakoutApp, make_future_contract, run_loop)
+from scheduler import SessionScheduler
+from session_table import cached_session_times
+from tick_recorder import TickRecorder, session_path
+from trade_store import CSV_FLOAT_FORMAT
+
+# symbol -> (exchange, contract month, BreakoutApp kwargs) traded by default. The point-based
+# sl_offset and entry_buffer are NQ's 8 and 5 scaled to each index's price level, on its tick grid.
+INSTRUMENTS = {
+    "NQ": ("CME", "20250620", {'min_tick': 0.25, 'sl_offset': 8, 'entry_buffer': 5, 'tp_ratio': 0.8}),
+    "ES": ("CME", "20250620", {'min_tick': 0.25, 'sl_offset': 2.25, 'entry_buffer': 1.5, 'tp_ratio': 0.8}),
+    "RTY": ("CME", "20250620", {'min_tick': 0.1, 'sl_offset': 0.8, 'entry_buffer': 0.5, 'tp_ratio': 0.8}),
+    "YM": ("CBOT", "20250620", {'min_tick': 1, 'sl_offset': 17, 'entry_buffer': 10, 'tp_ratio': 0.8}),
+}
+REQUEST_ID_BASE = 10000  # market data and historical request IDs start here, clear of the order IDs
+
+
+class InstrumentApp(BreakoutApp):
+    """
+    Strategy state for one instrument.
+
+    The EWrapper side receives callbacks routed by MultiBreakoutApp; EClient calls are
+    forwarded to the hub, which owns the single TWS connection.
+    """
+
+    def __init__(self, hub, contract, historical_req_id, market_data_req_id, **kwargs):
+        super().__init__(index_symbol=contract.symbol, clock=hub.clock, **kwargs)
+        self.hub = hub
+        self.contract = contract
+        self.historical_req_id = historical_req_id
+        self.market_data_req_id = market_data_req_id
+
+    def allocate_order_id(self):
+        return self.hub.allocate_order_id(self)
+
+    def placeOrder(self, orderId, contract, order):
+        self.hub.placeOrder(orderId, contract, order)
+
+    def cancelOrder(self, orderId, manualCancelOrderTime=""):
+        self.hub.cancelOrder(orderId, manualCancelOrderTime)
+
+    def reqMarketDataType(self, marketDataType):
+        self.hub.reqMarketDataType(marketDataType)
+
+    def reqMktData(self, reqId, contract, genericTickList, snapshot, regulatorySnapshot, mktDataOptions):
+        self.hub.reqMktData(reqId, contract, genericTickList, snapshot, regulatorySnapshot, mktDataOptions)
+
+    def cancelMktData(self, reqId):
+        self.hub.cancelMktData(reqId)
+
+    def reqHistoricalData(self, reqId, contract, endDateTime, durationStr, barSizeSetting, whatToShow,
+                          useRTH, formatDate, keepUpToDate, chartOptions):
+        self.hub.reqHistoricalData(reqId, contract, endDateTime, durationStr, barSizeSetting, whatToShow,
+                                   useRTH, formatDate, keepUpToDate, chartOptions)
+
+    def cancelHistoricalData(self, reqId):
+        self.hub.cancelHistoricalData(reqId)
+
+
+class MultiBreakoutApp(EWrapper, EClient):
+    """One TWS connection and reader thread serving several InstrumentApps."""
+
+    def __init__(self, clock=time.time):
+        EClient.__init__(self, self)
+        self.clock = clock
+        self.nextOrderId = None
+        self.order_id_lock = threading.Lock()
+        self.instruments = {}  # symbol -> InstrumentApp
+        self.by_req_id = {}    # reqId -> InstrumentApp
+        self.by_order_id = {}  # orderId -> InstrumentApp
+        self.ready = threading.Event()
+
+    def add_instrument(self, contract, **kwargs):
+        """Create the strategy state for a contract and register its request IDs."""
+        req_id = REQUEST_ID_BASE + 2 * len(self.instruments)
+        instrument = InstrumentApp(self, contract, historical_req_id=req_id, market_data_req_id=req_id + 1, **kwargs)
+        self.instruments[contract.symbol] = instrument
+        self.by_req_id[instrument.historical_req_id] = instrument
+        self.by_req_id[instrument.market_data_req_id] = instrument
+        return instrument
+
+    def allocate_order_id(self, instrument):
+        # Registered before placeOrder so the first orderStatus already routes to the instrument
+        with self.order_id_lock:
+            orderId = self.nextOrderId
+            self.nextOrderId += 1
+            self.by_order_id[orderId] = instrument
+        return orderId
+
+    def nextValidId(self, orderId: int):
+        with self.order_id_lock:
+            if self.nextOrderId is None or orderId > self.nextOrderId:
+                self.nextOrderId = orderId
+        logging.info(f"Next valid order ID received: {orderId}")
+        self.ready.set()
+
+    def historicalData(self, reqId, bar):
+        instrument = self.by_req_id.get(reqId)
+        if instrument:
+            instrument.historicalData(reqId, bar)
+
+    def historicalDataEnd(self, reqId, start, end):
+        instrument = self.by_req_id.get(reqId)
+        if instrument:
+            instrument.historicalDataEnd(reqId, start, end)
+
+    def historicalDataUpdate(self, reqId, bar):
+        instrument = self.by_req_id.get(reqId)
+        if instrument:
+            instrument.historicalDataUpdate(reqId, bar)
+
+    def tickPrice(self, reqId, tickType, price, attrib):
+        instrument = self.by_req_id.get(reqId)
+        if instrument:
+            instrument.tickPrice(reqId, tickType, price, attrib)
+
+    def tickSize(self, reqId, tickType, size):
+        instrument = self.by_req_id.get(reqId)
+        if instrument:
+            instrument.tickSize(reqId, tickType, size)
+
+    def orderStatus(self, orderId, status, filled, remaining, avgFillPrice, permId, parentId, lastFillPrice, clientId, whyHeld, mktCapPrice):
+        instrument = self.by_order_id.get(orderId)
+        if instrument:
+            instrument.orderStatus(orderId, status, filled, remaining, avgFillPrice, permId, parentId,
+                                   lastFillPrice, clientId, whyHeld, mktCapPrice)
+
+    def latency_summary(self):
+        return {symbol: instrument.session_metrics() for symbol, instrument in self.instruments.items()}
+
+    def error(self, reqId, errorCode, errorString):
+        # Request and order errors share the reqId argument; orders are looked up first, so an
+        # order ID that has grown into the request range still reaches the instrument that placed it
+        instrument = self.by_order_id.get(reqId) or self.by_req_id.get(reqId)
+        if instrument:
+            instrument.error(reqId, errorCode, errorString)
+        else:
+            logging.error(f"Error {errorCode}: {errorString}")
+
+
+def run_multi(instruments=INSTRUMENTS, opening_time="09:30", client_id=123):
+    """
+    Trade several futures over one TWS connection for today's session.
+
+    Args:
+        instruments (dict): symbol -> (exchange, contract month, BreakoutApp kwargs: min_tick and the
+            strategy parameters sl_offset, entry_buffer, tp_ratio).
+        opening_time (str): Time of the opening candle in 'HH:MM' format.
+        client_id (int): TWS client ID of the shared connection.
+    """
+    today = datetime.now().date()
+    times = cached_session_times(today)
+    if times is None:
+        logging.info("Not a trading day. Exiting.")
+        return
+    _, session_close = times
+
+    hub = MultiBreakoutApp()
+    for symbol, (exchange, expiry, kwargs) in instruments.items():
+        instrument = hub.add_instrument(make_future_contract(symbol, expiry, exchange), opening_time=opening_time,
+                                        **kwargs)
+        if RECORD_TICKS:
+            instrument.tick_recorder = TickRecorder(session_path(symbol, today))
+    logging.info(f"Starting breakout strategy for {', '.join(hub.instruments)} on {today}")
+    hub.connect("127.0.0.1", 7497, clientId=client_id)
+    api_thread = threading.Thread(target=run_loop, args=(hub,), daemon=True)
+    api_thread.start()
+    hub.ready.wait(timeout=10)
+    metrics_server = serve_metrics(hub.latency_summary, METRICS_HTTP_PORT) if METRICS_HTTP_PORT else None
+
+    # One scheduler thread serves the session events of every instrument
+    scheduler = SessionScheduler(hub.clock)
+    for instrument in hub.instruments.values():
+        if STRATEGY_THREAD:
+            instrument.start_strategy_thread()  # one per instrument, so a busy symbol cannot delay the others
+        instrument.subscribe_market_data()
+        instrument.schedule_session(scheduler, today, session_close)
+    scheduler.start()
+    for instrument in hub.instruments.values():
+        instrument.session_done.wait()
+    scheduler.stop()
+    for instrument in hub.instruments.values():
+        instrument.stop_strategy_thread()
+
+    with open(LATENCY_METRICS_FILE, 'w') as f:
+        json.dump(hub.latency_summary(), f, indent=2)
+    logging.info(f"Latency metrics saved to '{LATENCY_METRICS_FILE}'")
+    if metrics_server:
+        metrics_server.shutdown()
+    for instrument in hub.instruments.values():
+        instrument.stop_recording(compress=COMPRESS_TICKS)
+
+    frames = []
+    for symbol, app in hub.instruments.items():
+        if app.position:
+            logging.warning(f"{symbol} position still open after EOD. Closing manually.")
+            print(f"Warning: {symbol} position still open after EOD. Please close manually.")
+        if app.trades:
+            frames.append(app.trades.to_frame().assign(Symbol=symbol))
+
+    if frames:
+        import pandas as pd
+        pd.concat(frames, ignore_index=True).to_csv('trade_results.csv', index=False, float_format=CSV_FLOAT_FORMAT)
+        logging.info("Trade results saved to 'trade_results.csv'")
+        print("Trading session complete. Results saved to 'trade_results.csv'")
+    else:
+        print("No trades executed today.")
+
+    hub.disconnect()
+    logging.info("Market closed. Disconnected.")
+
+
+if __name__ == "__main__":
+    run_multi()
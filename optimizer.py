@@ -0,0 +1,158 @@
+import itertools
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from backtesting import compute_metrics, fetch_data
+from result_cache import ResultCache
+from vectorized import from_arrays, simulate, to_day_bars
+
+PARAMETER_NAMES = ('opening_time', 'sl_offset', 'tp_ratio', 'entry_buffer')
+
+# Bars shared by the parent process with every worker (set by _attach_bars)
+_shared_bars = None
+_shared_block = None
+_shared_cache = None   # (ResultCache, symbol) when the sweep memoizes per-day results
+
+
+def parameter_grid(space):
+    """
+    Expand a parameter space into every combination.
+
+    Args:
+        space (dict): Parameter name -> list of values (e.g., {'sl_offset': [4, 8, 12]}).
+
+    Returns:
+        list[dict]: One dict per combination.
+    """
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+
+def random_parameters(space, n_samples, seed=None):
+    """
+    Draw a random sample of combinations from a parameter space without repeats.
+
+    Args:
+        space (dict): Parameter name -> list of values.
+        n_samples (int): Number of combinations to draw (capped at the grid size).
+        seed (int): Optional random seed for reproducible samples.
+    """
+    names = list(space)
+    sizes = [len(space[name]) for name in names]
+    total = int(np.prod(sizes))
+    rng = random.Random(seed)
+    combinations = []
+    for flat in rng.sample(range(total), min(n_samples, total)):
+        combination = {}
+        for name, size in zip(reversed(names), reversed(sizes)):
+            flat, index = divmod(flat, size)
+            combination[name] = space[name][index]
+        combinations.append({name: combination[name] for name in names})
+    return combinations
+
+
+def _share_bars(bars):
+    """Copy timestamps and OHLC into one shared memory block (5 rows of n values)."""
+    n = len(bars.timestamps)
+    block = shared_memory.SharedMemory(create=True, size=max(5 * n * 8, 1))
+    matrix = np.ndarray((5, n), dtype=np.float64, buffer=block.buf)
+    matrix[0].view(np.int64)[:] = bars.timestamps
+    matrix[1:] = (bars.open, bars.high, bars.low, bars.close)
+    return block
+
+
+def _attach_bars(block_name, n, cache=None):
+    """Process pool initializer: map the shared block once per worker and rebuild DayBars."""
+    global _shared_bars, _shared_block, _shared_cache
+    _shared_block = shared_memory.SharedMemory(name=block_name)
+    matrix = np.ndarray((5, n), dtype=np.float64, buffer=_shared_block.buf)
+    _shared_bars = from_arrays(matrix[0].view(np.int64), *matrix[1:])
+    _shared_cache = cache
+
+
+def evaluate(bars, params, cache=None):
+    """
+    Backtest one parameter combination and return its metrics row.
+
+    Args:
+        bars (DayBars): Bars to evaluate on.
+        params (dict): Values for any of PARAMETER_NAMES; opening_time is required.
+        cache (tuple): Optional (ResultCache, symbol) reusing the outcomes of unchanged days.
+    """
+    strategy_params = {name: params[name] for name in PARAMETER_NAMES[1:] if name in params}
+    if cache is not None:
+        result_cache, symbol = cache
+        results = result_cache.backtest(bars, symbol, params['opening_time'], **strategy_params)
+    else:
+        results = simulate(bars, params['opening_time'], **strategy_params)
+    return {**params, **compute_metrics(results)}
+
+
+def _evaluate_shared(params):
+    return evaluate(_shared_bars, params, _shared_cache)
+
+
+def sweep(index_data, combinations, workers=None, rank_by=('profit_factor', 'expectancy'), min_trades=1,
+          cache=None, symbol=None):
+    """
+    Evaluate parameter combinations on one dataset across all cores and rank them.
+
+    The bars are placed in shared memory once; each worker maps them at start-up, so
+    tasks only carry their small parameter dicts.
+
+    Args:
+        index_data (pd.DataFrame): OHLC data indexed by naive timestamps.
+        combinations (list[dict]): Output of parameter_grid or random_parameters.
+        workers (int): Number of processes (defaults to all cores).
+        rank_by (tuple): Metric columns to sort by, best first.
+        min_trades (int): Drop combinations with fewer triggered trades than this.
+        cache (ResultCache): Reuse per-day outcomes of earlier sweeps; only days whose bars
+            are new or changed are evaluated for each combination.
+        symbol (str): Ticker symbol of index_data, part of the cache key (required with cache).
+
+    Returns:
+        pd.DataFrame: One row per combination with its parameters and metrics, ranked.
+    """
+    bars = to_day_bars(index_data)
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(combinations) // (workers * 8))
+    block = _share_bars(bars)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach_bars,
+                                 initargs=(block.name, len(bars.timestamps),
+                                           (cache, symbol) if cache is not None else None)) as pool:
+            rows = list(pool.map(_evaluate_shared, combinations, chunksize=chunksize))
+    finally:
+        block.close()
+        block.unlink()
+
+    table = pd.DataFrame(rows)
+    if table.empty:
+        return table
+    table = table[table['total_trades'] >= min_trades]
+    return table.sort_values(list(rank_by), ascending=False, kind='stable').reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    # Example: sweep the breakout rules on the last 55 days of NASDAQ 15m bars
+    start_date = (datetime.now() - timedelta(days=55)).strftime('%Y-%m-%d')
+    end_date = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+    index_data = fetch_data('^IXIC', start_date, end_date)
+    if index_data is not None:
+        space = {
+            'opening_time': ['09:30', '09:45', '14:45'],
+            'sl_offset': [2, 4, 6, 8, 10, 12, 16],
+            'tp_ratio': [0.4, 0.6, 0.8, 1.0, 1.2, 1.5, 2.0],
+            'entry_buffer': [0, 1, 2, 3, 5, 8],
+        }
+        # Nightly re-runs only evaluate the sessions added since the last sweep
+        ranked = sweep(index_data, parameter_grid(space), cache=ResultCache(), symbol='^IXIC')
+        print(ranked[list(space) + ['total_trades', 'win_rate', 'profit_factor', 'expectancy']].head(20).to_string(index=False))
+        ranked.to_csv('sweep_results.csv', index=False)
+        print("\nFull ranking saved to 'sweep_results.csv'")
@@ -0,0 +1,156 @@
+from ibapi.order import Order
+
+# What an order is for in a trade
+ENTRY, STOP, TARGET, FLATTEN = 'entry', 'stop', 'target', 'flatten'
+
+# Order states; FILLED, CANCELLED and REJECTED are terminal
+SUBMITTED, PARTIALLY_FILLED, FILLED, CANCELLED, REJECTED = 'Submitted', 'PartiallyFilled', 'Filled', 'Cancelled', 'Rejected'
+TERMINAL_STATES = frozenset((FILLED, CANCELLED, REJECTED))
+
+# TWS orderStatus strings -> state (a 'Submitted' report with a fill becomes PARTIALLY_FILLED)
+TWS_STATES = {
+    'ApiPending': SUBMITTED, 'PendingSubmit': SUBMITTED, 'PreSubmitted': SUBMITTED, 'Submitted': SUBMITTED,
+    'PendingCancel': SUBMITTED, 'Filled': FILLED, 'Cancelled': CANCELLED, 'ApiCancelled': CANCELLED,
+    'Inactive': REJECTED,
+}
+
+
+class TrackedOrder:
+    """Client-side state of one order, advanced by TWS orderStatus reports."""
+
+    __slots__ = ('order_id', 'role', 'side', 'quantity', 'state', 'filled', 'avg_fill_price', 'result', 'price')
+
+    def __init__(self, order_id, role, side, quantity, result=None, price=None):
+        """
+        Args:
+            order_id (int): TWS order ID.
+            role (str): ENTRY, STOP, TARGET or FLATTEN.
+            side (str): 'long' or 'short', the side of the trade the order belongs to.
+            quantity (float): Order quantity.
+            result (str): For FLATTEN orders, the trade result recorded when it fills (e.g. 'EOD').
+            price (float): The price the strategy modelled the fill at, for slippage.
+        """
+        self.order_id = order_id
+        self.role = role
+        self.side = side
+        self.quantity = quantity
+        self.state = SUBMITTED
+        self.filled = 0
+        self.avg_fill_price = None
+        self.result = result
+        self.price = price
+
+    @property
+    def action(self):
+        """'BUY' or 'SELL'."""
+        buys = self.side == 'long'
+        return "BUY" if (self.role == ENTRY) == buys else "SELL"
+
+    @property
+    def done(self):
+        return self.state in TERMINAL_STATES
+
+    def update(self, status, filled, avg_fill_price):
+        """
+        Apply an orderStatus report and return the newly filled quantity.
+
+        Reports after a terminal state and repeated reports (TWS often sends the same status
+        several times) change nothing and return 0.
+        """
+        if self.done:
+            return 0
+        new_fill = filled - self.filled if filled > self.filled else 0
+        if new_fill:
+            self.filled = filled
+            self.avg_fill_price = avg_fill_price
+        state = TWS_STATES.get(status, self.state)
+        if state == SUBMITTED and self.filled:
+            state = PARTIALLY_FILLED
+        elif state == FILLED and self.filled < self.quantity:
+            state = PARTIALLY_FILLED  # 'Filled' with a remainder is a partial execution report
+        self.state = state
+        return new_fill
+
+
+class OrderBook:
+    """The orders of a session, keyed by order ID."""
+
+    def __init__(self):
+        self.orders = {}
+
+    def __contains__(self, order_id):
+        return order_id in self.orders
+
+    def get(self, order_id):
+        return self.orders.get(order_id)
+
+    def add(self, order_id, role, side, quantity, result=None, price=None):
+        tracked = TrackedOrder(order_id, role, side, quantity, result, price)
+        self.orders[order_id] = tracked
+        return tracked
+
+    def working(self):
+        """Orders not yet filled, cancelled or rejected."""
+        return [tracked for tracked in self.orders.values() if not tracked.done]
+
+
+def market_order(action, quantity, oca_group=""):
+    order = Order()
+    order.action = action
+    order.totalQuantity = quantity
+    order.orderType = "MKT"
+    order.eTradeOnly = False
+    order.firmQuoteOnly = False
+    if oca_group:
+        order.ocaGroup = oca_group
+        order.ocaType = 1  # cancel the rest of the group when this one fills
+    return order
+
+
+def round_to_tick(price, min_tick):
+    """Round a price to the nearest multiple of the contract's minimum price variation."""
+    return round(round(price / min_tick) * min_tick, 10)
+
+
+def on_tick(price, min_tick):
+    """True if the price is a whole number of ticks (what TWS error 110 checks)."""
+    return abs(price / min_tick - round(price / min_tick)) < 1e-6
+
+
+def bracket_orders(parent_id, target_id, stop_id, action, quantity, target_price, stop_price, oca_group):
+    """
+    Build a market entry with a take-profit limit and a stop-loss stop child.
+
+    The children are attached to the parent (they only work once it fills) and share an OCA
+    group, so whichever fills first cancels the other at the broker. Only the last order is
+    transmitted, so TWS activates the three together.
+
+    Returns:
+        list[tuple]: (order ID, Order) in placement order.
+    """
+    exit_action = "SELL" if action == "BUY" else "BUY"
+    parent = market_order(action, quantity)
+    parent.transmit = False
+
+    target = Order()
+    target.action = exit_action
+    target.totalQuantity = quantity
+    target.orderType = "LMT"
+    target.lmtPrice = target_price
+    target.parentId = parent_id
+    target.transmit = False
+
+    stop = Order()
+    stop.action = exit_action
+    stop.totalQuantity = quantity
+    stop.orderType = "STP"
+    stop.auxPrice = stop_price
+    stop.parentId = parent_id
+    stop.transmit = True
+
+    for child in (target, stop):
+        child.ocaGroup = oca_group
+        child.ocaType = 1
+        child.eTradeOnly = False
+        child.firmQuoteOnly = False
+    return [(parent_id, parent), (target_id, target), (stop_id, stop)]
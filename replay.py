@@ -0,0 +1,266 @@
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from ibapi.common import BarData
+from ibapi.contract import Contract
+
+from main import BreakoutApp, EASTERN, PRICE_TICKS, SHUTDOWN_DELAY
+from orders import on_tick
+from scheduler import SessionScheduler
+
+
+class SimulatedClock:
+    """Clock returning epoch seconds that only moves when the replay advances it."""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class SimulatedBroker:
+    """
+    Fills orders against the replayed price stream.
+
+    An order placed at time t is acknowledged on the next tick and can fill from the first
+    tick at or after t + latency. Market orders fill at that tick, moved against the order by
+    `slippage` points; limit orders fill at their limit once a tick reaches it; stop orders
+    fill like market orders once a tick reaches the stop. Children (parentId) only work once
+    their parent has filled, and a fill cancels the rest of its OCA group, as in TWS. Limit and
+    stop prices off the app's min_tick grid are rejected on the next tick with error 110.
+    """
+
+    def __init__(self, app, latency=0.0, slippage=0.0):
+        self.app = app
+        self.latency = latency
+        self.slippage = slippage
+        self.pending = []  # [due time, orderId, Order, acknowledged]
+        self.filled_ids = set()
+        self.fills = []
+        self.rejected = []  # (orderId, Order) to report on the next tick
+
+    def submit(self, orderId, order, now):
+        price = order.lmtPrice if order.orderType == 'LMT' else order.auxPrice if order.orderType == 'STP' else None
+        if price is not None and not on_tick(price, self.app.min_tick):
+            self.rejected.append((orderId, order))
+            return
+        self.pending.append([now + self.latency, orderId, order, False])
+
+    def cancel(self, orderId):
+        # Cancelling a parent cancels its children
+        for entry in [entry for entry in self.pending if orderId in (entry[1], entry[2].parentId)]:
+            self._cancel(entry)
+
+    def _cancel(self, entry):
+        self.pending.remove(entry)
+        self.app.orderStatus(entry[1], 'Cancelled', 0, entry[2].totalQuantity, 0.0, 0, 0, 0.0, 0, '', 0.0)
+
+    def fill_price(self, order, price):
+        """Price the order fills at on a tick at `price`, or None if it does not fill."""
+        buy = order.action == 'BUY'
+        if order.orderType == 'LMT':
+            if price <= order.lmtPrice if buy else price >= order.lmtPrice:
+                return order.lmtPrice
+            return None
+        if order.orderType == 'STP' and not (price >= order.auxPrice if buy else price <= order.auxPrice):
+            return None
+        return price + self.slippage if buy else price - self.slippage
+
+    def on_price(self, price, now):
+        for orderId, order in self.rejected:
+            price_field = order.lmtPrice if order.orderType == 'LMT' else order.auxPrice
+            self.app.error(orderId, 110, f"The price {price_field} does not conform to the minimum price "
+                                         f"variation {self.app.min_tick} for this contract.")
+            self.app.orderStatus(orderId, 'Inactive', 0, order.totalQuantity, 0.0, 0, 0, 0.0, 0, '', 0.0)
+        self.rejected.clear()
+        if not self.pending:
+            return
+        for entry in list(self.pending):
+            if entry not in self.pending:
+                continue  # cancelled by an OCA fill earlier on this tick
+            due, orderId, order, acknowledged = entry
+            if not acknowledged:
+                entry[3] = True
+                self.app.orderStatus(orderId, 'Submitted', 0, order.totalQuantity, 0.0, 0, 0, 0.0, 0, '', 0.0)
+            if due > now or (order.parentId and order.parentId not in self.filled_ids):
+                continue
+            fill_price = self.fill_price(order, price)
+            if fill_price is None:
+                continue
+            self.pending.remove(entry)
+            self.filled_ids.add(orderId)
+            self.fills.append((now, orderId, order.action, order.totalQuantity, fill_price))
+            self.app.orderStatus(orderId, 'Filled', order.totalQuantity, 0, fill_price, 0, order.parentId,
+                                 fill_price, 0, '', 0.0)
+            if order.ocaGroup:
+                for other in [other for other in self.pending if other[2].ocaGroup == order.ocaGroup]:
+                    self._cancel(other)
+
+
+class ReplayApp(BreakoutApp):
+    """BreakoutApp whose EClient side is served locally by a SimulatedBroker and canned bars."""
+
+    def __init__(self, historical_bars=(), latency=0.0, slippage=0.0, **kwargs):
+        self.sim_clock = SimulatedClock()
+        super().__init__(clock=self.sim_clock, **kwargs)
+        self.broker = SimulatedBroker(self, latency, slippage)
+        self.replay_bars = list(historical_bars)
+        self.contract = Contract()
+        self.contract.symbol = self.index_symbol
+
+    def connect(self, host, port, clientId):
+        self.nextValidId(1)
+
+    def isConnected(self):
+        return True
+
+    def run(self):
+        pass
+
+    def disconnect(self):
+        pass
+
+    def reqMarketDataType(self, marketDataType):
+        pass
+
+    def reqMktData(self, reqId, contract, genericTickList, snapshot, regulatorySnapshot, mktDataOptions):
+        pass
+
+    def cancelMktData(self, reqId):
+        pass
+
+    def reqHistoricalData(self, reqId, contract, endDateTime, durationStr, barSizeSetting, whatToShow,
+                          useRTH, formatDate, keepUpToDate, chartOptions):
+        for bar in self.replay_bars:
+            self.historicalData(reqId, bar)
+        self.historicalDataEnd(reqId, "", "")
+
+    def cancelHistoricalData(self, reqId):
+        pass
+
+    def placeOrder(self, orderId, contract, order):
+        self.broker.submit(orderId, order, self.clock())
+
+    def cancelOrder(self, orderId, manualCancelOrderTime=""):
+        self.broker.cancel(orderId)
+
+
+def make_bar(timestamp, open_, high, low, close, volume=0):
+    """Build an ibapi BarData the way reqHistoricalData delivers it (formatDate=1)."""
+    bar = BarData()
+    bar.date = timestamp.strftime('%Y%m%d %H:%M:%S')
+    bar.open, bar.high, bar.low, bar.close, bar.volume = open_, high, low, close, volume
+    return bar
+
+
+def bars_from_ticks(ticks, bar_minutes=15):
+    """Aggregate (timestamp, tickType, price) ticks into BarData objects in US/Eastern time."""
+    frame = pd.DataFrame(ticks, columns=['timestamp', 'tick_type', 'price'])
+    index = pd.to_datetime(frame['timestamp'], unit='s', utc=True).dt.tz_convert(EASTERN).dt.tz_localize(None)
+    ohlc = frame.set_index(index)['price'].resample(f'{bar_minutes}min').ohlc().dropna()
+    return [make_bar(ts, row.open, row.high, row.low, row.close) for ts, row in ohlc.iterrows()]
+
+
+def synthetic_session(session_date, seed=None, start_price=20000.0, volatility=1.5, tick_seconds=5.0):
+    """
+    Generate a random-walk LAST tick stream from 09:25 to 16:05 US/Eastern.
+
+    Returns:
+        list[tuple]: (epoch seconds, tickType, price) sorted by time.
+    """
+    rng = np.random.default_rng(seed)
+    start = EASTERN.localize(datetime.combine(session_date, datetime.min.time()) + timedelta(hours=9, minutes=25))
+    n_ticks = int((6 * 3600 + 40 * 60) / tick_seconds)
+    timestamps = start.timestamp() + np.arange(n_ticks) * tick_seconds
+    prices = np.round((start_price + np.cumsum(rng.normal(0.0, volatility, n_ticks))) * 4) / 4
+    return list(zip(timestamps.tolist(), [4] * n_ticks, prices.tolist()))
+
+
+def replay_session(ticks, historical_bars=None, opening_time="09:30", latency=0.0, slippage=0.0,
+                   market_data_type=1, session_close=None, **app_kwargs):
+    """
+    Drive a ReplayApp through one recorded or synthetic session, the way main() drives the live app.
+
+    The session is scheduled with schedule_session on a SessionScheduler whose due events run
+    on the simulated clock between ticks, so the opening-window close, historical retries,
+    order timeouts, the EOD flatten and the shutdown happen at their times even when no tick
+    arrives. The opening candle is streamed from the ticks when market_data_type is 1;
+    otherwise (or if streaming fails) it is requested from `historical_bars` once the opening
+    window has closed. Ticks after the shutdown are not replayed.
+
+    Args:
+        ticks (iterable): (epoch seconds, tickType, price) tuples sorted by time.
+        historical_bars (list[BarData]): Bars served by reqHistoricalData (see bars_from_ticks).
+        opening_time (str): Time of the opening candle in 'HH:MM' format.
+        latency (float): Seconds between placeOrder and the fill.
+        slippage (float): Points each fill moves against the order.
+        market_data_type (int): 1 to stream the opening candle from ticks, 3 for delayed data.
+        session_close (float): Epoch seconds of the close (default: 16:00 US/Eastern).
+        **app_kwargs: Passed to BreakoutApp (e.g., sl_offset, tp_ratio, entry_buffer).
+
+    Returns:
+        ReplayApp: The app after the session, with its trades and the broker's fills.
+    """
+    ticks = iter(ticks)
+    first = next(ticks, None)
+    app = ReplayApp(historical_bars=historical_bars or (), latency=latency, slippage=slippage,
+                    opening_time=opening_time, market_data_type=market_data_type, **app_kwargs)
+    if first is None:
+        return app
+    app.sim_clock.now = first[0]
+    app.connect("127.0.0.1", 7497, clientId=0)
+    app.subscribe_market_data()
+
+    session_day = datetime.fromtimestamp(first[0], EASTERN).date()
+    if session_close is None:
+        session_close = EASTERN.localize(datetime.combine(session_day, datetime.min.time()) + timedelta(hours=16)).timestamp()
+    scheduler = SessionScheduler(app.clock)
+    app.schedule_session(scheduler, session_day, session_close)
+
+    for timestamp, tick_type, price in _chain(first, ticks):
+        _run_events(app, scheduler, timestamp)
+        if app.session_done.is_set():
+            return app
+        app.sim_clock.now = timestamp
+        if tick_type in PRICE_TICKS:
+            app.broker.on_price(price, timestamp)
+        app.tickPrice(app.market_data_req_id, tick_type, price, None)
+    _run_events(app, scheduler, session_close + SHUTDOWN_DELAY)
+    return app
+
+
+def _run_events(app, scheduler, until):
+    """Run the scheduler's events due by `until`, each with the simulated clock set to its time."""
+    while not app.session_done.is_set():
+        due = scheduler.next_due()
+        if due is None or due > until:
+            return
+        app.sim_clock.now = max(app.sim_clock.now, due)
+        scheduler.run_due(app.sim_clock.now)
+
+
+def _chain(first, rest):
+    yield first
+    yield from rest
+
+
+if __name__ == "__main__":
+    # Example: replay 250 synthetic sessions and report throughput and results
+    from backtesting import compute_metrics
+    from trade_store import TradeBuffer
+
+    sessions = pd.bdate_range('2025-01-02', periods=250)
+    start = time.perf_counter()
+    trades = TradeBuffer()
+    for seed, day in enumerate(sessions):
+        app = replay_session(synthetic_session(day.date(), seed=seed), latency=0.25, slippage=0.25)
+        trades.extend(app.trades)
+    elapsed = time.perf_counter() - start
+    print(f"Replayed {len(sessions)} sessions in {elapsed:.2f}s ({elapsed / len(sessions) * 1000:.1f} ms/session)")
+    if trades:
+        metrics = compute_metrics(trades)
+        print(f"Trades: {metrics['total_trades']}, Win Rate: {metrics['win_rate']:.2f}%, "
+              f"Profit Factor: {metrics['profit_factor']:.2f}, Expectancy: {metrics['expectancy']:.2f}")
@@ -0,0 +1,183 @@
+import hashlib
+import multiprocessing
+import os
+
+import numpy as np
+
+from trade_store import FIELD_OF, TRADE_DTYPE
+from vectorized import NS_PER_DAY, from_arrays, simulate
+
+STRATEGY_VERSION = 1  # bump whenever the trading rules change, so cached outcomes are not reused
+DEFAULT_PARAMS = {'sl_offset': 8, 'tp_ratio': 0.8, 'entry_buffer': 0}
+EVICT_TO = 0.9  # eviction frees space down to this fraction of max_bytes, so it does not run on every save
+
+# One row per evaluated day: the day, the hash of its bars and its trade row, if it had one
+CACHE_DTYPE = np.dtype([('day', 'i8'), ('bar_hash', 'u8'), ('has_trade', '?')] + TRADE_DTYPE.descr)
+
+
+def day_hashes(bars):
+    """
+    Content hash of every day's bars (timestamps and OHLC).
+
+    Args:
+        bars (DayBars): Bars of all days, see vectorized.to_day_bars.
+
+    Returns:
+        np.ndarray: uint64 hash per day, in day order.
+    """
+    hashes = np.empty(len(bars.starts), dtype=np.uint64)
+    columns = (bars.timestamps, bars.open, bars.high, bars.low, bars.close)
+    for i, (start, end) in enumerate(zip(bars.starts.tolist(), bars.ends.tolist())):
+        digest = hashlib.blake2b(digest_size=8)
+        for column in columns:
+            digest.update(column[start:end].tobytes())
+        hashes[i] = int.from_bytes(digest.digest(), 'little')
+    return hashes
+
+
+class ResultCache:
+    """
+    On-disk cache of per-day backtest outcomes, so re-runs only evaluate new or changed days.
+
+    Outcomes are grouped by configuration (symbol, opening time, strategy parameters and
+    STRATEGY_VERSION), one .npy file per configuration, and each day is keyed by a hash of its
+    bars. When the directory grows past max_bytes the least recently used configurations
+    are evicted. The folder size is kept as a running total, so a save only scans the folder
+    when it actually has to evict. The total lives in shared memory: process pool workers
+    that receive the cache as an initializer argument (see optimizer.sweep) all update the
+    same count and evict under the same lock.
+    """
+
+    def __init__(self, directory='result_cache', max_bytes=256 * 2**20):
+        """
+        Args:
+            directory (str): Folder holding the cached outcomes.
+            max_bytes (int): Size bound of the folder.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0    # days reused
+        self.misses = 0  # days evaluated
+        self._hashed = (None, None)  # (bars, day hashes) of the last call; sweeps reuse one DayBars
+        self._total = multiprocessing.Value('q', -1)  # bytes in the folder; -1 until the first save scans it
+
+    def config_key(self, symbol, opening_time, params):
+        config = (symbol, opening_time, STRATEGY_VERSION) + tuple(sorted({**DEFAULT_PARAMS, **params}.items()))
+        return hashlib.blake2b(repr(config).encode(), digest_size=16).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.npy")
+
+    def load(self, key):
+        """Cached rows of a configuration, sorted by day (empty if none)."""
+        path = self._path(key)
+        try:
+            rows = np.load(path)
+            os.utime(path)  # mark as recently used
+        except (FileNotFoundError, ValueError):  # missing, or evicted/being replaced by another process
+            return np.zeros(0, dtype=CACHE_DTYPE)
+        return rows
+
+    def save(self, key, rows):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, rows)
+            new_size = f.tell()
+        with self._total.get_lock():
+            if self._total.value < 0:
+                self._total.value = sum(size for _, size, _ in self._entries())
+            try:
+                old_size = os.path.getsize(path)
+            except FileNotFoundError:
+                old_size = 0
+            os.replace(tmp_path, path)
+            self._total.value += new_size - old_size
+            if self._total.value > self.max_bytes:
+                self.evict(keep=path)
+
+    def _entries(self):
+        """(mtime, size, path) of every cached configuration."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.npy'):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def evict(self, keep=None):
+        """Delete least recently used configurations until the folder is back under EVICT_TO * max_bytes."""
+        with self._total.get_lock():  # re-entrant, also held by save()
+            entries = self._entries()
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes * EVICT_TO:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+            self._total.value = total
+
+    def backtest(self, bars, symbol, opening_time, **params):
+        """
+        vectorized.simulate with per-day memoization.
+
+        Days whose bars hash the same as in the cache reuse their stored outcome; only new
+        or changed days are simulated, then everything is merged back in day order.
+
+        Args:
+            bars (DayBars): Bars of all days, see vectorized.to_day_bars.
+            symbol (str): Ticker symbol the bars belong to.
+            opening_time (str): Time of the opening candle in 'HH:MM' format (e.g., '14:45').
+            **params: Strategy parameters (sl_offset, tp_ratio, entry_buffer).
+
+        Returns:
+            dict: Column name -> array, as returned by simulate.
+        """
+        key = self.config_key(symbol, opening_time, params)
+        days = bars.timestamps[bars.starts] // NS_PER_DAY
+        if self._hashed[0] is not bars:
+            self._hashed = (bars, day_hashes(bars))
+        hashes = self._hashed[1]
+        cached = self.load(key)
+
+        pos = np.minimum(np.searchsorted(cached['day'], days), max(len(cached) - 1, 0))
+        fresh = (cached['day'][pos] == days) & (cached['bar_hash'][pos] == hashes) if len(cached) else \
+            np.zeros(len(days), dtype=bool)
+        stale = ~fresh
+        self.hits += int(fresh.sum())
+        self.misses += int(stale.sum())
+
+        rows = cached[pos[fresh]]
+        if stale.any():
+            computed = self._simulate(bars, stale, days[stale], hashes[stale], opening_time, params)
+            kept = cached[~np.isin(cached['day'], computed['day'])]
+            merged = np.concatenate([kept, computed])
+            self.save(key, merged[np.argsort(merged['day'], kind='stable')])
+            rows = np.concatenate([rows, computed])
+            rows = rows[np.argsort(rows['day'], kind='stable')]
+
+        rows = rows[rows['has_trade']]
+        return {column: rows[field] for column, field in FIELD_OF.items()}
+
+    def _simulate(self, bars, stale, days, hashes, opening_time, params):
+        """Simulate only the stale days and return their cache rows."""
+        mask = stale[bars.day]
+        subset = from_arrays(bars.timestamps[mask], bars.open[mask], bars.high[mask], bars.low[mask], bars.close[mask])
+        columns = simulate(subset, opening_time, **params)
+        rows = np.zeros(len(days), dtype=CACHE_DTYPE)
+        rows['day'] = days
+        rows['bar_hash'] = hashes
+        traded = np.searchsorted(days, columns['Date'].astype(np.int64))
+        rows['has_trade'][traded] = True
+        for column, field in FIELD_OF.items():
+            rows[field][traded] = columns[column]
+        return rows
@@ -0,0 +1,171 @@
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from trade_store import read_trades
+
+METHODS = ('bootstrap', 'shuffle')
+BATCH_PATHS = 10_000  # paths simulated per matrix operation (bounds memory to batch x days floats)
+
+
+def daily_points(results):
+    """
+    Return the per-day points series (long + short points, 0 on days without a trade).
+
+    Args:
+        results (TradeBuffer, pd.DataFrame or dict): Backtest results with Long_Points and Short_Points.
+    """
+    return (np.asarray(results['Long_Points'], dtype=np.float64)
+            + np.asarray(results['Short_Points'], dtype=np.float64))
+
+
+def _path_stats(paths, ruin_points):
+    """Total points, max drawdown and ruin flag of every row of a (paths x days) points matrix."""
+    equity = np.cumsum(paths, axis=1)
+    peaks = np.maximum.accumulate(np.maximum(equity, 0.0), axis=1)
+    max_drawdown = (peaks - equity).max(axis=1)
+    ruined = equity.min(axis=1) <= -ruin_points if ruin_points else np.zeros(len(paths), dtype=bool)
+    return equity[:, -1], max_drawdown, ruined
+
+
+def _validate(points, method, n_paths, batch_paths):
+    """Return points as a float array, or raise ValueError for inputs no path can be drawn from."""
+    if method not in METHODS:
+        raise ValueError(f"Unknown method {method!r}; expected one of {METHODS}")
+    points = np.asarray(points, dtype=np.float64)
+    if points.ndim != 1 or len(points) == 0:
+        raise ValueError(f"points must be a non-empty 1-D series of daily points, got shape {points.shape}")
+    if n_paths < 1:
+        raise ValueError(f"n_paths must be at least 1, got {n_paths}")
+    if batch_paths < 1:
+        raise ValueError(f"batch_paths must be at least 1, got {batch_paths}")
+    return points
+
+
+def simulate_paths(points, method, n_paths, seed=None, ruin_points=None, batch_paths=BATCH_PATHS):
+    """
+    Simulate resampled equity paths in batches of matrix operations.
+
+    Args:
+        points (np.ndarray): Per-day points series.
+        method (str): 'bootstrap' to draw days with replacement, or 'shuffle' to permute
+            the order of the same days (same total, different path).
+        n_paths (int): Number of paths.
+        seed: Seed or np.random.SeedSequence.
+        ruin_points (float): Loss from the start (in points) counted as ruin; None to skip.
+        batch_paths (int): Paths per batch.
+
+    Returns:
+        tuple: (total points, max drawdown, ruined) arrays with one entry per path.
+
+    Raises:
+        ValueError: Unknown method, empty points series, or n_paths below 1.
+    """
+    points = _validate(points, method, n_paths, batch_paths)
+    rng = np.random.default_rng(seed)
+    n_days = len(points)
+    totals, drawdowns, ruins = [], [], []
+    for start in range(0, n_paths, batch_paths):
+        size = min(batch_paths, n_paths - start)
+        if method == 'bootstrap':
+            paths = points[rng.integers(0, n_days, size=(size, n_days))]
+        else:
+            paths = rng.permuted(np.tile(points, (size, 1)), axis=1)
+        total, max_drawdown, ruined = _path_stats(paths, ruin_points)
+        totals.append(total)
+        drawdowns.append(max_drawdown)
+        ruins.append(ruined)
+    return np.concatenate(totals), np.concatenate(drawdowns), np.concatenate(ruins)
+
+
+def _simulate_task(args):
+    return simulate_paths(*args)
+
+
+def run_paths(points, method, n_paths, seed=None, ruin_points=None, workers=None, batch_paths=BATCH_PATHS):
+    """
+    simulate_paths split across processes; each task gets its own independent random stream.
+
+    Args:
+        workers (int): Number of processes (defaults to all cores; 1 runs in this process).
+        See simulate_paths for the other arguments.
+    """
+    points = _validate(points, method, n_paths, batch_paths)
+    workers = workers or os.cpu_count() or 1
+    n_tasks = min(workers, -(-n_paths // batch_paths))
+    seeds = np.random.SeedSequence(seed).spawn(n_tasks)
+    sizes = [n_paths // n_tasks + (i < n_paths % n_tasks) for i in range(n_tasks)]
+    tasks = [(points, method, size, task_seed, ruin_points, batch_paths) for size, task_seed in zip(sizes, seeds)]
+    if n_tasks == 1:
+        parts = [_simulate_task(tasks[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=n_tasks) as pool:
+            parts = list(pool.map(_simulate_task, tasks))
+    return tuple(np.concatenate(column) for column in zip(*parts))
+
+
+def summarize(points, totals, drawdowns, ruined, confidence=0.95):
+    """
+    Summarize simulated paths next to the observed backtest.
+
+    Returns:
+        dict: Observed and simulated total points with a confidence interval, probability of
+            a losing period, max drawdown distribution (median, 95th and 99th percentile) and
+            risk of ruin (share of paths that lost ruin_points from the start).
+    """
+    equity = np.cumsum(points)
+    observed_drawdown = float((np.maximum.accumulate(np.maximum(equity, 0.0)) - equity).max()) if len(points) else 0.0
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(totals, [tail, 100 - tail])
+    return {
+        'paths': len(totals),
+        'observed_total': float(equity[-1]) if len(points) else 0.0,
+        'mean_total': float(totals.mean()),
+        'total_ci_low': float(low),
+        'total_ci_high': float(high),
+        'prob_loss': float(np.mean(totals < 0)),
+        'observed_max_drawdown': observed_drawdown,
+        'median_max_drawdown': float(np.median(drawdowns)),
+        'p95_max_drawdown': float(np.percentile(drawdowns, 95)),
+        'p99_max_drawdown': float(np.percentile(drawdowns, 99)),
+        'risk_of_ruin': float(ruined.mean()),
+    }
+
+
+def analyze(results, n_paths=100_000, ruin_points=500.0, confidence=0.95, seed=None, workers=None,
+            methods=METHODS):
+    """
+    Run bootstrap and trade-order shuffle Monte Carlo on backtest results.
+
+    Args:
+        results (TradeBuffer, pd.DataFrame or dict): Per-day backtest results.
+        n_paths (int): Paths per method.
+        ruin_points (float): Loss from the start (in points) counted as ruin.
+        confidence (float): Width of the total-points confidence interval.
+        seed (int): Random seed for reproducible runs.
+        workers (int): Number of processes (defaults to all cores).
+        methods (tuple): Any of METHODS.
+
+    Returns:
+        pd.DataFrame: One row per method with the summarize() columns.
+    """
+    points = daily_points(results)
+    rows = {}
+    for i, method in enumerate(methods):
+        method_seed = None if seed is None else seed + i
+        totals, drawdowns, ruined = run_paths(points, method, n_paths, method_seed, ruin_points, workers)
+        rows[method] = summarize(points, totals, drawdowns, ruined, confidence)
+    return pd.DataFrame.from_dict(rows, orient='index')
+
+
+if __name__ == "__main__":
+    # Usage: python robustness.py [backtest_results.parquet|.csv] [ruin points]
+    results_path = sys.argv[1] if len(sys.argv) > 1 else 'backtest_results.parquet'
+    ruin = float(sys.argv[2]) if len(sys.argv) > 2 else 500.0
+    results = pd.read_csv(results_path) if results_path.endswith('.csv') else read_trades(results_path)
+    report = analyze(results, ruin_points=ruin)
+    print(f"Robustness of {len(results)} days from '{results_path}' ({report['paths'].iloc[0]:,} paths per method)")
+    print(report.drop(columns='paths').T.to_string(float_format=lambda value: f"{value:.2f}"))
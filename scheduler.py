@@ -0,0 +1,125 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+
+class SessionScheduler:
+    """
+    Runs callbacks at absolute epoch times on one background thread.
+
+    Pending events sit in a heap; the thread sleeps on a condition variable until the earliest
+    one is due (or a new, earlier one is added), so nothing is polled and nothing depends on
+    ticks arriving.
+    """
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self._heap = []
+        self._cancelled = set()
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    def schedule_at(self, when, callback, *args, name=None):
+        """
+        Run callback(*args) at epoch time `when` (immediately if it is already past).
+
+        Returns:
+            int: Event ID that can be passed to cancel.
+        """
+        event_id = next(self._counter)
+        with self._condition:
+            heapq.heappush(self._heap, (when, event_id, callback, args, name or getattr(callback, '__name__', 'event')))
+            self._condition.notify()
+        return event_id
+
+    def schedule_after(self, delay, callback, *args, name=None):
+        return self.schedule_at(self.clock() + delay, callback, *args, name=name)
+
+    def cancel(self, event_id):
+        with self._condition:
+            self._cancelled.add(event_id)
+
+    def next_due(self):
+        """Time of the earliest pending event, or None."""
+        with self._condition:
+            return self._heap[0][0] if self._heap else None
+
+    def run_due(self, now=None):
+        """
+        Run every event due by `now` on the calling thread, in time order, instead of start().
+
+        Replay drives the scheduler this way on its simulated clock.
+
+        Returns:
+            int: Number of events run.
+        """
+        now = self.clock() if now is None else now
+        ran = 0
+        while True:
+            with self._condition:
+                if not self._heap or self._heap[0][0] > now:
+                    return ran
+                when, event_id, callback, args, name = heapq.heappop(self._heap)
+                if event_id in self._cancelled:
+                    self._cancelled.discard(event_id)
+                    continue
+            self._execute(callback, args, name)
+            ran += 1
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="session-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._running:
+                    if not self._heap:
+                        self._condition.wait()
+                        continue
+                    delay = self._heap[0][0] - self.clock()
+                    if delay <= 0:
+                        break
+                    self._condition.wait(delay)
+                if not self._running:
+                    return
+                when, event_id, callback, args, name = heapq.heappop(self._heap)
+                if event_id in self._cancelled:
+                    self._cancelled.discard(event_id)
+                    continue
+            self._execute(callback, args, name)
+
+    def _execute(self, callback, args, name):
+        logging.info(f"Scheduled event: {name}")
+        try:
+            callback(*args)
+        except Exception:
+            logging.exception(f"Scheduled event {name} failed")
+
+
+def session_times(calendar, session_date):
+    """
+    Return the (open, close) epoch seconds of a session, including early closes.
+
+    Args:
+        calendar (exchange_calendars.ExchangeCalendar): Calendar to read the session from.
+        session_date (date): The session day.
+
+    Returns:
+        tuple or None: (open, close) epoch seconds, or None if it is not a session.
+    """
+    if not calendar.is_session(session_date):
+        return None
+    return calendar.session_open(session_date).timestamp(), calendar.session_close(session_date).timestamp()
@@ -0,0 +1,100 @@
+import logging
+import os
+import sys
+from array import array
+from bisect import bisect_left
+from datetime import date
+
+SESSION_TABLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'session_tables')
+TABLE_YEARS = 5  # calendar years covered by a freshly built table
+
+
+class SessionTable:
+    """
+    Open and close times of every session of an exchange calendar over a range of years.
+
+    The table is one flat array of doubles: n day ordinals, then the n opens, then the n
+    closes (epoch seconds, early closes included). Loading it is a single read and a lookup
+    is a bisect over the ordinals, so the live start never builds an exchange calendar.
+    """
+
+    def __init__(self, values):
+        self.values = values
+        self.n = len(values) // 3
+
+    @classmethod
+    def build(cls, calendar_name="NYSE", first_year=None, years=TABLE_YEARS):
+        """
+        Compute the table from exchange_calendars (slow: builds the calendar).
+
+        Args:
+            calendar_name (str): exchange_calendars name (e.g., 'NYSE').
+            first_year (int): First calendar year covered (default: the current year).
+            years (int): Number of calendar years covered.
+        """
+        import exchange_calendars as xcals
+
+        first_year = first_year or date.today().year
+        start, end = date(first_year, 1, 1), date(first_year + years - 1, 12, 31)
+        calendar = xcals.get_calendar(calendar_name, start=start.isoformat(), end=end.isoformat())
+        schedule = calendar.schedule.loc[start.isoformat():end.isoformat()]
+        values = array('d', (session.toordinal() for session in schedule.index.date))
+        values.extend(ts.timestamp() for ts in schedule['open'])
+        values.extend(ts.timestamp() for ts in schedule['close'])
+        return cls(values)
+
+    @classmethod
+    def load(cls, path):
+        values = array('d')
+        with open(path, 'rb') as f:
+            values.frombytes(f.read())
+        return cls(values)
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            self.values.tofile(f)
+        os.replace(tmp_path, path)  # a reader never sees a half-written table
+
+    def covers(self, session_date):
+        return self.n > 0 and self.values[0] <= session_date.toordinal() <= self.values[self.n - 1]
+
+    def session_times(self, session_date):
+        """
+        Return the (open, close) epoch seconds of a session, or None if it is not a session.
+
+        Same result as scheduler.session_times for dates the table covers.
+        """
+        ordinal = session_date.toordinal()
+        i = bisect_left(self.values, ordinal, 0, self.n)
+        if i == self.n or self.values[i] != ordinal:
+            return None
+        return self.values[self.n + i], self.values[2 * self.n + i]
+
+
+def cached_session_times(session_date, calendar_name="NYSE", directory=SESSION_TABLE_DIR):
+    """
+    Look a session up in the persisted table, building and saving the table first if it is
+    missing or does not cover `session_date`.
+
+    Returns:
+        tuple or None: (open, close) epoch seconds, or None if it is not a session.
+    """
+    path = os.path.join(directory, f"{calendar_name}.bin")
+    table = SessionTable.load(path) if os.path.exists(path) else None
+    if table is None or not table.covers(session_date):
+        logging.warning(f"No {calendar_name} session table covering {session_date}; building one.")
+        table = SessionTable.build(calendar_name, first_year=session_date.year)
+        table.save(path)
+    return table.session_times(session_date)
+
+
+if __name__ == "__main__":
+    # Usage: python session_table.py [first_year] [years] -- precompute the table ahead of the launch window
+    first_year = int(sys.argv[1]) if len(sys.argv) > 1 else date.today().year
+    years = int(sys.argv[2]) if len(sys.argv) > 2 else TABLE_YEARS
+    table = SessionTable.build("NYSE", first_year, years)
+    path = os.path.join(SESSION_TABLE_DIR, "NYSE.bin")
+    table.save(path)
+    print(f"Saved {table.n} NYSE sessions ({first_year}-{first_year + years - 1}) to '{path}'")
@@ -0,0 +1,114 @@
+import pandas as pd
+import pyarrow.parquet as pq
+
+from backtesting import backtest
+from bar_cache import BAR_COLUMNS, BarStore
+from metrics import MetricsAccumulator
+from trade_store import TradeWriter
+
+CHUNK_ROWS = 500_000
+
+
+def _bar_frame(frame):
+    """Index a raw chunk by its naive timestamps and keep the OHLC columns."""
+    lookup = {name.lower(): name for name in frame.columns}
+    time_column = lookup.get('datetime', lookup.get('timestamp', frame.columns[0]))
+    index = pd.DatetimeIndex(pd.to_datetime(frame[time_column]), name='Datetime')
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return frame[[column for column in BAR_COLUMNS if column in frame.columns]].set_axis(index)
+
+
+def iter_bar_chunks(path, chunk_rows=CHUNK_ROWS):
+    """
+    Stream an OHLC bar file in chunks of at most chunk_rows rows.
+
+    The file is a Parquet file (e.g., a BarStore '<interval>.parquet', memory-mapped) or a
+    CSV file, sorted by time, with a Datetime (or timestamp) column in naive local time.
+
+    Yields:
+        pd.DataFrame: Open, High, Low, Close (and Volume if present) indexed by Datetime.
+    """
+    if path.endswith('.parquet'):
+        parquet = pq.ParquetFile(path, memory_map=True)
+        for batch in parquet.iter_batches(batch_size=chunk_rows):
+            yield _bar_frame(batch.to_pandas(ignore_metadata=True))
+    else:
+        for frame in pd.read_csv(path, chunksize=chunk_rows):
+            yield _bar_frame(frame)
+
+
+def iter_day_blocks(chunks, start_date=None, end_date=None):
+    """
+    Regroup bar chunks into blocks of whole days, optionally limited to [start_date, end_date).
+
+    The last, possibly incomplete, day of a chunk is carried into the next one, so memory
+    holds one chunk plus at most one day.
+
+    Yields:
+        pd.DataFrame: Bars of one or more complete days.
+    """
+    start = pd.Timestamp(start_date) if start_date else None
+    end = pd.Timestamp(end_date) if end_date else None
+    carry = None
+    for frame in chunks:
+        if end is not None and len(frame) and frame.index[0] >= end:
+            break
+        if start is not None or end is not None:
+            keep = (frame.index >= start) if start is not None else True
+            if end is not None:
+                keep = keep & (frame.index < end)
+            frame = frame[keep]
+        if carry is not None:
+            frame = pd.concat([carry, frame])
+            carry = None
+        if frame.empty:
+            continue
+        cut = frame.index.searchsorted(frame.index[-1].normalize())
+        carry = frame.iloc[cut:]
+        if cut:
+            yield frame.iloc[:cut]
+    if carry is not None and len(carry):
+        yield carry
+
+
+def stream_backtest(path, opening_time='14:45', engine='vectorized', start_date=None, end_date=None,
+                    entry_buffer=0, chunk_rows=CHUNK_ROWS, output='backtest_results.parquet'):
+    """
+    Backtest a bar file of any length in constant memory.
+
+    Bars are read chunk by chunk, each block of whole days is simulated and released, its
+    results are appended to the `output` Parquet file as a row group and folded into a
+    streaming MetricsAccumulator. Nothing grows with the length of the history except the
+    output file.
+
+    Args:
+        path (str): Bar file, see iter_bar_chunks.
+        opening_time (str): Time of the opening candle in 'HH:MM' format (e.g., '14:45').
+        engine (str): 'loop' or 'vectorized' (see backtesting.run_backtest).
+        start_date (str): First date to backtest in 'YYYY-MM-DD' format (default: the first bar).
+        end_date (str): Date to stop at (exclusive) in 'YYYY-MM-DD' format (default: the last bar).
+        entry_buffer (float): Points beyond the opening high/low needed to trigger an entry.
+        chunk_rows (int): Bars read from the file at a time.
+        output (str): Parquet file receiving the per-day results (read back with trade_store.read_trades).
+
+    Returns:
+        dict: The compute_metrics summary of the whole run.
+    """
+    metrics = MetricsAccumulator(keep_equity=False)
+    with TradeWriter(output) as writer:
+        for block in iter_day_blocks(iter_bar_chunks(path, chunk_rows), start_date, end_date):
+            trades = backtest(block, opening_time, engine=engine, entry_buffer=entry_buffer)
+            writer.write(trades)
+            metrics.extend(trades)
+    print(f"Streamed {metrics.total_days} days; results saved to '{output}'")
+    return metrics.summary()
+
+
+if __name__ == "__main__":
+    # Example: the whole cached history of NASDAQ 15m bars (fill the cache with run_backtest first)
+    data_path, _ = BarStore()._paths('^IXIC', '15m')
+    summary = stream_backtest(data_path, opening_time='14:45')
+    print(f"Trades: {summary['total_trades']}, Win Rate: {summary['win_rate']:.2f}%, "
+          f"Profit Factor: {summary['profit_factor']:.2f}, Expectancy: {summary['expectancy']:.2f}, "
+          f"Max Drawdown: {summary['max_drawdown']:.2f}")
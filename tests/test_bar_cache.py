@@ -0,0 +1,92 @@
+import pandas as pd
+import pytest
+
+import bar_cache
+from bar_cache import BarStore, YahooSource
+from synthetic import synthetic_bars
+
+BARS = synthetic_bars(40, 15, start='2025-01-02', seed=0)
+
+
+class FrameSource:
+    """Serves BARS and records every requested range; ranges in `fail` raise like a network error."""
+
+    def __init__(self, fail=()):
+        self.calls = []
+        self.fail = list(fail)
+
+    def fetch(self, symbol, interval, start, end):
+        self.calls.append((start, end))
+        if (start, end) in self.fail:
+            raise IOError("connection refused")
+        return BARS[(BARS.index >= start) & (BARS.index < end)]
+
+
+def ts(day):
+    return pd.Timestamp(day)
+
+
+def test_second_load_is_served_from_cache(tmp_path):
+    source = FrameSource()
+    store = BarStore(str(tmp_path), source=source)
+    first = store.load('^IXIC', '15m', '2025-01-06', '2025-01-20')
+    second = store.load('^IXIC', '15m', '2025-01-06', '2025-01-20')
+    assert source.calls == [(ts('2025-01-06'), ts('2025-01-20'))]
+    pd.testing.assert_frame_equal(first, second, check_freq=False)
+    assert len(first) == 26 * 10  # 10 business days
+
+
+def test_only_missing_ranges_are_fetched(tmp_path):
+    source = FrameSource()
+    store = BarStore(str(tmp_path), source=source)
+    store.load('^IXIC', '15m', '2025-01-10', '2025-01-17')
+    store.load('^IXIC', '15m', '2025-01-06', '2025-01-24')
+    assert source.calls[1:] == [(ts('2025-01-06'), ts('2025-01-10')), (ts('2025-01-17'), ts('2025-01-24'))]
+    assert store.missing_ranges('^IXIC', '15m', ts('2025-01-06'), ts('2025-01-24')) == []
+
+
+def test_failed_fetch_is_not_recorded_as_covered(tmp_path):
+    gap = (ts('2025-01-06'), ts('2025-01-20'))
+    store = BarStore(str(tmp_path), source=FrameSource(fail=[gap]))
+    with pytest.raises(IOError):
+        store.load('^IXIC', '15m', *gap)
+    assert store.missing_ranges('^IXIC', '15m', *gap) == [gap]
+
+    store.source = FrameSource()
+    assert len(store.load('^IXIC', '15m', *gap)) == 26 * 10
+
+
+def test_partial_failure_keeps_what_arrived(tmp_path):
+    store = BarStore(str(tmp_path), source=FrameSource())
+    store.load('^IXIC', '15m', '2025-01-10', '2025-01-17')
+    failing = (ts('2025-01-17'), ts('2025-01-24'))
+    store.source = FrameSource(fail=[failing])
+    with pytest.raises(IOError):
+        store.load('^IXIC', '15m', '2025-01-06', '2025-01-24')
+    assert store.missing_ranges('^IXIC', '15m', ts('2025-01-06'), ts('2025-01-24')) == [failing]
+    assert store.read('^IXIC', '15m').index.min() == ts('2025-01-06 09:30')
+
+
+def test_empty_range_is_recorded_as_covered(tmp_path):
+    source = FrameSource()
+    store = BarStore(str(tmp_path), source=source)
+    weekend = (ts('2025-01-04'), ts('2025-01-06'))
+    assert store.load('^IXIC', '15m', *weekend).empty
+    assert store.missing_ranges('^IXIC', '15m', *weekend) == []
+
+
+def test_yahoo_source_raises_on_failure_and_not_on_missing_prices(monkeypatch):
+    class Ticker:
+        def __init__(self, symbol):
+            pass
+
+        def history(self, **kwargs):
+            assert kwargs['raise_errors']
+            raise self.error
+
+    monkeypatch.setattr(bar_cache.yf, 'Ticker', Ticker)
+    Ticker.error = bar_cache.YFPricesMissingError('^IXIC', 'no price data found')
+    assert YahooSource().fetch('^IXIC', '15m', ts('2025-01-04'), ts('2025-01-06')).empty
+    Ticker.error = ConnectionError("Could not resolve host")
+    with pytest.raises(ConnectionError):
+        YahooSource().fetch('^IXIC', '15m', ts('2025-01-06'), ts('2025-01-08'))
@@ -0,0 +1,16 @@
+import pandas as pd
+import pytest
+
+from backtesting import backtest
+from synthetic import synthetic_bars
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+@pytest.mark.parametrize('opening_time', ['09:30', '14:45'])
+@pytest.mark.parametrize('entry_buffer', [0, 5])
+def test_vectorized_matches_loop(seed, opening_time, entry_buffer):
+    bars = synthetic_bars(120, 15, seed=seed)
+    loop = backtest(bars, opening_time, engine='loop', entry_buffer=entry_buffer).to_frame()
+    vectorized = backtest(bars, opening_time, engine='vectorized', entry_buffer=entry_buffer).to_frame()
+    assert len(loop) > 100
+    pd.testing.assert_frame_equal(vectorized, loop)
@@ -0,0 +1,28 @@
+from datetime import date
+
+import replay
+from replay import bars_from_ticks, replay_session, synthetic_session
+
+
+class RejectingReplayApp(replay.ReplayApp):
+    """Rejects the first historical request the way TWS does on a pacing violation."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.historical_requests = 0
+
+    def reqHistoricalData(self, reqId, *args, **kwargs):
+        self.historical_requests += 1
+        if self.historical_requests == 1:
+            self.error(reqId, 162, "Historical Market Data Service error message:API historical data query pacing violation")
+            return
+        super().reqHistoricalData(reqId, *args, **kwargs)
+
+
+def test_rejected_historical_request_is_retried(monkeypatch):
+    monkeypatch.setattr(replay, 'ReplayApp', RejectingReplayApp)
+    ticks = synthetic_session(date(2025, 3, 3), seed=3)
+    app = replay_session(ticks, historical_bars=bars_from_ticks(ticks), market_data_type=3)
+    assert app.historical_requests == 2
+    assert app.opening_candle is not None
+    assert not app.historical_subscribed
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtesting import backtest
+from intrabar import load_intrabar, load_windows
+from synthetic import synthetic_bars
+
+OPENING_TIME = '09:30'
+WINDOW_NS = 15 * 60 * 10**9
+
+
+@pytest.fixture(scope='module')
+def minute_bars():
+    return synthetic_bars(60, 1, seed=4, volatility=3.0)
+
+
+@pytest.fixture(scope='module')
+def coarse_bars(minute_bars):
+    return minute_bars.resample('15min').agg({'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last',
+                                              'Volume': 'sum'}).dropna()
+
+
+@pytest.fixture(scope='module', params=['parquet', 'csv'])
+def minute_file(request, minute_bars, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('intrabar') / f'1m.{request.param}')
+    if request.param == 'parquet':
+        minute_bars.to_parquet(path)
+    else:
+        minute_bars.to_csv(path)
+    return path
+
+
+def test_load_windows_matches_pandas(minute_bars, coarse_bars, minute_file):
+    starts = coarse_bars.index[::37]
+    windows = load_windows(minute_file, starts.as_unit('ns').asi8, WINDOW_NS, chunk_rows=1000)
+    assert len(windows) == len(starts)
+    for start in starts:
+        rows = minute_bars[(minute_bars.index >= start) & (minute_bars.index < start + pd.Timedelta(minutes=15))]
+        np.testing.assert_array_equal(windows[start.value], rows[['High', 'Low']].to_numpy())
+
+
+def test_ambiguous_bars_are_the_only_ones_that_matter(minute_bars, coarse_bars, minute_file):
+    # Replaying every candle through its 1-minute bars gives the same results as replaying
+    # only the ambiguous ones, and those results differ from the SL-first assumption
+    every_window = {start: group[['High', 'Low']].to_numpy()
+                    for start, group in minute_bars.groupby(minute_bars.index.floor('15min'))}
+    intrabar = load_intrabar(coarse_bars, minute_file, OPENING_TIME, chunk_rows=5000)
+    assert 0 < len(intrabar) < len(coarse_bars)
+    expected = backtest(coarse_bars, OPENING_TIME, intrabar=every_window).to_frame()
+    pd.testing.assert_frame_equal(backtest(coarse_bars, OPENING_TIME, intrabar=intrabar).to_frame(), expected)
+    assert not backtest(coarse_bars, OPENING_TIME).to_frame().equals(expected)
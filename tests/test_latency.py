@@ -0,0 +1,65 @@
+import json
+import urllib.request
+
+import numpy as np
+import pytest
+
+from latency import SUB_BUCKETS, LatencyHistogram, LatencyRecorder, serve_metrics
+
+
+def bucket_of(histogram, value):
+    before = list(histogram.counts)
+    histogram.record(value)
+    return next(i for i, (a, b) in enumerate(zip(before, histogram.counts)) if a != b)
+
+
+def test_small_values_are_exact():
+    histogram = LatencyHistogram()
+    for value in range(2 * SUB_BUCKETS):
+        assert bucket_of(histogram, value) == value and histogram.bucket_high(value) == value
+
+
+@pytest.mark.parametrize('value', [32, 33, 47, 48, 1000, 123_456, 10**9, 2**40 + 12345])
+def test_bucket_bounds_contain_the_value(value):
+    index = bucket_of(LatencyHistogram(), value)
+    assert LatencyHistogram.bucket_high(index - 1) < value <= LatencyHistogram.bucket_high(index)
+    assert LatencyHistogram.bucket_high(index) <= value * (1 + 1 / SUB_BUCKETS)
+
+
+def test_percentiles_match_numpy_within_bucket_precision():
+    samples = np.random.default_rng(0).lognormal(mean=11, sigma=1.2, size=50_000).astype(np.int64)
+    histogram = LatencyHistogram()
+    for value in samples:
+        histogram.record(value)
+    for q in (1, 25, 50, 90, 99, 99.9):
+        exact = np.percentile(samples, q, method='inverted_cdf')
+        assert exact <= histogram.percentile(q) <= exact * (1 + 1 / SUB_BUCKETS), q
+    assert histogram.percentile(100) == histogram.max == samples.max()
+    assert histogram.count == len(samples)
+
+
+def test_empty_and_negative():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(50) == 0
+    histogram.record(-5)  # clock went backwards: counted as 0
+    assert histogram.summary() == {'count': 1, 'p50_us': 0.0, 'p99_us': 0.0, 'max_us': 0.0}
+
+
+def test_recorder_slippage_and_http_summary():
+    recorder = LatencyRecorder()
+    recorder.tick_received = 0  # long before perf_counter_ns() now
+    recorder.submitted(7, recorder.decided())
+    recorder.filled(7)
+    recorder.filled(8)  # never sent: ignored
+    recorder.record_slippage(7, 'entry', 'BUY', 100.0, 100.5)
+    recorder.record_slippage(9, 'entry', 'SELL', 100.0, 100.25)
+    report = recorder.summary()
+    assert [report[name]['count'] for name in ('decision', 'submit', 'fill')] == [1, 1, 1]
+    assert report['slippage']['entry'] == {'count': 2, 'mean_points': 0.125, 'max_points': 0.5}
+
+    server = serve_metrics(recorder.summary, 0)
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.server_address[1]}/") as response:
+            assert json.load(response)['slippage'] == report['slippage']
+    finally:
+        server.shutdown()
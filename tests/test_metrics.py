@@ -0,0 +1,66 @@
+import math
+
+import numpy as np
+import pytest
+
+from backtesting import backtest
+from metrics import MetricsAccumulator
+from synthetic import synthetic_bars
+from trade_store import EOD, NOT_TRIGGERED, SL_HIT, TP_HIT, TRIGGERED
+
+
+@pytest.fixture(scope='module')
+def results():
+    trades = backtest(synthetic_bars(150, 15, seed=8), '09:30', engine='vectorized')
+    trades.set_result(-1, 'long', TRIGGERED, 0.0)  # a position still open on the last day
+    return trades
+
+
+def day_by_day(results, **kwargs):
+    accumulator = MetricsAccumulator(**kwargs)
+    for row in results.records:
+        accumulator.add_day(row['long_result'], row['long_points'], row['short_result'], row['short_points'])
+    return accumulator
+
+
+@pytest.mark.parametrize('splits', [[], [1], [7, 8, 60], [120]])
+def test_extend_matches_add_day(results, splits):
+    # Bulk blocks of any size leave the same state as one add_day per row, including the
+    # Sharpe window (10 trades) and drawdown carried across block boundaries
+    expected = day_by_day(results, sharpe_window=10)
+    accumulator = MetricsAccumulator(sharpe_window=10)
+    bounds = [0, *splits, len(results)]
+    for start, end in zip(bounds, bounds[1:]):
+        block = results.records[start:end]
+        accumulator.extend({'Long_Result': block['long_result'], 'Long_Points': block['long_points'],
+                            'Short_Result': block['short_result'], 'Short_Points': block['short_points']})
+    assert expected.total_trades > 20
+    assert accumulator.summary() == pytest.approx(expected.summary(), nan_ok=True)
+    np.testing.assert_allclose(accumulator.equity_curve, expected.equity_curve)
+    assert list(accumulator._window) == pytest.approx(list(expected._window))
+
+
+def test_extend_accepts_result_names(results):
+    by_codes, by_names = MetricsAccumulator(), MetricsAccumulator()
+    by_codes.extend(results)
+    by_names.extend(results.to_frame())
+    assert by_names.summary() == pytest.approx(by_codes.summary(), nan_ok=True)
+
+
+def test_known_sequence():
+    accumulator = MetricsAccumulator(sharpe_window=3)
+    accumulator.add_day(TP_HIT, 10.0, NOT_TRIGGERED, 0.0)
+    accumulator.add_day(NOT_TRIGGERED, 0.0, SL_HIT, -8.0)
+    accumulator.add_day(SL_HIT, -8.0, NOT_TRIGGERED, 0.0)
+    accumulator.add_trade('short', EOD, 4.0)  # a live exit fill
+    summary = accumulator.summary()
+    assert summary['total_days'] == 3 and summary['total_trades'] == 4
+    assert summary['long_tp_hit'] == 1 and summary['short_sl_hit'] == 1 and summary['short_eod'] == 1
+    assert summary['long_not_triggered'] == 1 and summary['short_not_triggered'] == 2
+    assert summary['win_rate'] == 25.0
+    assert summary['profit_factor'] == pytest.approx(14 / 16)
+    assert summary['equity'] == -2.0 and summary['max_drawdown'] == 16.0
+    assert accumulator.equity_curve == [10.0, 2.0, -6.0, -2.0]
+    window = np.array([-8.0, -8.0, 4.0])
+    expected_sharpe = window.mean() / window.std(ddof=1) * math.sqrt(252)
+    assert summary['rolling_sharpe'] == pytest.approx(expected_sharpe)
@@ -0,0 +1,33 @@
+from main import make_future_contract
+from multi_runner import REQUEST_ID_BASE, MultiBreakoutApp
+
+
+def make_hub():
+    hub = MultiBreakoutApp(clock=lambda: 0.0)
+    errors = []
+    for symbol in ('NQ', 'ES'):
+        instrument = hub.add_instrument(make_future_contract(symbol, '20250620', 'CME'))
+        instrument.error = lambda reqId, errorCode, errorString, symbol=symbol: errors.append((symbol, reqId))
+    hub.nextValidId(1)
+    return hub, errors
+
+
+def test_request_ids_do_not_overlap_order_ids():
+    hub, errors = make_hub()
+    nq, es = hub.instruments['NQ'], hub.instruments['ES']
+    order_ids = [nq.allocate_order_id() for _ in range(4)]
+    assert min(hub.by_req_id) >= REQUEST_ID_BASE and not set(order_ids) & set(hub.by_req_id)
+
+    hub.error(order_ids[-1], 201, "Order rejected")
+    hub.error(es.historical_req_id, 162, "Historical data request pacing violation")
+    hub.error(nq.market_data_req_id, 354, "Requested market data is not subscribed")
+    assert errors == [('NQ', order_ids[-1]), ('ES', es.historical_req_id), ('NQ', nq.market_data_req_id)]
+
+
+def test_order_errors_win_over_requests():
+    hub, errors = make_hub()
+    es = hub.instruments['ES']
+    hub.nextOrderId = es.historical_req_id  # order IDs kept from earlier sessions reached the request range
+    order_id = hub.instruments['NQ'].allocate_order_id()
+    hub.error(order_id, 201, "Order rejected")
+    assert errors == [('NQ', order_id)]
@@ -0,0 +1,122 @@
+from datetime import datetime
+
+import pytest
+
+from main import EASTERN
+from orders import (CANCELLED, ENTRY, FILLED, FLATTEN, PARTIALLY_FILLED, REJECTED, STOP, SUBMITTED, TARGET,
+                    OrderBook, TrackedOrder, on_tick, round_to_tick)
+from replay import ReplayApp
+from trade_store import EOD, NOT_TRIGGERED, SL_HIT, TP_HIT
+
+import fixtures
+
+
+def test_partial_fills_then_filled():
+    order = TrackedOrder(1, ENTRY, 'long', 3)
+    assert order.update('Submitted', 1, 100.0) == 1
+    assert order.state == PARTIALLY_FILLED
+    assert order.update('Submitted', 1, 100.0) == 0  # repeated report
+    assert order.update('Filled', 2, 100.5) == 1
+    assert order.state == PARTIALLY_FILLED  # 'Filled' with a remainder
+    assert order.update('Filled', 3, 100.25) == 1
+    assert order.state == FILLED and order.done
+    assert order.update('Cancelled', 3, 100.25) == 0
+    assert order.state == FILLED
+
+
+@pytest.mark.parametrize('status, state', [('Cancelled', CANCELLED), ('ApiCancelled', CANCELLED),
+                                           ('Inactive', REJECTED)])
+def test_terminal_without_fill(status, state):
+    order = TrackedOrder(1, STOP, 'short', 1)
+    assert order.update('PreSubmitted', 0, 0.0) == 0
+    assert order.state == SUBMITTED
+    assert order.update(status, 0, 0.0) == 0
+    assert order.state == state and order.done and not order.filled
+
+
+def test_order_book_working_and_actions():
+    book = OrderBook()
+    book.add(1, ENTRY, 'short', 1)
+    book.add(2, TARGET, 'short', 1)
+    book.add(3, FLATTEN, 'short', 1, result='EOD')
+    book.get(1).update('Filled', 1, 100.0)
+    assert [tracked.order_id for tracked in book.working()] == [2, 3]
+    assert [book.get(i).action for i in (1, 2, 3)] == ['SELL', 'BUY', 'BUY']
+    assert 3 in book and 4 not in book
+
+
+def test_round_to_tick():
+    assert round_to_tick(19955.2, 0.25) == 19955.25
+    assert round_to_tick(2000.13, 0.1) == 2000.1
+    assert round_to_tick(40001.6, 1) == 40002
+    assert on_tick(19955.25, 0.25) and not on_tick(19955.2, 0.25)
+
+
+def make_app():
+    app = ReplayApp(opening_time="09:30", entry_buffer=5)
+    app.sim_clock.now = EASTERN.localize(datetime(2025, 6, 2, 10, 0)).timestamp()
+    app.connect("127.0.0.1", 7497, clientId=0)
+    return fixtures.make_app(app)
+
+
+def feed(app, *prices):
+    for price in prices:
+        app.sim_clock.now += 1
+        app.broker.on_price(price, app.sim_clock.now)
+        app.tickPrice(app.market_data_req_id, 4, price, None)
+
+
+def roles(app):
+    return {tracked.role: tracked for tracked in app.orders.orders.values()}
+
+
+def test_bracket_take_profit():
+    app = make_app()
+    feed(app, 20046.0, 20047.0)
+    assert app.position == 'long' and roles(app)[ENTRY].state == FILLED
+    assert app.entry_price == 20047.0
+    feed(app, 20060.0, 20090.0)
+    orders = roles(app)
+    assert orders[TARGET].state == FILLED and orders[TARGET].avg_fill_price == 20088.0
+    assert orders[STOP].state == CANCELLED  # OCA sibling
+    assert app.position is None
+    assert app.trades['Long_Result'][0] == TP_HIT
+    assert app.trades['Long_Points'][0] == pytest.approx(41.0)
+    assert app.trades['Short_Result'][0] == NOT_TRIGGERED
+
+
+def test_bracket_stop_loss():
+    app = make_app()
+    feed(app, 20046.0, 20047.0, 19970.0)
+    orders = roles(app)
+    assert orders[STOP].state == FILLED and orders[TARGET].state == CANCELLED
+    assert app.position is None
+    assert app.trades['Long_Result'][0] == SL_HIT
+    assert app.trades['Long_Points'][0] == pytest.approx(19970.0 - 20047.0)
+    feed(app, 20100.0)  # one trade per session
+    assert len(app.orders.orders) == 3
+
+
+def test_eod_flatten_cancels_bracket():
+    app = make_app()
+    feed(app, 20046.0, 20047.0, 20050.0)
+    app.close_session()
+    assert roles(app)[FLATTEN].price == 20050.0
+    feed(app, 20052.0)
+    orders = roles(app)
+    assert orders[FLATTEN].state == FILLED
+    assert orders[TARGET].state == CANCELLED and orders[STOP].state == CANCELLED
+    assert app.position is None
+    assert app.trades['Long_Result'][0] == EOD
+    assert app.trades['Long_Points'][0] == pytest.approx(20052.0 - 20047.0)
+
+
+def test_eod_before_entry_fill_cancels_entry():
+    app = make_app()
+    feed(app, 20046.0)
+    app.close_session()  # the entry is still working: cancel it instead of flattening
+    orders = roles(app)
+    assert FLATTEN not in orders
+    assert orders[ENTRY].state == CANCELLED
+    assert app.position is None
+    assert app.trades['Long_Result'][0] == NOT_TRIGGERED
@@ -0,0 +1,20 @@
+import pytest
+
+from bench_process_price import baseline_process_price
+from fixtures import make_app, make_app_in_trade
+
+
+@pytest.mark.parametrize('price', [19974.0, 19975.0, 19990.0, 20045.0, 20045.25])
+def test_baseline_enters_where_the_levels_do(price):
+    # The benchmark's reference path must take the same entry decisions as the current one
+    app = make_app()
+    decision = baseline_process_price(app, price)
+    levels = app.levels
+    expected = 'long' if price > levels.long_trigger else 'short' if price < levels.short_trigger else None
+    assert (decision[1] if decision else None) == expected
+
+
+@pytest.mark.parametrize('price, result', [(19972.0, 'SL Hit'), (20088.0, 'TP Hit')])
+def test_baseline_exits_at_the_bracket_prices(price, result):
+    decision = baseline_process_price(make_app_in_trade(), price)
+    assert decision[1] == result
@@ -0,0 +1,47 @@
+from datetime import date, datetime
+
+from main import EASTERN, BarAggregator
+from orders import FLATTEN
+from replay import bars_from_ticks, replay_session, synthetic_session
+
+SESSION = date(2025, 3, 3)
+
+
+def test_replay_is_deterministic():
+    ticks = synthetic_session(SESSION, seed=3)
+    first = replay_session(ticks, latency=0.25, slippage=0.25)
+    second = replay_session(ticks, latency=0.25, slippage=0.25)
+    assert first.broker.fills and first.broker.fills == second.broker.fills
+    assert first.trades.to_frame().equals(second.trades.to_frame())
+
+
+def test_eod_flatten_without_ticks():
+    # Ticks stop at 15:00 with the trade still open: the scheduler flattens at the close anyway
+    cut = EASTERN.localize(datetime(2025, 3, 3, 15, 0)).timestamp()
+    ticks = [tick for tick in synthetic_session(SESSION, seed=0) if tick[0] < cut]
+    app = replay_session(ticks, sl_offset=1000, tp_ratio=100)
+    assert app.session_done.is_set()
+    flatten = [tracked for tracked in app.orders.orders.values() if tracked.role == FLATTEN]
+    assert len(flatten) == 1 and flatten[0].result == 'EOD'
+
+
+def test_partial_streamed_candle_falls_back_to_history():
+    ticks = synthetic_session(SESSION, seed=3)
+    late_start = EASTERN.localize(datetime(2025, 3, 3, 9, 40)).timestamp()
+    full = replay_session(ticks, historical_bars=bars_from_ticks(ticks))
+    late = replay_session([tick for tick in ticks if tick[0] >= late_start], historical_bars=bars_from_ticks(ticks))
+    for field in ('Open', 'High', 'Low', 'Close'):
+        assert late.opening_candle[field] == full.opening_candle[field]
+    assert not late.historical_subscribed
+
+
+def test_candle_is_complete_from_the_subscription_start():
+    # Subscribed before the window opened: a first trade after 09:30 does not make the candle partial
+    aggregator = BarAggregator()
+    window = EASTERN.localize(datetime(2025, 3, 3, 9, 30)).timestamp()
+    aggregator.start_streaming(window - 5)
+    aggregator.add_trade(100.0, window + 20)
+    bar = aggregator.close_until(window + 15 * 60)
+    assert aggregator.is_complete(bar)
+    aggregator.start_streaming(window + 60)  # resubscribed after a disconnect inside the window
+    assert not aggregator.is_complete(bar)
@@ -0,0 +1,93 @@
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+
+from result_cache import CACHE_DTYPE, ResultCache
+from synthetic import synthetic_bars
+from vectorized import from_arrays, simulate, to_day_bars
+
+_worker_cache = None
+
+
+def _attach(cache):
+    global _worker_cache
+    _worker_cache = cache
+
+
+def _save_many(worker):
+    rows = np.zeros(50, dtype=CACHE_DTYPE)
+    largest = 0
+    for i in range(40):
+        _worker_cache.save(f"w{worker}-{i}", rows)
+        largest = max(largest, folder_size(_worker_cache.directory))
+    return largest
+
+
+def folder_size(directory):
+    total = 0
+    for entry in os.scandir(directory):
+        try:
+            total += entry.stat().st_size if entry.name.endswith('.npy') else 0
+        except FileNotFoundError:  # evicted by another worker meanwhile
+            pass
+    return total
+
+
+def assert_same(left, right):
+    assert left.keys() == right.keys()
+    for column in left:
+        np.testing.assert_array_equal(left[column], right[column])
+
+
+@pytest.fixture(scope='module')
+def bars():
+    return to_day_bars(synthetic_bars(30, 15, seed=4))
+
+
+def test_second_run_reuses_every_day(tmp_path, bars):
+    cache = ResultCache(str(tmp_path))
+    first = cache.backtest(bars, '^IXIC', '09:30', sl_offset=8)
+    assert (cache.hits, cache.misses) == (0, 30)
+    second = cache.backtest(bars, '^IXIC', '09:30', sl_offset=8)
+    assert (cache.hits, cache.misses) == (30, 30)
+    assert_same(first, simulate(bars, '09:30', sl_offset=8))
+    assert_same(second, first)
+
+
+def test_changed_day_and_new_config_are_recomputed(tmp_path, bars):
+    cache = ResultCache(str(tmp_path))
+    cache.backtest(bars, '^IXIC', '09:30')
+    close = bars.close.copy()
+    close[bars.starts[5] + 3] += 50.0  # revise one bar of day 5
+    revised = from_arrays(bars.timestamps, bars.open, np.maximum(bars.high, close), bars.low, close)
+    result = cache.backtest(revised, '^IXIC', '09:30')
+    assert (cache.hits, cache.misses) == (29, 31)
+    assert_same(result, simulate(revised, '09:30'))
+
+    cache.backtest(bars, '^IXIC', '09:30', tp_ratio=1.2)  # another configuration: nothing reused
+    assert cache.misses == 61
+
+
+def test_eviction_keeps_the_folder_under_its_bound(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=64 * 1024)
+    rows = np.zeros(50, dtype=CACHE_DTYPE)
+    for i in range(200):
+        cache.save(f"k{i}", rows)
+    assert folder_size(tmp_path) <= 64 * 1024
+    assert os.path.exists(tmp_path / 'k199.npy')  # the newest survives
+    assert len(cache.load('k0')) == 0             # the oldest went first
+
+
+def test_eviction_bound_holds_across_pool_workers(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=64 * 1024)
+    with ProcessPoolExecutor(max_workers=4, initializer=_attach, initargs=(cache,)) as pool:
+        largest = max(pool.map(_save_many, range(4)))
+    buffer = io.BytesIO()
+    np.save(buffer, np.zeros(50, dtype=CACHE_DTYPE))
+    file_size = buffer.tell()
+    assert largest <= 64 * 1024 + file_size  # at most one save between its write and its eviction
+    assert folder_size(tmp_path) <= 64 * 1024
+    assert cache._total.value == folder_size(tmp_path)
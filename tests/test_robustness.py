@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from robustness import analyze, run_paths, simulate_paths
+
+POINTS = np.array([10.0, -5.0, 0.0, 7.5, -12.0, 3.0])
+
+
+@pytest.mark.parametrize('run', [simulate_paths, run_paths])
+@pytest.mark.parametrize('points, n_paths', [([], 100), (POINTS, 0), (POINTS, -1), (np.ones((2, 3)), 100)])
+def test_invalid_inputs_raise(run, points, n_paths):
+    with pytest.raises(ValueError):
+        run(points, 'bootstrap', n_paths)
+
+
+def test_unknown_method_raises():
+    with pytest.raises(ValueError, match='Unknown method'):
+        run_paths(POINTS, 'jackknife', 10, workers=1)
+
+
+def test_shuffle_keeps_the_total():
+    totals, drawdowns, ruined = simulate_paths(POINTS, 'shuffle', 1000, seed=1, ruin_points=15, batch_paths=300)
+    assert len(totals) == len(drawdowns) == len(ruined) == 1000
+    np.testing.assert_allclose(totals, POINTS.sum())
+    assert (drawdowns >= 0).all() and ruined.any()
+
+
+def test_run_paths_is_reproducible():
+    first = run_paths(POINTS, 'bootstrap', 5000, seed=7, workers=1, batch_paths=1000)
+    second = run_paths(POINTS, 'bootstrap', 5000, seed=7, workers=1, batch_paths=1000)
+    for a, b in zip(first, second):
+        np.testing.assert_array_equal(a, b)
+
+
+def test_analyze_reports_each_method():
+    report = analyze({'Long_Points': POINTS, 'Short_Points': np.zeros_like(POINTS)}, n_paths=2000, seed=0, workers=1)
+    assert list(report.index) == ['bootstrap', 'shuffle'] and (report['paths'] == 2000).all()
+    assert report.loc['shuffle', 'observed_total'] == pytest.approx(POINTS.sum())
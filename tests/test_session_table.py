@@ -0,0 +1,44 @@
+from datetime import date, datetime, timedelta
+
+import exchange_calendars as xcals
+import pytest
+
+from main import EASTERN
+from scheduler import session_times
+from session_table import SessionTable, cached_session_times
+
+
+@pytest.fixture(scope='module')
+def table():
+    return SessionTable.build("NYSE", first_year=2024, years=2)
+
+
+def test_matches_exchange_calendars_every_day(table):
+    calendar = xcals.get_calendar("NYSE", start='2023-12-01', end='2026-01-31')
+    day = date(2024, 1, 1)
+    while day <= date(2025, 12, 31):
+        assert table.session_times(day) == session_times(calendar, day), day
+        day += timedelta(days=1)
+
+
+def test_holidays_and_early_closes(table):
+    assert table.session_times(date(2024, 12, 25)) is None  # Christmas
+    assert table.session_times(date(2025, 1, 4)) is None    # Saturday
+    _, close = table.session_times(date(2024, 11, 29))     # day after Thanksgiving
+    assert datetime.fromtimestamp(close, EASTERN).time().hour == 13
+
+
+def test_save_load_round_trip(table, tmp_path):
+    path = str(tmp_path / 'NYSE.bin')
+    table.save(path)
+    loaded = SessionTable.load(path)
+    assert loaded.values == table.values
+    assert loaded.covers(date(2025, 12, 31)) and not loaded.covers(date(2026, 1, 2))
+
+
+def test_cached_session_times_builds_a_missing_table(tmp_path):
+    directory = str(tmp_path)
+    times = cached_session_times(date(2025, 7, 3), directory=directory)  # early close before July 4th
+    assert (tmp_path / 'NYSE.bin').exists()
+    assert datetime.fromtimestamp(times[1], EASTERN).hour == 13
+    assert cached_session_times(date(2025, 7, 4), directory=directory) is None
@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+
+from backtesting import backtest, compute_metrics
+from streaming import iter_bar_chunks, iter_day_blocks, stream_backtest
+from synthetic import synthetic_bars
+from trade_store import read_trades
+
+
+@pytest.fixture(scope='module')
+def bars():
+    return synthetic_bars(80, 15, seed=6)
+
+
+@pytest.fixture(scope='module', params=['parquet', 'csv'])
+def bar_file(request, bars, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('streaming') / f'15m.{request.param}')
+    if request.param == 'parquet':
+        bars.to_parquet(path)
+    else:
+        bars.to_csv(path)
+    return path
+
+
+def test_day_blocks_hold_whole_days(bars, bar_file):
+    # 97 rows per chunk: every chunk ends in the middle of a day
+    blocks = list(iter_day_blocks(iter_bar_chunks(bar_file, chunk_rows=97)))
+    days = [day for block in blocks for day in sorted(set(block.index.date))]
+    assert days == sorted(set(bars.index.date))
+    pd.testing.assert_frame_equal(pd.concat(blocks), bars, check_freq=False, check_index_type=False)
+
+
+@pytest.mark.parametrize('engine', ['loop', 'vectorized'])
+@pytest.mark.parametrize('start_date, end_date', [(None, None), ('2015-02-03', '2015-03-17')])
+def test_streaming_matches_in_memory(bars, bar_file, tmp_path, engine, start_date, end_date):
+    output = str(tmp_path / 'results.parquet')
+    summary = stream_backtest(bar_file, opening_time='09:30', engine=engine, start_date=start_date,
+                              end_date=end_date, chunk_rows=97, output=output)
+    window = bars
+    if start_date:
+        window = bars[(bars.index >= start_date) & (bars.index < end_date)]
+    expected = backtest(window, '09:30', engine=engine)
+    pd.testing.assert_frame_equal(read_trades(output), expected.to_frame())
+    assert summary == pytest.approx(compute_metrics(expected))
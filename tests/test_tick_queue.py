@@ -0,0 +1,55 @@
+import threading
+
+import fixtures
+from tick_queue import ConflatingTickQueue
+
+
+def test_newer_tick_replaces_its_pending_slot():
+    queue = ConflatingTickQueue()
+    queue.put(1, 100.0, 1)   # bid
+    queue.put(4, 100.25, 2)  # last
+    queue.put(2, 100.5, 3)   # ask
+    queue.put(66, 99.75, 4)  # delayed bid: same slot as the bid, moves to the end
+    queue.put(4, 100.5, 5)
+    assert queue.depth == 3
+    assert queue.get() == [(2, 100.5, 3), (66, 99.75, 4), (4, 100.5, 5)]
+    stats = queue.stats()
+    assert stats['received'] == 5 and stats['conflated'] == 2 and stats['delivered'] == 3
+    assert stats['batches'] == 1 and stats['depth'] == 0 and stats['max_depth'] == 3
+
+
+def test_close_drains_then_ends():
+    queue = ConflatingTickQueue()
+    queue.put(4, 100.0, 1)
+    queue.close()
+    assert not queue.put(4, 101.0, 2)
+    assert queue.get() == [(4, 100.0, 1)]
+    assert queue.get() is None
+    assert queue.stats()['dropped'] == 1
+
+
+def test_get_waits_for_a_tick():
+    queue = ConflatingTickQueue()
+    batches = []
+    consumer = threading.Thread(target=lambda: batches.append(queue.get()))
+    consumer.start()
+    queue.put(4, 100.0, 1)
+    consumer.join(timeout=5)
+    assert batches == [[(4, 100.0, 1)]]
+
+
+def test_strategy_thread_trades_on_the_latest_price():
+    # A burst queued while the strategy thread is busy collapses to its latest last price
+    app = fixtures.make_app()
+    app.last_price = None
+    app.start_strategy_thread()
+    try:
+        with app.state_lock:  # holds the strategy thread off while the burst arrives
+            for price in (20000.0, 20010.0, 20020.0, 20025.0):
+                app.tickPrice(app.market_data_req_id, 4, price, None)
+            assert app.tick_queue.depth <= 1
+    finally:
+        app.stop_strategy_thread()
+    assert app.last_price == 20025.0 and app.position is None
+    stats = app.session_metrics()['tick_queue']
+    assert stats['received'] == 4 and stats['delivered'] + stats['conflated'] == 4
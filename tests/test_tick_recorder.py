@@ -0,0 +1,67 @@
+import threading
+
+import numpy as np
+
+from tick_recorder import TickRecorder, read_ticks, replay_ticks, ticks_frame
+
+
+def test_round_trip_with_growth_and_resume(tmp_path):
+    path = str(tmp_path / 'NQ_20250602.ticks')
+    recorder = TickRecorder(path, capacity=4)
+    for i in range(10):  # grows twice
+        recorder.record(2, 4, 20000.0 + i * 0.25, 1.7e9 + i)
+    live = read_ticks(path)  # readable while recording
+    assert len(live) == 10 and live['price'][-1] == 20002.25
+    recorder.close()
+
+    recorder = TickRecorder(path)
+    assert recorder.count == 10
+    recorder.record(4, 1, 19999.75, 1.7e9 + 10)
+    recorder.close()
+    ticks = read_ticks(path)
+    assert ticks['req_id'].tolist() == [2] * 10 + [4]
+    assert ticks['tick_type'].tolist() == [4] * 10 + [1]
+    np.testing.assert_array_equal(ticks['timestamp'], 1.7e9 + np.arange(11))
+    assert replay_ticks(path, req_id=4) == [(1.7e9 + 10, 1, 19999.75)]
+
+
+def test_compressed_file_reads_back_the_same(tmp_path):
+    path = str(tmp_path / 'ES_20250602.ticks')
+    recorder = TickRecorder(path)
+    for i in range(100):
+        recorder.record(2, 4, 5000.0 + i, 1.7e9 + i)
+    compressed = recorder.close(compress=True)
+    assert compressed == path + '.gz'
+    ticks = read_ticks(compressed)
+    assert len(ticks) == 100 and ticks['price'].sum() == 100 * 5000.0 + 4950.0
+    assert str(ticks_frame(compressed)['timestamp'].dt.tz) == 'US/Eastern'
+
+    restarted = TickRecorder(path)  # a second part of the same session keeps the first
+    restarted.record(2, 4, 1.0, 1.8e9)
+    assert restarted.close(compress=True) == path + '.1.gz'
+    assert len(read_ticks(path + '.gz')) == 100
+
+
+def test_record_racing_close_never_touches_the_unmapped_file(tmp_path):
+    for attempt in range(20):
+        recorder = TickRecorder(str(tmp_path / f'race{attempt}.ticks'), capacity=8)
+        errors, recorded = [], []
+        start = threading.Barrier(2)
+
+        def reader():
+            start.wait()
+            try:
+                n = 0
+                while recorder.record(2, 4, 100.0, float(n)):
+                    n += 1
+                recorded.append(n)
+            except Exception as e:  # what EClient.run would die of
+                errors.append(e)
+
+        thread = threading.Thread(target=reader)
+        thread.start()
+        start.wait()
+        recorder.close()
+        thread.join()
+        assert not errors
+        assert len(read_ticks(recorder.path)) == recorded[0]
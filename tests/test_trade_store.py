@@ -0,0 +1,80 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from trade_store import EOD, GREEN, NOT_TRIGGERED, RED, SL_HIT, TP_HIT, TradeBuffer, TradeWriter, read_trades
+
+
+def make_buffer(start, n, capacity=2):
+    # capacity below n exercises the growth path
+    buffer = TradeBuffer(capacity=capacity)
+    for i in range(n):
+        day = np.datetime64(start) + np.timedelta64(i, 'D')
+        buffer.append(day, GREEN if i % 2 else RED, 100.0 + i, 90.0 + i, 82.0, 108.0, 108.0, 82.0,
+                      long_result=(SL_HIT, TP_HIT, NOT_TRIGGERED)[i % 3], long_points=[-8.0, 8.0, 0.0][i % 3],
+                      short_result=EOD if i % 3 == 2 else NOT_TRIGGERED, short_points=1.5 if i % 3 == 2 else 0.0)
+    return buffer
+
+
+def test_append_read_round_trip(tmp_path):
+    buffer = make_buffer('2025-01-02', 7)
+    path = buffer.write_parquet(str(tmp_path / 'results.parquet'))
+    pd.testing.assert_frame_equal(read_trades(path), buffer.to_frame())
+    coded = read_trades(path, decode=False)
+    assert coded['Long_Result'].tolist() == [1, 2, 0, 1, 2, 0, 1]
+    assert buffer.to_frame()['Candle_Color'].tolist()[:2] == ['red', 'green']
+
+
+def test_appended_parts_read_as_one_table(tmp_path):
+    directory = str(tmp_path / 'results')
+    first, second = make_buffer('2025-01-02', 5), make_buffer('2025-02-03', 3)
+    first.write_parquet(directory, append=True)
+    second.write_parquet(directory, append=True)
+    assert sorted(os.listdir(directory)) == ['part-00000.parquet', 'part-00001.parquet']
+    combined = TradeBuffer()
+    combined.extend(first)
+    combined.extend(second)
+    pd.testing.assert_frame_equal(read_trades(directory), combined.to_frame())
+
+
+def test_file_and_dataset_are_not_mixed(tmp_path):
+    buffer = make_buffer('2025-01-02', 2)
+    path = buffer.write_parquet(str(tmp_path / 'results.parquet'))
+    with pytest.raises(ValueError):
+        buffer.write_parquet(path, append=True)
+    buffer.write_parquet(str(tmp_path / 'parts'), append=True)
+    with pytest.raises(ValueError):
+        buffer.write_parquet(str(tmp_path / 'parts'))
+
+
+def test_writer_streams_row_groups(tmp_path):
+    path = str(tmp_path / 'streamed.parquet')
+    with TradeWriter(path) as writer:
+        writer.write(make_buffer('2025-01-02', 4))
+        writer.write(TradeBuffer())  # empty blocks are skipped
+        writer.write(make_buffer('2025-03-03', 2))
+    assert writer.rows == 6 and len(read_trades(path)) == 6
+
+
+def test_extend_from_named_frame_and_csv(tmp_path):
+    frame = make_buffer('2025-01-02', 4).to_frame()
+    buffer = TradeBuffer()
+    buffer.extend(frame)  # results and colors as names, e.g. an older backtest_results.csv
+    pd.testing.assert_frame_equal(buffer.to_frame(), frame)
+    path = buffer.write_csv(str(tmp_path / 'results.csv'))
+    assert pd.read_csv(path)['Long_Result'].tolist() == ['SL Hit', 'TP Hit', 'Not Triggered', 'SL Hit']
+    frame.loc[0, 'Long_Result'] = 'Stopped'
+    with pytest.raises(ValueError, match='Unknown values'):
+        TradeBuffer().extend(frame)
+
+
+def test_sort_and_set_result():
+    buffer = make_buffer('2025-01-10', 2)
+    buffer.extend(make_buffer('2025-01-02', 2))
+    buffer.sort()
+    assert list(buffer['Date']) == list(np.array(['2025-01-02', '2025-01-03', '2025-01-10', '2025-01-11'],
+                                                 dtype='datetime64[D]'))
+    buffer.set_result(-1, 'short', TP_HIT, 12.0)
+    assert buffer['Short_Result'][-1] == TP_HIT and buffer['Short_Points'][-1] == 12.0
@@ -0,0 +1,74 @@
+import threading
+
+# Conflation slot of each price tick type: a newer bid replaces a pending bid, and so on
+SLOTS = {1: 'bid', 66: 'bid', 2: 'ask', 67: 'ask', 4: 'last', 68: 'last'}
+
+
+class ConflatingTickQueue:
+    """
+    Hand-off of price ticks from the ibapi reader thread to a strategy thread.
+
+    Holds at most one pending tick per slot (bid, ask, last), so it is bounded at three
+    entries: a tick arriving while its slot is still pending replaces it and counts as
+    conflated. Pending ticks are handed out in arrival order. A burst therefore never builds
+    a backlog, and put() only takes a lock and swaps a dict entry on the reader thread.
+    """
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.pending = {}  # slot -> (tickType, price, perf_counter_ns at receipt), in arrival order
+        self.closed = False
+        self.received = 0
+        self.conflated = 0  # replaced by a newer tick of the same slot before being processed
+        self.dropped = 0    # arrived after close()
+        self.batches = 0
+        self.max_depth = 0
+
+    def put(self, tick_type, price, received):
+        slot = SLOTS.get(tick_type, tick_type)
+        with self.cond:
+            if self.closed:
+                self.dropped += 1
+                return False
+            self.received += 1
+            if self.pending.pop(slot, None) is not None:
+                self.conflated += 1
+            self.pending[slot] = (tick_type, price, received)
+            if len(self.pending) > self.max_depth:
+                self.max_depth = len(self.pending)
+            self.cond.notify()
+        return True
+
+    def get(self):
+        """
+        Wait for pending ticks and take all of them.
+
+        Returns:
+            list: (tickType, price, received) tuples in arrival order, or None once the queue
+            is closed and empty.
+        """
+        with self.cond:
+            while not self.pending and not self.closed:
+                self.cond.wait()
+            if not self.pending:
+                return None
+            ticks = list(self.pending.values())
+            self.pending.clear()
+            self.batches += 1
+        return ticks
+
+    def close(self):
+        """Stop accepting ticks; get() returns what is still pending, then None."""
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+    @property
+    def depth(self):
+        return len(self.pending)
+
+    def stats(self):
+        with self.cond:
+            return {'received': self.received, 'delivered': self.received - self.conflated - len(self.pending),
+                    'conflated': self.conflated, 'dropped': self.dropped, 'batches': self.batches,
+                    'depth': len(self.pending), 'max_depth': self.max_depth}
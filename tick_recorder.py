@@ -0,0 +1,152 @@
+import gzip
+import mmap
+import os
+import shutil
+import struct
+import sys
+import threading
+
+import numpy as np
+
+# File layout: a 16-byte header (magic, record count) followed by fixed-size little-endian records
+HEADER = struct.Struct('<8sQ')
+MAGIC = b'TICKS\x001\x00'
+RECORD = struct.Struct('<dihd')  # timestamp (epoch seconds), reqId, tickType, price: 22 bytes, no padding
+TICK_DTYPE = np.dtype([('timestamp', '<f8'), ('req_id', '<i4'), ('tick_type', '<i2'), ('price', '<f8')])
+assert RECORD.size == TICK_DTYPE.itemsize
+TICK_DIR = 'ticks'
+INITIAL_RECORDS = 1 << 18  # ~5.8 MB; the file doubles whenever it fills up
+
+
+def session_path(symbol, session_date, directory=TICK_DIR):
+    """One file per session, e.g. ticks/NQ_20250602.ticks."""
+    return os.path.join(directory, f"{symbol}_{session_date:%Y%m%d}.ticks")
+
+
+class TickRecorder:
+    """
+    Appends ticks to a memory-mapped file of fixed-size records.
+
+    record() is two struct.pack_into calls into the mapping (the tick, then the record count
+    in the header), so the reader thread never does a system call or waits on disk; the OS
+    writes the pages back. Reopening an existing file continues after its last tick.
+    record() and close() share an uncontended lock, so a tick arriving while another thread
+    closes the file is dropped instead of writing into an unmapped buffer.
+    """
+
+    def __init__(self, path, capacity=INITIAL_RECORDS):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        exists = os.path.exists(path) and os.path.getsize(path) >= HEADER.size
+        self.file = open(path, 'r+b' if exists else 'w+b')
+        self.count = 0
+        if exists:
+            magic, self.count = HEADER.unpack(self.file.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a tick file")
+        self.capacity = max(capacity, self.count)
+        size = HEADER.size + self.capacity * RECORD.size
+        if os.path.getsize(path) < size:
+            self.file.truncate(size)
+        self.mm = mmap.mmap(self.file.fileno(), size)
+        HEADER.pack_into(self.mm, 0, MAGIC, self.count)
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def record(self, req_id, tick_type, price, timestamp):
+        """Append one tick; returns False (and drops it) once the recorder is closed."""
+        with self.lock:
+            if self.closed:
+                return False
+            count = self.count
+            if count == self.capacity:
+                self._grow()
+            RECORD.pack_into(self.mm, HEADER.size + count * RECORD.size, timestamp, req_id, tick_type, price)
+            self.count = count + 1
+            HEADER.pack_into(self.mm, 0, MAGIC, count + 1)
+        return True
+
+    def _grow(self):
+        self.capacity *= 2
+        size = HEADER.size + self.capacity * RECORD.size
+        self.file.truncate(size)
+        self.mm.resize(size)
+
+    def close(self, compress=False):
+        """
+        Trim the file to its records and close it; with compress=True replace it by a .gz copy.
+
+        Returns:
+            str: The final file.
+        """
+        with self.lock:
+            if self.closed:
+                return self.path
+            self.closed = True
+            self.mm.flush()
+            self.mm.close()
+            self.file.truncate(HEADER.size + self.count * RECORD.size)
+            self.file.close()
+        if not compress:
+            return self.path
+        compressed = self.path + '.gz'
+        part = 1
+        while os.path.exists(compressed):  # a restarted session: keep the earlier part
+            compressed = f"{self.path}.{part}.gz"
+            part += 1
+        with open(self.path, 'rb') as src, gzip.open(compressed, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(self.path)
+        return compressed
+
+
+def read_ticks(path):
+    """
+    Expose a tick file as a structured NumPy array (TICK_DTYPE) without copying.
+
+    Plain files are memory-mapped read-only, so this also works on the file of a session
+    still being recorded; .gz files are decompressed into memory once.
+    """
+    if path.endswith('.gz'):
+        with gzip.open(path, 'rb') as f:
+            data = f.read()
+        _, count = HEADER.unpack_from(data)
+        return np.frombuffer(data, dtype=TICK_DTYPE, count=count, offset=HEADER.size)
+    with open(path, 'rb') as f:
+        magic, count = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a tick file")
+    if count == 0:
+        return np.zeros(0, dtype=TICK_DTYPE)
+    return np.memmap(path, dtype=TICK_DTYPE, mode='r', offset=HEADER.size, shape=(count,))
+
+
+def ticks_frame(path):
+    """Load a tick file into a DataFrame with US/Eastern timestamps."""
+    import pandas as pd
+
+    ticks = pd.DataFrame(read_ticks(path))
+    ticks['timestamp'] = pd.to_datetime(ticks['timestamp'], unit='s', utc=True).dt.tz_convert('US/Eastern')
+    return ticks
+
+
+def replay_ticks(path, req_id=None):
+    """
+    Return the ticks of a file as the (epoch seconds, tickType, price) tuples replay.replay_session takes.
+
+    Args:
+        path (str): Tick file.
+        req_id (int): Keep only this market data request (e.g., one instrument of a multi-symbol session).
+    """
+    ticks = read_ticks(path)
+    if req_id is not None:
+        ticks = ticks[ticks['req_id'] == req_id]
+    return list(zip(ticks['timestamp'].tolist(), ticks['tick_type'].tolist(), ticks['price'].tolist()))
+
+
+if __name__ == "__main__":
+    # Usage: python tick_recorder.py ticks/NQ_20250602.ticks[.gz] [ticks.csv]
+    tick_path = sys.argv[1]
+    csv_path = sys.argv[2] if len(sys.argv) > 2 else 'ticks.csv'
+    ticks_frame(tick_path).to_csv(csv_path, index=False)
+    print(f"Ticks exported to '{csv_path}'")
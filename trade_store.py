@@ -0,0 +1,231 @@
+import glob
+import os
+
+import numpy as np
+
+# pandas and pyarrow are imported where used, so the live app starts without them
+
+RESULT_COLUMNS = ['Date', 'Candle_Color', 'Opening_High', 'Opening_Low', 'Long_SL', 'Long_TP',
+                  'Short_SL', 'Short_TP', 'Long_Result', 'Long_Points', 'Short_Result', 'Short_Points']
+
+# Result and candle color codes stored instead of strings (result codes match the trade journal)
+NOT_TRIGGERED, SL_HIT, TP_HIT, EOD, TRIGGERED = 0, 1, 2, 3, 4
+RESULT_NAMES = ('Not Triggered', 'SL Hit', 'TP Hit', 'EOD', 'Triggered')
+RESULT_CODES = {name: code for code, name in enumerate(RESULT_NAMES)}
+GREEN, RED = 1, 2
+COLOR_NAMES = ('', 'green', 'red')
+COLOR_CODES = {name: code for code, name in enumerate(COLOR_NAMES)}
+
+TRADE_DTYPE = np.dtype([
+    ('date', 'datetime64[D]'), ('candle_color', 'u1'),
+    ('opening_high', 'f8'), ('opening_low', 'f8'),
+    ('long_sl', 'f8'), ('long_tp', 'f8'), ('short_sl', 'f8'), ('short_tp', 'f8'),
+    ('long_result', 'u1'), ('long_points', 'f8'), ('short_result', 'u1'), ('short_points', 'f8'),
+])
+FIELD_OF = dict(zip(RESULT_COLUMNS, TRADE_DTYPE.names))
+CODED_FIELDS = {'candle_color': (COLOR_CODES, COLOR_NAMES),
+                'long_result': (RESULT_CODES, RESULT_NAMES),
+                'short_result': (RESULT_CODES, RESULT_NAMES)}
+CSV_FLOAT_FORMAT = '%.10g'  # drops float noise such as 16.400000000000002
+
+
+def encode(values, codes):
+    """Return values as uint8 codes; names are looked up in `codes`, integers pass through."""
+    values = np.asarray(values)
+    if values.dtype.kind in 'iub':
+        return values.astype(np.uint8)
+    import pandas as pd
+
+    encoded = pd.Series(values).map(codes)
+    if encoded.isna().any():
+        raise ValueError(f"Unknown values: {sorted(set(values[encoded.isna().to_numpy()]))}")
+    return encoded.to_numpy(dtype=np.uint8)
+
+
+class TradeBuffer:
+    """
+    Growable, typed trade results: one structured NumPy row per day instead of a 12-key dict.
+
+    Columns use the BreakoutStrategy.trades names (RESULT_COLUMNS) on the way in and out;
+    results and candle colors are kept as the small integer codes above.
+    """
+
+    def __init__(self, capacity=1024):
+        self._records = np.zeros(capacity, dtype=TRADE_DTYPE)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, column):
+        """Return one column (e.g. 'Long_Result' as codes) as an array view."""
+        return self.records[FIELD_OF.get(column, column)]
+
+    @property
+    def records(self):
+        """Structured array view of the rows written so far."""
+        return self._records[:self._size]
+
+    def _reserve(self, n):
+        needed = self._size + n
+        if needed > len(self._records):
+            grown = np.zeros(max(needed, 2 * len(self._records)), dtype=TRADE_DTYPE)
+            grown[:self._size] = self.records
+            self._records = grown
+
+    def append(self, date, candle_color, opening_high, opening_low, long_sl, long_tp, short_sl, short_tp,
+               long_result=NOT_TRIGGERED, long_points=0.0, short_result=NOT_TRIGGERED, short_points=0.0):
+        """
+        Add one day's result and return its row number.
+
+        Args:
+            date (date): Trading day.
+            candle_color (int): GREEN or RED.
+            long_result, short_result (int): Result codes (NOT_TRIGGERED, SL_HIT, TP_HIT, EOD, TRIGGERED).
+            The remaining arguments are the price levels and points of the day.
+        """
+        self._reserve(1)
+        row = self._size
+        self._records[row] = (date, candle_color, opening_high, opening_low, long_sl, long_tp, short_sl, short_tp,
+                              long_result, long_points, short_result, short_points)
+        self._size += 1
+        return row
+
+    def set_result(self, row, side, result, points):
+        """Overwrite the result code and points of one side ('long' or 'short') of a row."""
+        record = self._records[row if row >= 0 else self._size + row]
+        record[f'{side}_result'] = result
+        record[f'{side}_points'] = points
+
+    def extend(self, columns):
+        """
+        Append many rows at once.
+
+        Args:
+            columns: Another TradeBuffer, or a mapping/DataFrame with the RESULT_COLUMNS columns
+                (results and colors either as codes or as names, e.g. from vectorized.simulate
+                or an older backtest_results.csv).
+        """
+        n = len(columns[RESULT_COLUMNS[0]])
+        self._reserve(n)
+        rows = self._records[self._size:self._size + n]
+        for column, field in FIELD_OF.items():
+            values = columns[column]
+            if field in CODED_FIELDS:
+                values = encode(values, CODED_FIELDS[field][0])
+            elif field == 'date':
+                values = np.asarray(values, dtype='datetime64[D]')
+            rows[field] = values
+        self._size += n
+
+    def sort(self):
+        """Order the rows by date (stable)."""
+        self.records.sort(order='date', kind='stable')
+
+    def clear(self):
+        self._size = 0
+
+    def to_frame(self, decode=True):
+        """
+        Return the rows as a DataFrame with the RESULT_COLUMNS columns.
+
+        Args:
+            decode (bool): Turn result and color codes back into their names and dates into
+                datetime.date objects, as in the old list-of-dicts frames.
+        """
+        import pandas as pd
+
+        records = self.records
+        data = {}
+        for column, field in FIELD_OF.items():
+            values = records[field]
+            if decode and field in CODED_FIELDS:
+                values = np.asarray(CODED_FIELDS[field][1], dtype=object)[values]
+            elif decode and field == 'date':
+                values = values.astype(object)
+            data[column] = values
+        return pd.DataFrame(data, columns=RESULT_COLUMNS)
+
+    def to_arrow(self):
+        """Return the rows as a pyarrow.Table with coded results (date32, uint8 and float64 columns)."""
+        import pyarrow as pa
+
+        records = self.records
+        return pa.table({column: records[field] for column, field in FIELD_OF.items()})
+
+    def write_parquet(self, path, append=False):
+        """
+        Write the rows to Parquet.
+
+        Args:
+            path (str): Parquet file, or with append=True a dataset directory.
+            append (bool): Add the rows as a new part file in the `path` directory instead of
+                replacing `path`; read_trades reads every part back as one table.
+
+        Returns:
+            str: The file written.
+
+        Raises:
+            ValueError: If `path` is a dataset directory and append is False, or a file and
+                append is True.
+        """
+        import pyarrow.parquet as pq
+
+        if append and os.path.isfile(path):
+            raise ValueError(f"'{path}' is a single Parquet file; append to a dataset directory instead")
+        if not append and os.path.isdir(path):
+            raise ValueError(f"'{path}' is an appended dataset directory; pass append=True or another file name")
+        if append:
+            os.makedirs(path, exist_ok=True)
+            part = len(glob.glob(os.path.join(path, 'part-*.parquet')))
+            path = os.path.join(path, f'part-{part:05d}.parquet')
+        pq.write_table(self.to_arrow(), path)
+        return path
+
+    def write_csv(self, path):
+        """Write the rows as CSV with decoded names and compact floats."""
+        self.to_frame().to_csv(path, index=False, float_format=CSV_FLOAT_FORMAT)
+        return path
+
+
+class TradeWriter:
+    """
+    Streams TradeBuffers into one Parquet file, one row group per write, so results never
+    have to be held in memory together. Read the file back with read_trades.
+    """
+
+    def __init__(self, path):
+        import pyarrow.parquet as pq
+
+        self.path = path
+        self.rows = 0
+        self._writer = pq.ParquetWriter(path, TradeBuffer(capacity=0).to_arrow().schema)
+
+    def write(self, trades):
+        if len(trades):
+            self._writer.write_table(trades.to_arrow())
+            self.rows += len(trades)
+
+    def close(self):
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_trades(path, decode=True):
+    """
+    Load trades written by TradeBuffer.write_parquet (a file or an appended dataset directory).
+
+    Args:
+        path (str): Parquet file or directory.
+        decode (bool): Decode result and color codes into names.
+    """
+    import pyarrow.parquet as pq
+
+    buffer = TradeBuffer(capacity=0)
+    buffer.extend(pq.read_table(path).to_pandas())
+    return buffer.to_frame(decode=decode)
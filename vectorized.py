@@ -0,0 +1,244 @@
+import numpy as np
+import pandas as pd
+from typing import NamedTuple
+
+from trade_store import EOD, FIELD_OF, GREEN, NOT_TRIGGERED, RED, SL_HIT, TP_HIT, TRADE_DTYPE, TradeBuffer
+
+NS_PER_DAY = 86_400 * 10**9
+
+
+class DayBars(NamedTuple):
+    """OHLC bars as flat arrays, sorted by time, with per-day boundaries."""
+    timestamps: np.ndarray   # int64 nanoseconds, naive local time
+    time_of_day: np.ndarray  # int64 nanoseconds since local midnight
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    day: np.ndarray          # day ordinal of every bar
+    starts: np.ndarray       # index of the first bar of each day
+    ends: np.ndarray         # index one past the last bar of each day
+
+
+def _column(data, name):
+    """Return an OHLC column as float64, also for yfinance's (field, ticker) MultiIndex columns."""
+    column = data[name]
+    if isinstance(column, pd.DataFrame):
+        column = column.iloc[:, 0]
+    return column.to_numpy(dtype=np.float64)
+
+
+def from_arrays(timestamps, open_, high, low, close):
+    """
+    Build DayBars from raw arrays.
+
+    Args:
+        timestamps (np.ndarray): int64 nanosecond timestamps (naive local time).
+        open_, high, low, close (np.ndarray): float64 prices aligned with timestamps.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    order = None
+    if len(timestamps) > 1 and np.any(timestamps[1:] < timestamps[:-1]):
+        order = np.argsort(timestamps, kind='stable')
+        timestamps = timestamps[order]
+    prices = [np.asarray(p, dtype=np.float64) for p in (open_, high, low, close)]
+    if order is not None:
+        prices = [p[order] for p in prices]
+
+    day_number = timestamps // NS_PER_DAY
+    time_of_day = timestamps - day_number * NS_PER_DAY
+    new_day = np.empty(len(timestamps), dtype=bool)
+    new_day[:1] = True
+    new_day[1:] = day_number[1:] != day_number[:-1]
+    starts = np.flatnonzero(new_day)
+    ends = np.append(starts[1:], len(timestamps))
+    day = np.cumsum(new_day) - 1
+    return DayBars(timestamps, time_of_day, *prices, day, starts, ends)
+
+
+def to_day_bars(index_data):
+    """
+    Convert a DataFrame of OHLC bars indexed by naive timestamps into DayBars.
+
+    Args:
+        index_data (pd.DataFrame): OHLC data as returned by yf.download (timezone removed).
+    """
+    timestamps = index_data.index.values.astype('datetime64[ns]').view(np.int64)
+    return from_arrays(timestamps, _column(index_data, 'Open'), _column(index_data, 'High'),
+                       _column(index_data, 'Low'), _column(index_data, 'Close'))
+
+
+def _time_of_day_ns(opening_time):
+    t = pd.to_datetime(opening_time).time()
+    seconds = t.hour * 3600 + t.minute * 60 + t.second
+    return seconds * 10**9 + t.microsecond * 1000
+
+
+def _no_trades():
+    return {column: np.empty(0, dtype=TRADE_DTYPE[field]) for column, field in FIELD_OF.items()}
+
+
+class DayLevels(NamedTuple):
+    """Opening candle and trade levels of every day that can trade, plus the bar -> day mapping."""
+    days: np.ndarray         # day ordinals with a usable opening candle
+    op: np.ndarray           # bar index of each day's opening candle
+    later_start: np.ndarray  # bar index of the first bar after the opening candle
+    opening_open: np.ndarray
+    opening_high: np.ndarray
+    opening_low: np.ndarray
+    opening_close: np.ndarray
+    long_sl: np.ndarray
+    short_sl: np.ndarray
+    long_tp: np.ndarray
+    short_tp: np.ndarray
+    long_entry: np.ndarray
+    short_entry: np.ndarray
+    slot: np.ndarray         # per bar: position of its day in `days` (0 for other days)
+    in_kept_day: np.ndarray  # per bar: whether its day is in `days`
+
+
+def day_levels(bars, opening_time, sl_offset=8, tp_ratio=0.8, entry_buffer=0):
+    """
+    Find each day's opening candle and compute its entry, stop loss and take profit levels.
+
+    Args:
+        bars (DayBars): Bars of all days, see to_day_bars.
+        opening_time (str): Time of the opening candle in 'HH:MM' format (e.g., '14:45').
+        sl_offset, tp_ratio, entry_buffer (float): Strategy parameters, see simulate.
+
+    Returns:
+        DayLevels or None: None if no day has a tradable opening candle.
+    """
+    n = len(bars.timestamps)
+    if n == 0:
+        return None
+    pos = np.arange(n)
+    starts = bars.starts
+
+    # Opening candle: first bar of each day at the opening time
+    is_opening = bars.time_of_day == _time_of_day_ns(opening_time)
+    open_pos = np.minimum.reduceat(np.where(is_opening, pos, n), starts)
+    days = np.flatnonzero(open_pos < n)
+    op = open_pos[days]
+    opening_open = bars.open[op]
+    opening_high = bars.high[op]
+    opening_low = bars.low[op]
+    opening_close = bars.close[op]
+
+    # Skip doji candles and days without bars after the opening candle
+    later_start = np.searchsorted(bars.timestamps, bars.timestamps[op], side='right')
+    keep = ((opening_close > opening_open) | (opening_close < opening_open)) & (later_start < bars.ends[days])
+    days, op, later_start = days[keep], op[keep], later_start[keep]
+    opening_open, opening_high = opening_open[keep], opening_high[keep]
+    opening_low, opening_close = opening_low[keep], opening_close[keep]
+    if len(days) == 0:
+        return None
+
+    risk = opening_high - opening_low
+    long_sl = opening_low - sl_offset
+    short_sl = opening_high + sl_offset
+    long_tp = opening_high + (risk * tp_ratio)
+    short_tp = opening_low - (risk * tp_ratio)
+    long_entry = opening_high + entry_buffer
+    short_entry = opening_low - entry_buffer
+
+    # Map every bar to its kept day (slot) so per-day levels can be broadcast over bars
+    slot_of_day = np.full(len(starts), -1)
+    slot_of_day[days] = np.arange(len(days))
+    bar_slot = slot_of_day[bars.day]
+    in_kept_day = bar_slot >= 0
+    slot = np.maximum(bar_slot, 0)
+
+    return DayLevels(days, op, later_start, opening_open, opening_high, opening_low, opening_close,
+                     long_sl, short_sl, long_tp, short_tp, long_entry, short_entry, slot, in_kept_day)
+
+
+def simulate(bars, opening_time, sl_offset=8, tp_ratio=0.8, entry_buffer=0):
+    """
+    Evaluate the breakout rules for every day at once.
+
+    Mirrors BreakoutStrategy.analyze_day: the first candle after the opening candle that
+    breaks its high (checked first) or low triggers the trade, the stop loss is checked
+    before the take profit on every bar including the trigger bar, and unresolved trades
+    close at the day's last close.
+
+    Args:
+        bars (DayBars): Bars of all days, see to_day_bars.
+        opening_time (str): Time of the opening candle in 'HH:MM' format (e.g., '14:45').
+        sl_offset (float): Stop loss distance beyond the opposite side of the opening candle.
+        tp_ratio (float): Take profit distance as a fraction of the opening candle range.
+        entry_buffer (float): Points beyond the opening high/low needed to trigger (and fill) an entry.
+
+    Returns:
+        dict: Column name -> array, one entry per traded day, in trade_store.RESULT_COLUMNS order. Dates are
+        datetime64[D]; results and candle colors are trade_store codes (see TradeBuffer.extend).
+    """
+    levels = day_levels(bars, opening_time, sl_offset, tp_ratio, entry_buffer)
+    if levels is None:
+        return _no_trades()
+    n = len(bars.timestamps)
+    pos = np.arange(n)
+    starts = bars.starts
+    (days, op, later_start, opening_open, opening_high, opening_low, opening_close,
+     long_sl, short_sl, long_tp, short_tp, long_entry, short_entry, slot, in_kept_day) = levels
+    day_close = bars.close[bars.ends[days] - 1]
+
+    # First trigger after the opening candle; a long breakout wins over a short one on the same bar
+    after_open = in_kept_day & (pos >= later_start[slot])
+    long_break = bars.high > long_entry[slot]
+    short_break = bars.low < short_entry[slot]
+    trigger_pos = np.minimum.reduceat(np.where(after_open & (long_break | short_break), pos, n), starts)[days]
+    triggered = trigger_pos < n
+    is_long = triggered & long_break[np.minimum(trigger_pos, n - 1)]
+    is_short = triggered & ~is_long
+
+    # First SL/TP hit from the trigger bar on; SL is checked before TP on the same bar
+    bar_long = is_long[slot]
+    sl = np.where(bar_long, long_sl[slot], short_sl[slot])
+    tp = np.where(bar_long, long_tp[slot], short_tp[slot])
+    sl_hit = np.where(bar_long, bars.low <= sl, bars.high >= sl)
+    tp_hit = np.where(bar_long, bars.high >= tp, bars.low <= tp)
+    in_trade = in_kept_day & (pos >= trigger_pos[slot])
+    exit_pos = np.minimum.reduceat(np.where(in_trade & (sl_hit | tp_hit), pos, n), starts)[days]
+    exited = exit_pos < n
+    exit_sl = exited & sl_hit[np.minimum(exit_pos, n - 1)]
+    exit_tp = exited & ~exit_sl
+    eod = triggered & ~exited
+
+    result = np.select([exit_sl, exit_tp, eod], [SL_HIT, TP_HIT, EOD], NOT_TRIGGERED).astype(np.uint8)
+    long_points = np.select([exit_sl, exit_tp, eod],
+                            [long_sl - long_entry, long_tp - long_entry, day_close - long_entry], 0.0)
+    short_points = np.select([exit_sl, exit_tp, eod],
+                             [short_entry - short_sl, short_entry - short_tp, short_entry - day_close], 0.0)
+
+    return {
+        'Date': bars.timestamps[op].view('datetime64[ns]').astype('datetime64[D]'),
+        'Candle_Color': np.where(opening_close > opening_open, GREEN, RED).astype(np.uint8),
+        'Opening_High': opening_high,
+        'Opening_Low': opening_low,
+        'Long_SL': long_sl,
+        'Long_TP': long_tp,
+        'Short_SL': short_sl,
+        'Short_TP': short_tp,
+        'Long_Result': np.where(is_long, result, NOT_TRIGGERED).astype(np.uint8),
+        'Long_Points': np.where(is_long, long_points, 0.0),
+        'Short_Result': np.where(is_short, result, NOT_TRIGGERED).astype(np.uint8),
+        'Short_Points': np.where(is_short, short_points, 0.0),
+    }
+
+
+def analyze_days(index_data, opening_time, **params):
+    """
+    Vectorized equivalent of running BreakoutStrategy.analyze_day on every day of index_data.
+
+    Args:
+        index_data (pd.DataFrame): OHLC data indexed by naive timestamps.
+        opening_time (str): Time of the opening candle in 'HH:MM' format (e.g., '14:45').
+        **params: Strategy parameters passed to simulate (sl_offset, tp_ratio, entry_buffer).
+
+    Returns:
+        pd.DataFrame: One row per traded day with the same columns as BreakoutStrategy.trades.
+    """
+    trades = TradeBuffer(capacity=0)
+    trades.extend(simulate(to_day_bars(index_data), opening_time, **params))
+    return trades.to_frame()